@@ -0,0 +1,110 @@
+"""
+Compare the column-bucketed compose pass of GraphView against the previous `nx.bfs_layers` based one
+on deep DAGs with long skip edges.
+
+    python benchmarks/compose_benchmark.py [--sizes 250 1000 4000] [--skip-edges 0.5]
+
+Both sides start from a computed layout and produce what compose needs per column: the nodes with
+their breadths, and the sorted breadths of the children of every node for the edge column.
+"""
+import argparse
+import random
+import time
+
+import networkx as nx
+
+from mp_builder.gui.layout import GraphLayout
+
+
+def legacy_columns(G: nx.DiGraph, root) -> list[tuple[list, list[int], list[list[int]]]]:
+    """The column construction previously done by `GraphView.compose`, on `depth`/`breadth` node attributes."""
+    columns = []
+    layers = list(nx.bfs_layers(G, root))
+
+    for i, layer in enumerate(layers):
+        layer = sorted(layer, key=lambda n: G.nodes[n].get("breadth", 0))
+
+        drawn = []
+        for node in layer:
+            # push node back, if it is also a child of a downstream node
+            if G.nodes[node].get("depth") > i and len(layers) > i + 1:
+                layers[i + 1].append(node)
+                continue
+            drawn.append(node)
+
+        in_breadths, out_breadths = [], []
+        if i < len(layers) - 1:
+            next_layer = [
+                list(sorted(map(lambda e: e[1], G.out_edges(n)), key=lambda n: G.nodes[n].get("breadth", 0)))
+                for n in layer
+            ]
+            in_breadths = list(map(lambda n: G.nodes[n].get("breadth"), layer))
+            out_breadths = [list(map(lambda n: G.nodes[n].get("breadth"), descs)) for descs in next_layer]
+
+        columns.append((drawn, in_breadths, out_breadths))
+    return columns
+
+
+def bucketed_columns(G: nx.DiGraph, layout: GraphLayout) -> list[tuple[list, list[int], list[list[int]]]]:
+    """A single pass over the column buckets kept by `GraphLayout`."""
+    columns = []
+    for nodes, breadths in layout.columns():
+        out_breadths = [sorted(layout.breadth(child) for child in G.succ[node]) for node in nodes]
+        columns.append((nodes, breadths, out_breadths))
+    return columns
+
+
+def skip_dag(n: int, skip_edges: float, max_skip: int, seed: int = 0) -> nx.DiGraph:
+    """
+    A deep DAG: a spine of `n` nodes with short side branches, and `skip_edges * n` edges that
+    jump up to `max_skip` nodes ahead along the spine.
+    """
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    G.add_node(0)
+    for i in range(1, n):
+        # mostly continue the spine, sometimes branch off a recent node
+        G.add_edge(i - 1 if rng.random() < 0.8 else rng.randrange(max(0, i - 5), i), i)
+    for _ in range(int(n * skip_edges)):
+        u = rng.randrange(n - 1)
+        v = min(n - 1, u + rng.randint(2, max_skip))
+        G.add_edge(u, v)
+    return G
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 1000, 2000, 4000])
+    parser.add_argument("--skip-edges", type=float, default=0.5, help="skip edges per node")
+    parser.add_argument("--max-skip", type=int, default=200, help="maximum length of a skip edge along the spine")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8}{'edges':>8}{'columns':>9}{'legacy [ms]':>14}{'bucketed [ms]':>15}{'speedup':>10}")
+    for n in args.sizes:
+        G = skip_dag(n, args.skip_edges, args.max_skip)
+        layout = GraphLayout.compute(G, 0)
+        for node, (depth, breadth) in layout.items():
+            G.nodes[node]["depth"] = depth
+            G.nodes[node]["breadth"] = breadth
+
+        legacy = timed(lambda: legacy_columns(G, 0), repeat=1)
+        engine = timed(lambda: bucketed_columns(G, layout))
+
+        n_columns = len(layout.columns())
+        legacy_drawn = sorted(node for nodes, _, _ in legacy_columns(G, 0) for node in nodes)
+        assert legacy_drawn == sorted(layout), "both passes draw every node once"
+
+        print(f"{n:>8}{G.number_of_edges():>8}{n_columns:>9}{legacy * 1e3:>14.1f}{engine * 1e3:>15.2f}{legacy / engine:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
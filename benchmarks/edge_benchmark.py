@@ -0,0 +1,127 @@
+"""
+Compare the line-based GraphEdge renderer against the previous string-building `render`
+on columns with wide fan-outs.
+
+    python benchmarks/edge_benchmark.py [--fan-outs 10 100 1000 5000] [--viewport 40]
+
+- legacy: build the connector art as one string and lay it out as a Rich `Text`, as every repaint did
+- edit: render the lines of one viewport from the layout with `edge_guide`, as the first repaint after an edit
+- repaint: the same with the child rows cached by the widget, as a repaint while scrolling
+"""
+import argparse
+import os
+import random
+import time
+
+import networkx as nx
+from rich.console import Console
+from rich.style import Style
+from rich.text import Text
+
+from mp_builder.gui.graph import NODE_HEIGHT, TREE_GUIDES, GUIDE_WIDTH, edge_guide, guide_strip
+from mp_builder.gui.layout import GraphLayout
+
+
+def legacy_render(in_breadths: list[int], out_breadths: list[list[int]]) -> Text:
+    """The connector art previously built by `GraphEdge.render`."""
+    out = os.linesep * (NODE_HEIGHT // 2)
+
+    for b in range(len(out_breadths)):
+        out_brds = out_breadths[b]
+        in_brd = in_breadths[b]
+
+        prev_brd = 0
+        if b > 0:
+            if len(out_breadths[b - 1]) > 0:
+                prev_brd = out_breadths[b - 1][-1]
+            else:
+                prev_brd = in_breadths[b - 1]
+
+        for j in range(in_brd - prev_brd):
+            mult = NODE_HEIGHT if j > 0 or b == 0 else (NODE_HEIGHT - 1)
+            out += (TREE_GUIDES[5] + os.linesep) * mult
+
+        if len(out_brds) == 0:
+            out += TREE_GUIDES[5] + os.linesep
+
+        if len(out_brds) == 1:
+            out += TREE_GUIDES[0] + os.linesep
+
+        elif len(out_brds) > 1:
+            for i, child_brd in enumerate(out_brds):
+                if i == 0:
+                    out += TREE_GUIDES[1] + os.linesep
+                else:
+                    for j in range(child_brd - out_brds[i-1]):
+                        mult = NODE_HEIGHT if j > 0 else (NODE_HEIGHT - 1)
+                        out += (TREE_GUIDES[4] + os.linesep) * mult
+
+                    if i == len(out_brds) - 1:
+                        out += TREE_GUIDES[3] + os.linesep
+                    else:
+                        out += TREE_GUIDES[2] + os.linesep
+
+    return Text(out)
+
+
+def fan_out_graph(n_parents: int, fan_out: int, seed: int = 0) -> nx.DiGraph:
+    """A root with `n_parents` children, whose own children are `fan_out` leaves in total."""
+    rng = random.Random(seed)
+    counts = [1] * n_parents
+    for _ in range(fan_out - n_parents):
+        counts[rng.randrange(n_parents)] += 1
+
+    G = nx.DiGraph()
+    for parent, count in enumerate(counts):
+        G.add_edge("root", parent)
+        G.add_edges_from(((parent, (parent, i)) for i in range(count)))
+    return G
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fan-outs", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--viewport", type=int, default=40, help="terminal lines rendered per repaint")
+    args = parser.parse_args()
+
+    console = Console(width=GUIDE_WIDTH, file=open(os.devnull, "w"))
+    style = Style()
+
+    print(f"{'parents':>8}{'children':>10}{'lines':>8}{'legacy [ms]':>14}{'edit [us]':>12}{'repaint [us]':>14}{'speedup':>10}")
+    for fan_out in args.fan_outs:
+        for n_parents in sorted({1, max(1, fan_out // 10)}):
+            G = fan_out_graph(n_parents, fan_out)
+            layout = GraphLayout.compute(G, "root")
+            nodes, in_breadths = layout.columns()[1]
+            out_breadths = [sorted(layout.breadth(child) for child in G.succ[node]) for node in nodes]
+            n_lines = layout.n_rows * NODE_HEIGHT
+
+            legacy_lines = [line.plain for line in legacy_render(in_breadths, out_breadths).split(allow_blank=True)]
+            lines = [edge_guide(layout, G.succ, 1, y) for y in range(n_lines)]
+            assert [line.rstrip() for line in legacy_lines] == [line.rstrip() for line in lines[:len(legacy_lines)]]
+
+            legacy = timed(lambda: console.render_lines(legacy_render(in_breadths, out_breadths), pad=False))
+
+            child_rows = {}
+            def repaint():
+                # the bottom of the column, where the lines depend on the most nodes
+                for y in range(max(0, n_lines - args.viewport), n_lines):
+                    guide_strip(edge_guide(layout, G.succ, 1, y, child_rows), GUIDE_WIDTH, style)
+            edited = timed(lambda: (child_rows.clear(), repaint()))
+            repainted = timed(repaint)
+
+            print(f"{n_parents:>8}{fan_out:>10}{n_lines:>8}{legacy * 1e3:>14.2f}{edited * 1e6:>12.1f}"
+                  f"{repainted * 1e6:>14.1f}{legacy / edited:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
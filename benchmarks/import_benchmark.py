@@ -0,0 +1,81 @@
+"""
+Guard the import cost of the mp_builder entry points.
+
+Every module is imported in a fresh interpreter with `-X importtime`. The check fails if its
+cumulative import time exceeds the budget, or if it pulls in one of its forbidden dependencies,
+e.g. the TUI stack for headless commands.
+
+    python benchmarks/import_benchmark.py [--repeat 5] [--scale 1.0]
+
+Exits with status 1 on a regression. `--scale` stretches the time budgets for slow machines;
+the dependency checks are exact.
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+HEAVY = ("textual", "networkx", "pydantic", "yaml", "requests", "matplotlib", "numpy")
+
+# module: (time budget [ms], modules it must not import)
+TARGETS = {
+    # console script entry point, resolves `main` lazily
+    "mp_builder": (10, HEAVY),
+    # CLI argument parsing
+    "mp_builder.main": (30, HEAVY),
+    # catalog cache, requests is only needed to revalidate
+    "mp_builder.catalog": (60, HEAVY),
+    # `mp-builder validate`, configs are loaded in the workers
+    "mp_builder.validate": (100, HEAVY),
+    # library use of the graph, pydantic and yaml are loaded on first read or write of a config
+    "mp_builder.config": (400, ("textual", "pydantic", "yaml", "requests", "matplotlib", "numpy")),
+}
+
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Cumulative import time of `module` in ms, and the top-level packages it loaded."""
+    probe = f"import {module}, sys; print(' '.join(sorted({{m.partition('.')[0] for m in sys.modules}})))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe],
+                            capture_output=True, text=True, check=True)
+
+    cumulative = None
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match and match.group(4) == module:
+            cumulative = int(match.group(2)) / 1e3
+    if cumulative is None:
+        # already imported during interpreter startup
+        cumulative = 0.0
+    return cumulative, set(result.stdout.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many fresh interpreters")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply all time budgets")
+    args = parser.parse_args()
+
+    failures = 0
+    print(f"{'module':<24}{'import [ms]':>12}{'budget [ms]':>13}  status")
+    for module, (budget, forbidden) in TARGETS.items():
+        samples = [measure(module) for _ in range(args.repeat)]
+        elapsed = min(t for t, _ in samples)
+        loaded = samples[0][1]
+
+        problems = []
+        if elapsed > budget * args.scale:
+            problems.append("over budget")
+        leaked = sorted(loaded.intersection(forbidden))
+        if leaked:
+            problems.append(f"imports {', '.join(leaked)}")
+        failures += bool(problems)
+
+        print(f"{module:<24}{elapsed:>12.1f}{budget * args.scale:>13.0f}  {'; '.join(problems) or 'ok'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compare the GraphView layout engine against the previous ancestor-scanning implementation,
+and incremental layout updates against full recomputation.
+
+    python benchmarks/layout_benchmark.py [--sizes 250 1000 2000] [--legacy-max 2000]
+"""
+import argparse
+import random
+import time
+
+import networkx as nx
+
+from mp_builder.config.events import EdgeAdded, NodesRemoved
+from mp_builder.gui.layout import GraphLayout
+
+
+def legacy_layout(G: nx.DiGraph, root) -> dict:
+    """The layout previously done by `GraphView._unvisit_graph` and `GraphView._layout_graph`."""
+    for n in G.nodes():
+        G.nodes[n]["visited"] = False
+        G.nodes[n]["depth"] = 0
+        G.nodes[n]["breadth"] = 0
+
+    stack = [root]
+    breadth = 0
+    while len(stack) > 0:
+        current_node = stack.pop(0)
+        if not G.nodes[current_node].get("visited", False):
+            depth = 0
+            for ancestor in nx.ancestors(G, current_node):
+                depth = max(G.nodes[ancestor].get("depth", 0) + 1, depth)
+            G.nodes[current_node]["depth"] = depth
+            G.nodes[current_node]["breadth"] = breadth
+            G.nodes[current_node]["visited"] = True
+
+            node_descendants = list(map(lambda edge: edge[1], nx.edges(G, current_node)))
+            stack = node_descendants + stack
+            if len(node_descendants) == 0:
+                breadth += 1
+
+    return {n: (G.nodes[n]["depth"], G.nodes[n]["breadth"]) for n in G.nodes if G.nodes[n]["visited"]}
+
+
+def random_tree(n: int, seed: int = 0) -> nx.DiGraph:
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    G.add_node(0)
+    for i in range(1, n):
+        G.add_edge(rng.randrange(max(0, i - 20), i), i)
+    return G
+
+
+def random_dag(n: int, extra_edges: float = 0.5, seed: int = 0) -> nx.DiGraph:
+    rng = random.Random(seed)
+    G = random_tree(n, seed)
+    for _ in range(int(n * extra_edges)):
+        u, v = sorted(rng.sample(range(n), 2))
+        G.add_edge(u, v)
+    return G
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def edit_benchmark(G: nx.DiGraph, n_edits: int = 200, seed: int = 0) -> tuple[float, float]:
+    """Mean time per add-leaf/remove-subtree edit, updating the layout incrementally and from scratch."""
+    rng = random.Random(seed)
+    layout = GraphLayout.compute(G, 0)
+    incremental = full = 0.0
+
+    for i in range(n_edits):
+        if i % 2 == 0:
+            parent, leaf = rng.choice(list(layout)), ("new", i)
+            G.add_edge(parent, leaf)
+            event = EdgeAdded(parent, leaf)
+        else:
+            leaf = ("new", i - 1)
+            boundary = tuple((u, leaf) for u in G.pred[leaf])
+            G.remove_node(leaf)
+            event = NodesRemoved(frozenset([leaf]), boundary)
+
+        start = time.perf_counter()
+        if not layout.apply(G, event):
+            layout = GraphLayout.compute(G, 0)
+        incremental += time.perf_counter() - start
+
+        start = time.perf_counter()
+        GraphLayout.compute(G, 0)
+        full += time.perf_counter() - start
+
+    return incremental / n_edits, full / n_edits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000, 10000])
+    parser.add_argument("--legacy-max", type=int, default=2000, help="skip the legacy layout above this size")
+    args = parser.parse_args()
+
+    print(f"{'graph':<8}{'nodes':>8}{'edges':>8}{'legacy [ms]':>14}{'engine [ms]':>14}{'speedup':>10}")
+    for kind, make in (("tree", random_tree), ("dag", random_dag)):
+        for n in args.sizes:
+            G = make(n)
+            engine = timed(lambda: GraphLayout.compute(G, 0))
+
+            if n <= args.legacy_max:
+                legacy = timed(lambda: legacy_layout(G.copy(), 0), repeat=1)
+                legacy_ms, speedup = f"{legacy * 1e3:.1f}", f"{legacy / engine:.0f}x"
+            else:
+                legacy_ms, speedup = "-", "-"
+
+            print(f"{kind:<8}{n:>8}{G.number_of_edges():>8}{legacy_ms:>14}{engine * 1e3:>14.2f}{speedup:>10}")
+
+    print()
+    print(f"{'graph':<8}{'nodes':>8}{'edit [us]':>14}{'relayout [us]':>16}")
+    for kind, make in (("tree", random_tree), ("dag", random_dag)):
+        for n in args.sizes:
+            incremental, full = edit_benchmark(make(n))
+            print(f"{kind:<8}{n:>8}{incremental * 1e6:>14.1f}{full * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the predicted makespan of FIFO and critical-path launch order on random meta-pipelines,
+and time the simulator itself.
+
+    python benchmarks/schedule_benchmark.py [--sizes 50 500 5000] [--jobs 4 16]
+
+Runtimes are drawn from a heavy-tailed distribution, a few long pipelines among many short ones.
+"""
+import argparse
+import random
+import time
+
+import networkx as nx
+
+from mp_builder.execution import simulate
+
+
+def synthetic_dag(n: int, seed: int = 0) -> nx.DiGraph:
+    """`n` workflows, each fed by up to three earlier ones."""
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    for i in range(n):
+        G.add_node(f"wf{i}", runtime_estimate=round(rng.paretovariate(1.5) * 60, 1))
+        if i:
+            for j in rng.sample(range(max(0, i - 30), i), k=min(i, rng.randint(0, 3))):
+                G.add_edge(f"wf{j}", f"wf{i}")
+    return G
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--jobs", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--seeds", type=int, default=5, help="random graphs per size")
+    args = parser.parse_args()
+
+    print(f"{'workflows':>10}{'jobs':>6}{'fifo':>12}{'critical':>12}{'bound':>12}{'gain':>8}{'sim [ms]':>10}")
+    for n in args.sizes:
+        graphs = [synthetic_dag(n, seed) for seed in range(args.seeds)]
+        for jobs in args.jobs:
+            fifo = critical = bound = 0.0
+            for G in graphs:
+                fifo += simulate(G, jobs, policy="fifo").makespan
+                result = simulate(G, jobs)
+                critical += result.makespan
+                bound += result.lower_bound
+            elapsed = timed(lambda: simulate(graphs[0], jobs))
+            print(f"{n:>10}{jobs:>6}{fifo / len(graphs):>12.0f}{critical / len(graphs):>12.0f}"
+                  f"{bound / len(graphs):>12.0f}{(fifo - critical) / fifo:>7.1%}{elapsed * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare the binary graph snapshot against the JSON adjacency file of `utils.save_graph_to_file`
+and the YAML config of `MetaworkflowGraph.to_file`, and check that all three round-trip.
+
+    python benchmarks/snapshot_benchmark.py [--sizes 100 1000 5000]
+
+- save/load: write the graph and read it back into a `networkx.DiGraph`
+- open: map a snapshot without rebuilding `G`, as `MetaworkflowGraph.from_snapshot` does
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import networkx as nx
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.snapshot import Snapshot, load_snapshot
+from mp_builder.utils import load_graph_from_file, save_graph_to_file, seed_nfcore_pipelines
+
+
+def synthetic_graph(n: int, seed: int = 0) -> MetaworkflowGraph:
+    """A tree of `n` workflows loaded through `from_config`, half of them known nf-core pipelines."""
+    rng = random.Random(seed)
+    seed_nfcore_pipelines([
+        {"name": f"nf-core/pipeline{i}", "location": f"https://github.com/nf-core/pipeline{i}",
+         "description": f"Pipeline number {i}"}
+        for i in range(0, 97, 2)
+    ])
+    workflows = [
+        {
+            "id": f"wf{i}",
+            "name": f"nf-core/pipeline{i % 97}",
+            "pipeline_location": f"https://github.com/example/pipeline{i % 97}",
+            "version": f"{rng.randint(1, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}",
+        }
+        for i in range(n)
+    ]
+    transitions = [{"run": "wf0"}]
+    for i in range(1, n):
+        transitions.append({
+            "from": f"wf{rng.randrange(max(0, i - 20), i)}",
+            "run": f"wf{i}",
+            "params-file": f"params/wf{i}.yaml",
+            "params": [{"input": f"results/wf{i}/samplesheet.csv"}, {"threads": rng.randint(1, 64)}],
+        })
+    return MetaworkflowGraph.from_config({"config_version": "0.0.1", "workflows": workflows, "transitions": transitions})
+
+
+def same_graph(G: nx.DiGraph, H: nx.DiGraph) -> bool:
+    """Equal nodes, edges and attributes, in the same adjacency order."""
+    return (
+        list(G.nodes(data=True)) == list(H.nodes(data=True))
+        and list(G.edges(data=True)) == list(H.edges(data=True))
+        and G.graph == H.graph
+    )
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file, yaml_file, snapshot_file = Path(tmp) / "graph.json", Path(tmp) / "graph.yaml", Path(tmp) / "graph.mpgs"
+
+        print(f"{'workflows':>10}{'format':>10}{'size [kB]':>11}{'save [ms]':>11}{'load [ms]':>11}")
+        for n in args.sizes:
+            mg = synthetic_graph(n)
+
+            # Round trips
+            mg.to_snapshot(snapshot_file)
+            assert same_graph(mg.G, load_snapshot(snapshot_file)), "snapshot round trip"
+            assert MetaworkflowGraph.from_snapshot(snapshot_file).to_config() == mg.to_config(), "snapshot vs YAML form"
+            mg.to_file(yaml_file)
+            assert MetaworkflowGraph.from_file(yaml_file).to_config() == mg.to_config(), "YAML round trip"
+
+            rows = (
+                ("json", json_file, lambda: save_graph_to_file(mg.G, json_file), lambda: load_graph_from_file(json_file)),
+                ("yaml", yaml_file, lambda: mg.to_file(yaml_file), lambda: MetaworkflowGraph.from_file(yaml_file).G),
+                ("snapshot", snapshot_file, lambda: mg.to_snapshot(snapshot_file), lambda: load_snapshot(snapshot_file)),
+            )
+            for name, path, save, load in rows:
+                try:
+                    save_time, load_time = timed(save), timed(load)
+                except TypeError as e:
+                    # json cannot store the Path attributes of transitions
+                    print(f"{n:>10}{name:>10}  unsupported: {e}")
+                    continue
+                print(f"{n:>10}{name:>10}{os.path.getsize(path) / 1024:>11.0f}{save_time * 1e3:>11.1f}{load_time * 1e3:>11.1f}")
+
+            def open_lazily():
+                with Snapshot.open(snapshot_file) as snapshot:
+                    snapshot.node_key(len(snapshot) - 1)
+            print(f"{n:>10}{'open':>10}{'':>11}{'':>11}{timed(open_lazily) * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compare config loading and saving through the pure-Python PyYAML loader/dumper against libyaml,
+on large synthetic meta-pipeline configs.
+
+    python benchmarks/yaml_benchmark.py [--sizes 100 1000 5000] [--documents 10]
+
+- load/dump: a single config with N workflows and N transitions
+- stream: a multi-document file of `--documents` such configs, loaded document by document
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from mp_builder.config import yaml_io
+
+
+def synthetic_config(n: int, seed: int = 0) -> dict:
+    """A tree of `n` workflows, every transition with a params file and a few params."""
+    rng = random.Random(seed)
+    workflows = [
+        {
+            "id": f"wf{i}",
+            "name": f"nf-core/pipeline{i % 97}",
+            "description": f"Synthetic workflow number {i}",
+            "pipeline_location": f"https://github.com/example/pipeline{i % 97}",
+            "version": f"{rng.randint(1, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}",
+        }
+        for i in range(n)
+    ]
+    transitions = [{"run": "wf0"}]
+    for i in range(1, n):
+        transitions.append({
+            "from": f"wf{rng.randrange(max(0, i - 20), i)}",
+            "run": f"wf{i}",
+            "params-file": f"params/wf{i}.yaml",
+            "params": [{"input": f"results/wf{i}/samplesheet.csv"}, {"outdir": f"results/wf{i}"}],
+        })
+    return {"config_version": "0.0.1", "workflows": workflows, "transitions": transitions}
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--documents", type=int, default=10, help="configs per multi-document file")
+    args = parser.parse_args()
+
+    if not yaml_io.LIBYAML:
+        print("PyYAML was built without libyaml, both columns use the pure-Python implementation")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.yaml"
+        multi = Path(tmp) / "configs.yaml"
+
+        print(f"{'workflows':>10}{'size [kB]':>11}{'op':>8}{'python [ms]':>14}{'libyaml [ms]':>14}{'speedup':>10}")
+        for n in args.sizes:
+            config = synthetic_config(n)
+
+            def dump_python():
+                with open(path, "w") as fh:
+                    yaml.dump(config, fh, Dumper=yaml.SafeDumper, sort_keys=False)
+
+            def load_python():
+                with open(path, "rb") as fh:
+                    yaml.load(fh, Loader=yaml.SafeLoader)
+
+            yaml_io.dump_yaml(config, path)
+            assert yaml_io.load_yaml(path) == config
+
+            documents = [synthetic_config(n, seed) for seed in range(args.documents)]
+            yaml_io.dump_yaml_documents(documents, multi)
+
+            def stream_python():
+                with open(multi, "rb") as fh:
+                    for _ in yaml.load_all(fh, Loader=yaml.SafeLoader):
+                        pass
+
+            def stream_libyaml():
+                for _ in yaml_io.iter_yaml_documents(multi):
+                    pass
+
+            size = os.path.getsize(path) / 1024
+            for op, python, libyaml in (
+                ("dump", dump_python, lambda: yaml_io.dump_yaml(config, path)),
+                ("load", load_python, lambda: yaml_io.load_yaml(path)),
+                ("stream", stream_python, stream_libyaml),
+            ):
+                python_time, libyaml_time = timed(python, repeat=1), timed(libyaml)
+                print(f"{n:>10}{size:>11.0f}{op:>8}{python_time * 1e3:>14.1f}{libyaml_time * 1e3:>14.1f}"
+                      f"{python_time / libyaml_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
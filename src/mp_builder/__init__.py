@@ -1 +1,9 @@
-from mp_builder.main import main
+def __getattr__(name):
+    # The entry point is resolved on first access, so importing `mp_builder.config` or
+    # other subpackages does not pay for the CLI and the TUI
+    if name == "main":
+        from mp_builder.main import main
+        # shadow the `mp_builder.main` submodule like the former eager import did
+        globals()["main"] = main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,193 @@
+"""
+Debounced background saving of an edited graph.
+
+Edits only mark the document dirty. A single worker thread waits until edits have settled for
+`delay` seconds, but never longer than `max_delay` after the first unsaved edit, serializes the
+document and writes it atomically. Writes whose content hash matches the file on disk are skipped.
+"""
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from mp_builder.utils import atomic_write
+
+logger = logging.getLogger()
+
+# Seconds without edits before a save
+DEFAULT_DELAY = 2.0
+# Upper bound on how long a stream of edits can postpone a save
+DEFAULT_MAX_DELAY = 10.0
+
+
+def content_hash(data: str | bytes) -> bytes:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class Autosaver:
+    """
+    Save the output of `serialize` to `path` in a background thread, shortly after the last edit.
+
+    `serialize` runs in the worker thread while the document may still be edited. A serialization
+    that overlaps an edit is not a problem: the edit marks the document dirty again and is covered
+    by the next save. If it fails while edits happen it is retried silently. Otherwise the save is
+    retried after the next edit, and the failure is logged and passed to `on_error` only if it
+    differs from the previous one, so a persistent problem is reported once rather than after
+    every edit. `on_saved` and `on_error` are called from the worker thread.
+    """
+
+    def __init__(
+        self,
+        serialize: Callable[[], str | bytes],
+        path: Path | str,
+        delay: float = DEFAULT_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        on_saved: Optional[Callable[[Path], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.serialize = serialize
+        self.path = Path(path)
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_saved = on_saved
+        self.on_error = on_error
+
+        self._cond = threading.Condition()
+        self._generation = 0  # bumped by every edit
+        self._saved_generation = 0  # last generation that was saved, or failed to save
+        self._dirty_since: Optional[float] = None
+        self._last_edit = 0.0
+        self._due_now = False
+        self._closed = False
+        self._saved_hash: Optional[bytes] = None
+        # message of the last failed save, None after a successful one
+        self._last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def dirty(self) -> bool:
+        with self._cond:
+            return self._generation != self._saved_generation
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mp-builder-autosave", daemon=True)
+            self._thread.start()
+
+    def mark_dirty(self):
+        """Record an edit, the save is postponed until edits have settled."""
+        with self._cond:
+            now = time.monotonic()
+            self._generation += 1
+            self._last_edit = now
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._cond.notify()
+
+    def save_now(self):
+        """Save without waiting for edits to settle, e.g. on an explicit save."""
+        with self._cond:
+            self._generation += 1
+            self._due_now = True
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self._cond.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Save pending edits immediately and wait for the save. Returns False on a timeout."""
+        with self._cond:
+            if self._generation == self._saved_generation:
+                return True
+            self._due_now = True
+            self._cond.notify()
+            target = self._generation
+            return self._cond.wait_for(lambda: self._saved_generation >= target or self._closed, timeout)
+
+    def discard(self):
+        """Forget pending edits, e.g. before the document is replaced by the file on disk."""
+        with self._cond:
+            self._saved_generation = self._generation
+            self._dirty_since = None
+            self._due_now = False
+            self._saved_hash = None
+            self._cond.notify_all()
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush pending edits and stop the worker."""
+        if self._thread is not None:
+            self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _due_in(self) -> Optional[float]:
+        """Seconds until the next save is due, None if nothing is pending. Called with the lock held."""
+        if self._generation == self._saved_generation:
+            return None
+        if self._due_now:
+            return 0.0
+        now = time.monotonic()
+        due = min(self._last_edit + self.delay, self._dirty_since + self.max_delay)
+        return max(0.0, due - now)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    wait = self._due_in()
+                    if wait == 0.0:
+                        break
+                    self._cond.wait(wait)
+                if self._closed:
+                    return
+                generation = self._generation
+                self._due_now = False
+
+            error = self._save()
+
+            with self._cond:
+                if error is not None and self._generation != generation:
+                    # failed while the document was edited, the edits trigger another attempt
+                    continue
+                self._saved_generation = generation
+                self._dirty_since = None if self._generation == generation else time.monotonic()
+                self._cond.notify_all()
+
+            if error is None:
+                self._last_error = None
+            elif str(error) != self._last_error:
+                self._last_error = str(error)
+                logger.warning(f"Autosave to {self.path} failed: {error}")
+                if self.on_error is not None:
+                    self.on_error(error)
+
+    def _save(self) -> Optional[Exception]:
+        try:
+            data = self.serialize()
+            digest = content_hash(data)
+            if self._saved_hash is None:
+                self._saved_hash = self._file_hash()
+            if digest == self._saved_hash:
+                return None
+
+            atomic_write(self.path, data)
+            self._saved_hash = digest
+        except Exception as e:
+            return e
+
+        if self.on_saved is not None:
+            self.on_saved(self.path)
+        return None
+
+    def _file_hash(self) -> Optional[bytes]:
+        try:
+            return content_hash(self.path.read_bytes())
+        except OSError:
+            return None
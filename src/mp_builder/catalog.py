@@ -0,0 +1,320 @@
+import os
+import json
+import time
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from mp_builder.utils import atomic_write
+
+logger = logging.getLogger()
+
+NFCORE_PIPELINES_URL = "https://nf-co.re/pipelines.json"
+
+# Catalog entries younger than this are used without any network round-trip
+DEFAULT_TTL = 24 * 60 * 60
+# Expired entries younger than ttl + this are served immediately and revalidated in the background
+DEFAULT_STALE_WHILE_REVALIDATE = 7 * 24 * 60 * 60
+# After a lookup found no catalog, further lookups return nothing for this long instead of
+# each waiting for the network again
+DEFAULT_RETRY_AFTER = 60
+
+
+def default_cache_dir() -> Path:
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return base / "mp-builder"
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class CatalogCacheSettings:
+    """
+    Settings for the on-disk nf-core catalog cache.
+
+    All values can be overridden through `MP_BUILDER_*` environment variables, see `from_env`.
+    """
+    url: str = NFCORE_PIPELINES_URL
+    cache_dir: Path = field(default_factory=default_cache_dir)
+    ttl: float = DEFAULT_TTL
+    stale_while_revalidate: float = DEFAULT_STALE_WHILE_REVALIDATE
+    offline: bool = False
+    timeout: float = 10
+    retry_after: float = DEFAULT_RETRY_AFTER
+
+    @classmethod
+    def from_env(cls) -> "CatalogCacheSettings":
+        settings = cls()
+        settings.url = os.environ.get("MP_BUILDER_NFCORE_URL", settings.url)
+        if os.environ.get("MP_BUILDER_CACHE_DIR"):
+            settings.cache_dir = Path(os.environ["MP_BUILDER_CACHE_DIR"])
+        if os.environ.get("MP_BUILDER_CATALOG_TTL"):
+            settings.ttl = float(os.environ["MP_BUILDER_CATALOG_TTL"])
+        if os.environ.get("MP_BUILDER_CATALOG_STALE"):
+            settings.stale_while_revalidate = float(os.environ["MP_BUILDER_CATALOG_STALE"])
+        if os.environ.get("MP_BUILDER_CATALOG_RETRY"):
+            settings.retry_after = float(os.environ["MP_BUILDER_CATALOG_RETRY"])
+        settings.offline = _env_flag("MP_BUILDER_OFFLINE")
+        return settings
+
+
+def parse_pipelines(payload: dict) -> list[dict]:
+    """
+    Adapted from nf-core/tools `nf_core.pipelines.list.Workflows:get_remote_workflows` method
+    """
+    repos = payload["remote_workflows"]
+    return [{"name": p.get("full_name", ""), "location": p.get("url", ""), "description": p.get("description", "")} for p in repos]
+
+
+class CatalogCache:
+    """
+    Persistent cache of the nf-core pipeline catalog.
+
+    The catalog is stored as a single JSON document together with the `ETag` and
+    `Last-Modified` validators of the response it was built from:
+
+    - fresh entries (younger than `ttl`) are returned without touching the network
+    - stale entries within the `stale_while_revalidate` window are returned immediately,
+      while a conditional request refreshes the cache in a background thread
+    - older entries are revalidated with a blocking conditional request
+    - if the network is unavailable, any cached entry is returned (stale-if-error)
+    - in offline mode only the cache is consulted
+    - a lookup that found no catalog is not repeated within `retry_after` seconds
+    """
+    FILE_NAME = "nfcore-pipelines.json"
+
+    def __init__(self, settings: Optional[CatalogCacheSettings] = None):
+        self.settings = settings if settings is not None else CatalogCacheSettings.from_env()
+        self._revalidation: Optional[threading.Thread] = None
+        # monotonic time of the last lookup that found no catalog
+        self._failed_at: Optional[float] = None
+
+    @property
+    def path(self) -> Path:
+        return self.settings.cache_dir / self.FILE_NAME
+
+    def read(self) -> Optional[dict]:
+        try:
+            with open(self.path) as fh:
+                entry = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable nf-core catalog cache {self.path}: {e}")
+            return None
+
+        # a cache written for another catalog url is useless
+        if entry.get("url") != self.settings.url or not isinstance(entry.get("pipelines"), list):
+            return None
+        return entry
+
+    def write(self, entry: dict):
+        try:
+            atomic_write(self.path, json.dumps(entry))
+        except OSError as e:
+            logger.warning(f"Could not write nf-core catalog cache {self.path}: {e}")
+
+    def age(self, entry: dict) -> float:
+        return time.time() - entry.get("fetched_at", 0)
+
+    def get(self) -> list[dict]:
+        """
+        Return the catalog according to the caching policy. Returns `[]` if no catalog is available.
+        """
+        if self._failed_at is not None and time.monotonic() - self._failed_at < self.settings.retry_after:
+            return []
+
+        pipelines = self._lookup()
+        self._failed_at = None if pipelines else time.monotonic()
+        return pipelines
+
+    def _lookup(self) -> list[dict]:
+        entry = self.read()
+
+        if self.settings.offline:
+            if entry is None:
+                logger.warning("Offline mode: no cached nf-core catalog available")
+                return []
+            return entry["pipelines"]
+
+        if entry is not None:
+            age = self.age(entry)
+            if age < self.settings.ttl:
+                return entry["pipelines"]
+            if age < self.settings.ttl + self.settings.stale_while_revalidate:
+                self.revalidate_in_background(entry)
+                return entry["pipelines"]
+
+        entry = self.revalidate(entry) or entry
+        return entry["pipelines"] if entry is not None else []
+
+    def revalidate(self, entry: Optional[dict] = None) -> Optional[dict]:
+        """
+        Conditionally re-download the catalog. Returns the updated cache entry or None on failure.
+        """
+        # requests is slow to import and not needed while the cache is fresh
+        import requests
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = requests.get(self.settings.url, headers=headers, timeout=self.settings.timeout)
+        except requests.RequestException as e:
+            logger.warning(f"Could not fetch nf-core catalog from {self.settings.url}: {e}")
+            return None
+
+        if response.status_code == 304 and entry is not None:
+            entry = dict(entry, fetched_at=time.time())
+        elif response.status_code == 200:
+            try:
+                pipelines = parse_pipelines(response.json())
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Invalid nf-core catalog received from {self.settings.url}: {e}")
+                return None
+            entry = {
+                "url": self.settings.url,
+                "fetched_at": time.time(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "pipelines": pipelines,
+            }
+        else:
+            logger.warning(f"Could not fetch nf-core catalog from {self.settings.url}: HTTP {response.status_code}")
+            return None
+
+        self.write(entry)
+        return entry
+
+    def revalidate_in_background(self, entry: dict):
+        if self._revalidation is not None and self._revalidation.is_alive():
+            return
+        self._revalidation = threading.Thread(target=self.revalidate, args=(entry,), daemon=True)
+        self._revalidation.start()
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+        self._failed_at = None
+
+
+class PipelineCatalog:
+    """
+    Read-only, indexed view of the nf-core pipeline catalog.
+
+    Entries are stored column-wise in tuples and addressed by their position. Lookups by
+    pipeline name and by repository url are O(1), `search` combines a sorted prefix index
+    over the pipeline names with a trigram index over names and descriptions.
+    """
+
+    def __init__(self, pipelines: list[dict]):
+        self.names = tuple(p.get("name", "") for p in pipelines)
+        self.locations = tuple(p.get("location", "") for p in pipelines)
+        self.descriptions = tuple(p.get("description", "") or "" for p in pipelines)
+
+        # later duplicates win, matching the previous `filter(...).pop()` lookups
+        self._by_name = {name: i for i, name in enumerate(self.names)}
+        self._by_location = {self.normalize_location(loc): i for i, loc in enumerate(self.locations) if loc}
+
+        # (key, index) pairs for the full and the short (`nf-core/` stripped) name
+        prefix_keys = []
+        for i, name in enumerate(self.names):
+            key = name.lower()
+            prefix_keys.append((key, i))
+            short = key.rsplit("/", 1)[-1]
+            if short != key:
+                prefix_keys.append((short, i))
+        prefix_keys.sort()
+        self._prefix_keys = tuple(k for k, _ in prefix_keys)
+        self._prefix_index = array("I", (i for _, i in prefix_keys))
+
+        trigrams: dict[str, set[int]] = {}
+        for i in range(len(self.names)):
+            for t in self.trigrams(f"{self.names[i]} {self.descriptions[i]}"):
+                trigrams.setdefault(t, set()).add(i)
+        self._trigrams = {t: array("I", sorted(ids)) for t, ids in trigrams.items()}
+
+    @staticmethod
+    def normalize_location(location: str) -> str:
+        location = location.strip().lower().rstrip("/")
+        return location[:-4] if location.endswith(".git") else location
+
+    @staticmethod
+    def trigrams(text: str) -> set[str]:
+        text = f"  {text.lower()} "
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, i: int) -> dict:
+        return {"name": self.names[i], "location": self.locations[i], "description": self.descriptions[i]}
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def index_of(self, name: str) -> Optional[int]:
+        return self._by_name.get(name)
+
+    def index_of_location(self, location: str) -> Optional[int]:
+        if not location:
+            return None
+        return self._by_location.get(self.normalize_location(location))
+
+    def by_name(self, name: str) -> Optional[dict]:
+        i = self.index_of(name)
+        return self[i] if i is not None else None
+
+    def by_location(self, location: str) -> Optional[dict]:
+        i = self.index_of_location(location)
+        return self[i] if i is not None else None
+
+    def prefix_matches(self, prefix: str) -> list[int]:
+        """Indices of pipelines whose full or short name starts with `prefix`, in name order."""
+        prefix = prefix.lower()
+        lo = bisect_left(self._prefix_keys, prefix)
+        hi = bisect_left(self._prefix_keys, prefix + "\uffff", lo)
+        return list(dict.fromkeys(self._prefix_index[lo:hi]))
+
+    def search(self, query: str, limit: Optional[int] = None) -> list[int]:
+        """
+        Indices of pipelines matching `query`, best matches first: exact name, name prefix,
+        then by the number of shared trigrams in name and description.
+        """
+        query = query.strip()
+        if not query:
+            return list(range(len(self)))[:limit]
+
+        ranked = []
+        exact = self.index_of(query)
+        if exact is None:
+            exact = self.index_of(f"nf-core/{query}")
+        if exact is not None:
+            ranked.append(exact)
+        ranked.extend(self.prefix_matches(query))
+
+        scores: dict[int, int] = {}
+        query_trigrams = self.trigrams(query)
+        for t in query_trigrams:
+            for i in self._trigrams.get(t, ()):
+                scores[i] = scores.get(i, 0) + 1
+
+        # require at least half of the query trigrams to filter out incidental overlaps
+        min_score = max(1, len(query_trigrams) // 2)
+        ranked.extend(sorted((i for i, s in scores.items() if s >= min_score), key=lambda i: (-scores[i], self.names[i])))
+
+        ranked = list(dict.fromkeys(ranked))
+        return ranked[:limit] if limit is not None else ranked
@@ -1,2 +1,12 @@
-from .models import *
+from importlib import import_module
+
 from .metawf_graph import MetaworkflowGraph
+
+
+def __getattr__(name):
+    # The pydantic models are only needed to read and write configs, load them on first access
+    models = import_module(f"{__name__}.models")
+    try:
+        return getattr(models, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
@@ -0,0 +1,56 @@
+"""
+Changes of a `MetaworkflowGraph`, in the order they were applied to the graph.
+
+They are returned by the edit commands of `config.history` and published to the subscribers
+of the graph, see `MetaworkflowGraph.subscribe`.
+"""
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+
+@dataclass(frozen=True)
+class NodeAdded:
+    node: Hashable
+
+
+@dataclass(frozen=True)
+class EdgeAdded:
+    source: Hashable
+    target: Hashable
+
+
+@dataclass(frozen=True)
+class NodesRemoved:
+    """
+    `nodes` were removed together with all their edges.
+
+    `boundary_edges` are the removed edges that entered `nodes` from nodes that are still in the graph.
+    """
+    nodes: frozenset
+    boundary_edges: tuple[tuple[Hashable, Hashable], ...] = ()
+
+
+@dataclass(frozen=True)
+class NodeAttrsChanged:
+    """Attributes `keys` of `node` were set or unset, the node stays where it is."""
+    node: Hashable
+    keys: frozenset
+
+
+@dataclass(frozen=True)
+class EdgeAttrsChanged:
+    """Attributes `keys` of the edge were set or unset, e.g. the transition metadata in "data"."""
+    source: Hashable
+    target: Hashable
+    keys: frozenset
+
+
+@dataclass(frozen=True)
+class GraphReplaced:
+    """The whole graph was replaced, e.g. by loading a file. Earlier events no longer apply."""
+
+
+GraphEvent = NodeAdded | EdgeAdded | NodesRemoved | NodeAttrsChanged | EdgeAttrsChanged | GraphReplaced
+
+# Called with the events of one mutation
+GraphListener = Callable[[list[GraphEvent]], None]
@@ -0,0 +1,190 @@
+"""
+Undo/redo for edits of a `MetaworkflowGraph`.
+
+Edits are recorded as commands that can apply and revert themselves. A command only holds the
+nodes, edges and attributes it touches, so the history grows with the size of the edits rather
+than with a copy of the graph per step.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Hashable, Optional
+
+import networkx as nx
+
+from .events import GraphEvent, NodeAdded, EdgeAdded, NodesRemoved, NodeAttrsChanged
+
+if TYPE_CHECKING:
+    from .metawf_graph import MetaworkflowGraph
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+
+# Marks an attribute that is not set, e.g. the previous value of a newly set attribute
+MISSING: Any = _Missing()
+
+
+class Command:
+    """An edit of a graph. `apply` and `revert` return the changes they made."""
+
+    def apply(self, G: nx.DiGraph) -> list[GraphEvent]:
+        raise NotImplementedError
+
+    def revert(self, G: nx.DiGraph) -> list[GraphEvent]:
+        raise NotImplementedError
+
+
+@dataclass
+class AddNode(Command):
+    """Add `node` as a new child of `parent`."""
+    parent: Hashable
+    node: Hashable
+    attrs: dict = field(default_factory=dict)
+
+    def apply(self, G: nx.DiGraph) -> list[GraphEvent]:
+        G.add_node(self.node, **self.attrs)
+        G.add_edge(self.parent, self.node)
+        return [NodeAdded(self.node), EdgeAdded(self.parent, self.node)]
+
+    def revert(self, G: nx.DiGraph) -> list[GraphEvent]:
+        # keep edits made to the node for a redo
+        self.attrs = dict(G.nodes[self.node])
+        G.remove_node(self.node)
+        return [NodesRemoved(frozenset({self.node}), ((self.parent, self.node),))]
+
+
+@dataclass
+class RemoveSubtree(Command):
+    """
+    Remove `root` and all its descendants.
+
+    The removed nodes and edges are captured with their attributes when the command is applied,
+    together with the successor order of the remaining nodes that pointed into the subtree,
+    so a revert restores the graph including the order of siblings.
+    """
+    root: Hashable
+    nodes: list[tuple[Hashable, dict]] = field(default_factory=list)
+    edges: list[tuple[Hashable, Hashable, dict]] = field(default_factory=list)
+    successor_order: dict[Hashable, list] = field(default_factory=dict)
+
+    def apply(self, G: nx.DiGraph) -> list[GraphEvent]:
+        removed = nx.descendants(G, self.root) | {self.root}
+
+        self.nodes = [(n, G.nodes[n]) for n in removed]
+        # edges into the subtree, then the edges within it in successor order
+        boundary_edges = tuple((u, v) for v in removed for u in G.pred[v] if u not in removed)
+        self.edges = [(u, v, G.succ[u][v]) for u, v in boundary_edges]
+        self.edges += [(u, v, attrs) for u in removed for v, attrs in G.succ[u].items()]
+        self.successor_order = {u: list(G.succ[u]) for u, _ in boundary_edges}
+
+        G.remove_nodes_from(removed)
+        return [NodesRemoved(frozenset(removed), boundary_edges)]
+
+    def revert(self, G: nx.DiGraph) -> list[GraphEvent]:
+        for n, attrs in self.nodes:
+            G.add_node(n, **attrs)
+        for u, v, attrs in self.edges:
+            G.add_edge(u, v, **attrs)
+
+        # Restored edges were appended to the successors of their sources, move the later siblings behind them
+        removed = {n for n, _ in self.nodes}
+        for u, order in self.successor_order.items():
+            first = next(i for i, v in enumerate(order) if v in removed)
+            for v in order[first + 1:]:
+                if v not in removed and G.has_edge(u, v):
+                    attrs = G.succ[u][v]
+                    G.remove_edge(u, v)
+                    G.add_edge(u, v, **attrs)
+
+        return [NodeAdded(n) for n, _ in self.nodes] + [EdgeAdded(u, v) for u, v, _ in self.edges]
+
+
+@dataclass
+class SetNodeAttrs(Command):
+    """Set attributes of `node`, e.g. a rename or a pipeline selection. `MISSING` values are unset."""
+    node: Hashable
+    before: dict
+    after: dict
+
+    @classmethod
+    def from_change(cls, node: Hashable, before: dict, after: dict) -> Optional["SetNodeAttrs"]:
+        """The command for the attributes that differ between `before` and `after`, None if none do."""
+        keys = [k for k in before.keys() | after.keys() if before.get(k, MISSING) != after.get(k, MISSING)]
+        if not keys:
+            return None
+        return cls(node, {k: before.get(k, MISSING) for k in keys}, {k: after.get(k, MISSING) for k in keys})
+
+    def _set(self, G: nx.DiGraph, values: dict):
+        # update the attribute dict in place, widgets hold references to it
+        attrs = G.nodes[self.node]
+        for key, value in values.items():
+            if value is MISSING:
+                attrs.pop(key, None)
+            else:
+                attrs[key] = value
+
+    @property
+    def events(self) -> list[GraphEvent]:
+        return [NodeAttrsChanged(self.node, frozenset(self.after))]
+
+    def apply(self, G: nx.DiGraph) -> list[GraphEvent]:
+        self._set(G, self.after)
+        return self.events
+
+    def revert(self, G: nx.DiGraph) -> list[GraphEvent]:
+        self._set(G, self.before)
+        return self.events
+
+
+class CommandHistory:
+    """
+    Bounded undo and redo stacks of commands.
+
+    Commands are either executed through the history, or recorded after the edit was
+    already made elsewhere, e.g. by a widget updating its node data. Executed, undone and
+    redone commands are applied through the `MetaworkflowGraph`, which publishes their events.
+    """
+    DEFAULT_DEPTH = 200
+
+    def __init__(self, max_depth: int = DEFAULT_DEPTH):
+        self._undo: deque[Command] = deque(maxlen=max_depth)
+        self._redo: deque[Command] = deque(maxlen=max_depth)
+
+    @property
+    def can_undo(self) -> bool:
+        return len(self._undo) > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return len(self._redo) > 0
+
+    def execute(self, mg: "MetaworkflowGraph", command: Command) -> list[GraphEvent]:
+        events = mg.apply(command)
+        self.record(command)
+        return events
+
+    def record(self, command: Command):
+        self._undo.append(command)
+        self._redo.clear()
+
+    def undo(self, mg: "MetaworkflowGraph") -> Optional[tuple[Command, list[GraphEvent]]]:
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        events = mg.revert(command)
+        self._redo.append(command)
+        return command, events
+
+    def redo(self, mg: "MetaworkflowGraph") -> Optional[tuple[Command, list[GraphEvent]]]:
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        events = mg.apply(command)
+        self._undo.append(command)
+        return command, events
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
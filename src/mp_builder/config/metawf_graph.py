@@ -1,12 +1,11 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, Callable
 from pathlib import Path
-import yaml
 import logging
 
 import networkx as nx
 
-from .models import MetaworkflowConfig, CONFIG_VERSION_MIN, dump_config
-from mp_builder.utils import get_nfcore_pipelines
+from mp_builder.utils import get_nfcore_catalog
+from .events import GraphEvent, GraphListener, GraphReplaced
 
 logger = logging.getLogger()
 
@@ -17,33 +16,81 @@ class MetaworkflowGraph:
     - validation
     - config ↔ graph conversion
     - utilities for workflow orchestration
+    - change events for mutations made through `apply`/`revert`, see `subscribe`
     """
     ROOT_NODE = "node0"
 
     def __init__(self):
-        self.G: nx.DiGraph = nx.DiGraph()
+        self._G: Optional[nx.DiGraph] = nx.DiGraph()
+        # open snapshot `G` is rebuilt from on first access, see `from_snapshot`
+        self._snapshot = None
+        self._listeners: list[GraphListener] = []
+
+    @property
+    def G(self) -> nx.DiGraph:
+        if self._G is None:
+            with self._snapshot as snapshot:
+                self._G = snapshot.to_graph()
+            self._snapshot = None
+        return self._G
+
+    @G.setter
+    def G(self, graph: nx.DiGraph):
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._G = graph
+        self.emit(GraphReplaced())
 
     @classmethod
     def from_file(cls, cfg_file: Path) -> "MetaworkflowGraph":
-        with open(cfg_file) as fh:
-            data = yaml.safe_load(fh)
-        
-        return cls.from_config(data)
+        from .yaml_io import load_yaml
+
+        return cls.from_config(load_yaml(cfg_file))
+
+    @classmethod
+    def iter_file(cls, cfg_file: Path) -> Iterator["MetaworkflowGraph"]:
+        """Build a graph for each document of a multi-document config, one document at a time."""
+        from .yaml_io import iter_yaml_documents
+
+        for data in iter_yaml_documents(cfg_file):
+            yield cls.from_config(data)
+
+    @classmethod
+    def from_snapshot(cls, snapshot_file: Path | str) -> "MetaworkflowGraph":
+        """
+        Open a binary snapshot written by `to_snapshot`. The file is memory-mapped and
+        `G` is only rebuilt when it is first accessed.
+        """
+        from .snapshot import Snapshot
+
+        obj = cls()
+        obj._snapshot = Snapshot.open(snapshot_file)
+        obj._G = None
+        return obj
 
     @classmethod
     def from_config(cls, cfg_dict: Dict[str, Any]) -> "MetaworkflowGraph":
+        from .models import MetaworkflowConfig
+
         # Validate config structure using Pydantic
         cfg = MetaworkflowConfig(**cfg_dict)
 
         obj = cls()
 
-        nfcore_pipelines = get_nfcore_pipelines()
+        # config-level fields, written back as loaded by `to_config`
+        obj.G.graph["config_version"] = cfg.config_version
+        for key in ("workflow_opts", "workflow_opts_custom"):
+            options = getattr(cfg, key)
+            if options is not None:
+                obj.G.graph[key] = options.model_dump()
+
+        nfcore_catalog = get_nfcore_catalog()
 
         # Add workflow nodes
         for wf in cfg.workflows:
-            nfcore_matches = list(filter(lambda p: p.get("name") == wf.name, nfcore_pipelines))
-            if len(nfcore_matches) > 0:
-                match = nfcore_matches.pop()
+            match = nfcore_catalog.by_name(wf.name)
+            if match is not None:
                 obj.G.add_node(
                     wf.id,
                     id=wf.id,
@@ -62,9 +109,13 @@ class MetaworkflowGraph:
                     pipeline_location=wf.pipeline_location,
                     version=wf.version
                 )
+            for key in ("description", "runtime_estimate", "cpus", "memory"):
+                value = getattr(wf, key)
+                if value is not None:
+                    obj.G.nodes[wf.id][key] = value
 
         # Add transition metadata
-        for t in cfg.transitions:
+        for order, t in enumerate(cfg.transitions):
             src = t.from_ if t.from_ else cls.ROOT_NODE
             tgt = t.run
 
@@ -77,7 +128,8 @@ class MetaworkflowGraph:
             if not obj.G.has_edge(src, tgt):
                 # Transition not declared in metalayout → auto-add
                 # TODO: Be more specific with keys once they are stable-ish
-                obj.G.add_edge(src, tgt, data=t.model_dump())
+                # `order` keeps the position of the transition in the file for `to_config`
+                obj.G.add_edge(src, tgt, data=t.model_dump(), order=order)
 
         # Run graph validation
         obj.validate()
@@ -109,40 +161,94 @@ class MetaworkflowGraph:
     #   EXPORT BACK TO CONFIG
     # ===========================
     def to_config(self) -> Dict[str, Any]:
+        """
+        The config of the graph. Loading it with `from_config` gives the same graph.
+
+        Nodes still being edited in the TUI are written as far as they are filled in: without a
+        version, and named after their id until a name was entered, as the TUI shows them.
+        """
+        from .models import MetaworkflowConfig, CONFIG_VERSION_MIN
+
         nodes = [n for n in self.G.nodes if n != self.ROOT_NODE]
 
         workflows = [
             {
                 "id": n,
-                "name": self.G.nodes[n]["name"],
-                "pipeline_location": self.G.nodes[n].get("pipeline_location", None),
+                "name": self.G.nodes[n].get("name") or n,
+                # empty strings are the defaults, they were not in the loaded file
+                "description": self.G.nodes[n].get("description") or None,
+                "pipeline_location": self.G.nodes[n].get("pipeline_location") or None,
                 "version": self.G.nodes[n].get("version", None),
+                "runtime_estimate": self.G.nodes[n].get("runtime_estimate", None),
+                "cpus": self.G.nodes[n].get("cpus", None),
+                "memory": self.G.nodes[n].get("memory", None),
             }
             for n in nodes
         ]
 
+        # transitions of the loaded file in their original order, edges added since then after them
+        edges = sorted(self.G.edges(data=True), key=lambda edge: edge[2].get("order", float("inf")))
         transitions = []
-        for src, tgt, data in self.G.edges(data=True):
-            meta = data.get("data", {})
-            if src == self.ROOT_NODE:
-                t = {"run": tgt}
-            else:
-                t = {"from": src, "run": tgt}
+        for src, tgt, data in edges:
+            t = {"run": tgt} if src == self.ROOT_NODE else {"from": src, "run": tgt}
 
-            # TODO: This potentially adds unwanted fields!
-            t.update(meta)
+            # the metadata is the `Transition.model_dump()` of `from_config`, keyed by field name
+            meta = data.get("data") or {}
+            t.update((k, v) for k, v in meta.items() if k not in ("run", "from_"))
             transitions.append(t)
 
         return MetaworkflowConfig.model_validate({
-            "config_version": CONFIG_VERSION_MIN,
+            # graphs built from scratch in the TUI have none of the config-level fields
+            "config_version": self.G.graph.get("config_version", CONFIG_VERSION_MIN),
             "workflows": workflows,
+            "workflow_opts": self.G.graph.get("workflow_opts"),
+            "workflow_opts_custom": self.G.graph.get("workflow_opts_custom"),
             "transitions": transitions,
         })
 
     def to_file(self, file: Path|str) -> None:
+        from .models import dump_config
+
         dump_config(self.to_config(), Path(file))
+
+    def to_yaml(self) -> str:
+        """The config of `to_file` as a string."""
+        from .models import dump_config_string
+
+        return dump_config_string(self.to_config())
+
+    def to_snapshot(self, file: Path|str) -> None:
+        """Write `G` as a binary snapshot, see `mp_builder.config.snapshot`."""
+        from .snapshot import save_snapshot
+
+        save_snapshot(self.G, file)
         
         
+    # ===========================
+    #     MUTATIONS & EVENTS
+    # ===========================
+    def subscribe(self, listener: GraphListener) -> Callable[[], None]:
+        """Call `listener` with the events of every mutation. Returns a function that unsubscribes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def emit(self, *events: GraphEvent) -> None:
+        """Publish mutations of `G`, e.g. made in place by a widget holding a node's attributes."""
+        if events:
+            for listener in list(self._listeners):
+                listener(list(events))
+
+    def apply(self, command) -> list[GraphEvent]:
+        """Apply an edit command of `config.history` to `G` and publish its events."""
+        events = command.apply(self.G)
+        self.emit(*events)
+        return events
+
+    def revert(self, command) -> list[GraphEvent]:
+        events = command.revert(self.G)
+        self.emit(*events)
+        return events
+
     # ===========================
     #        UTILITIES
     # ===========================
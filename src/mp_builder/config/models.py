@@ -1,13 +1,12 @@
 from pathlib import Path
 from packaging.version import Version
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterable, Iterator
 import logging
 import re
 
-from pydantic import BaseModel, Field, field_validator, model_validator, ValidationError, ValidationInfo
-import yaml
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator, ValidationError, ValidationInfo
 
-from mp_builder.utils import get_nfcore_pipelines
+from mp_builder.utils import get_nfcore_catalog, parse_memory
 
 logger = logging.getLogger()
 
@@ -16,10 +15,23 @@ CONFIG_VERSION_MAX = "0.9.9"
 
 class Workflow(BaseModel):
     id: str
-    description: Optional[str] = ""
     name: str
+    description: Optional[str] = ""
     pipeline_location: Optional[str] = ""
-    version: str
+    # the default branch of the pipeline is run without a version
+    version: Optional[str] = None
+    # expected wall-clock runtime in seconds, used to schedule and simulate runs
+    runtime_estimate: Optional[float] = Field(default=None, ge=0)
+    # resources the workflow needs while it runs, memory in bytes or as e.g. "16 GB"
+    cpus: Optional[float] = Field(default=None, gt=0)
+    memory: Optional[int | str] = None
+
+    @field_validator("memory")
+    @classmethod
+    def memory_valid(cls, memory):
+        if memory is not None:
+            parse_memory(memory)
+        return memory
 
 
 class WorkflowOptions(BaseModel):
@@ -27,8 +39,11 @@ class WorkflowOptions(BaseModel):
 
 
 class Transition(BaseModel):
-    run: str
+    # graph edges keep the dump by field name, e.g. `params_file`, see `MetaworkflowGraph.to_config`
+    model_config = ConfigDict(populate_by_name=True)
+
     from_: Optional[str] = Field(default=None, alias="from")
+    run: str
     params_file: Optional[Path] = Field(default=None, alias="params-file")
     config_file: Optional[Path] = Field(default=None, alias="config-file")
     adapter: Optional[str] = None
@@ -61,15 +76,14 @@ class MetaworkflowConfig(BaseModel):
     @field_validator("workflows")
     @classmethod
     def workflows_exist_in_nfcore_or_have_location(cls, workflows):
-        nf_core_pipelines = get_nfcore_pipelines()
-        if not len(nf_core_pipelines):
+        nf_core_catalog = get_nfcore_catalog()
+        if not len(nf_core_catalog):
             logger.warning("Workflows could not be validated against nf-core")
             return workflows
         
-        nf_core_pipeline_names = {w.get("name") for w in nf_core_pipelines}
         unknown_workflows = []
         for w in workflows:
-            if w.name not in nf_core_pipeline_names:
+            if w.name not in nf_core_catalog:
                 unknown_workflows.append(w)
         if len(unknown_workflows):
             names = list(map(lambda w: w.name, unknown_workflows))
@@ -101,16 +115,39 @@ class MetaworkflowConfig(BaseModel):
 
 
 def load_config(path: Path) -> MetaworkflowConfig:
-    with open(path) as fh:
-        data = yaml.safe_load(fh)
-    return MetaworkflowConfig.model_validate(data)
+    from .yaml_io import load_yaml
+
+    return MetaworkflowConfig.model_validate(load_yaml(path))
+
+
+def load_configs(path: Path) -> Iterator[MetaworkflowConfig]:
+    """Validate the configs of a multi-document file one document at a time."""
+    from .yaml_io import iter_yaml_documents
+
+    for data in iter_yaml_documents(path):
+        yield MetaworkflowConfig.model_validate(data)
 
 
 def dump_config(config: MetaworkflowConfig, path: Path):
-    with open(path, "w") as fh:
-        yaml.safe_dump(config.model_dump(by_alias=True, exclude_none=True), fh, sort_keys=False)
+    from .yaml_io import dump_yaml
+
+    dump_yaml(config.model_dump(mode="json", by_alias=True, exclude_none=True), path)
+
+
+def dump_config_string(config: MetaworkflowConfig) -> str:
+    from .yaml_io import dump_yaml_string
+
+    return dump_yaml_string(config.model_dump(mode="json", by_alias=True, exclude_none=True))
+
+
+def dump_configs(configs: Iterable[MetaworkflowConfig], path: Path):
+    """Write `configs` as one multi-document file."""
+    from .yaml_io import dump_yaml_documents
+
+    dump_yaml_documents((c.model_dump(mode="json", by_alias=True, exclude_none=True) for c in configs), path)
 
 
 def dump_config_dict(config: dict, path: Path):
-    with open(path, "w") as fh:
-        yaml.safe_dump(config, fh, sort_keys=False)
+    from .yaml_io import dump_yaml
+
+    dump_yaml(config, path)
@@ -0,0 +1,340 @@
+"""
+Compact, versioned binary snapshots of a `MetaworkflowGraph`.
+
+Layout of a snapshot file (all integers little-endian):
+
+    header      magic "MPGS", u16 version, u16 flags, u32 #strings, u32 #nodes, u32 #edges,
+                u64 offsets of the sections below
+    strings     u32 offsets[#strings + 1], utf-8 blob; every string is stored once
+    nodes       u32 offsets[#nodes + 1] into a blob of encoded (key, attributes) records
+    edges       CSR adjacency: u32 offsets[#nodes + 1], u32 targets[#edges], in adjacency order
+    edge attrs  u32 offsets[#edges + 1] into a blob of encoded attribute dicts, in CSR order
+    graph attrs one encoded attribute dict
+
+Values are encoded with a one-byte tag followed by a varint payload where possible: strings
+(including dict keys) are indices into the string table, ints are zig-zag varints. `Path`,
+tuples and nested lists/dicts keep their type.
+
+`Snapshot` memory-maps a file and decodes nodes and edges on demand, `to_graph` rebuilds the
+full `networkx.DiGraph`.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path, PurePath
+from typing import Any, Hashable, Iterator
+
+import networkx as nx
+
+from mp_builder.utils import atomic_write
+
+MAGIC = b"MPGS"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIII6Q")
+_F64 = struct.Struct("<d")
+
+# value tags
+NONE, FALSE, TRUE, INT, FLOAT, STR, LIST, TUPLE, DICT, PATH = range(10)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _u32_array(data) -> array:
+    values = array("I")
+    if values.itemsize != 4:
+        values = array("L")
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _u32_bytes(values) -> bytes:
+    data = array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings: list[str] = []
+        self._string_index: dict[str, int] = {}
+
+    def intern(self, s: str) -> int:
+        index = self._string_index.get(s)
+        if index is None:
+            index = self._string_index[s] = len(self.strings)
+            self.strings.append(s)
+        return index
+
+    @staticmethod
+    def varint(out: bytearray, n: int):
+        while n > 0x7F:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def value(self, out: bytearray, v: Any):
+        # bool is checked before int, it is a subclass
+        if v is None:
+            out.append(NONE)
+        elif v is True:
+            out.append(TRUE)
+        elif v is False:
+            out.append(FALSE)
+        elif isinstance(v, int):
+            out.append(INT)
+            self.varint(out, (v << 1) if v >= 0 else ((-v << 1) - 1))
+        elif isinstance(v, float):
+            out.append(FLOAT)
+            out += _F64.pack(v)
+        elif isinstance(v, str):
+            out.append(STR)
+            self.varint(out, self.intern(v))
+        elif isinstance(v, PurePath):
+            out.append(PATH)
+            self.varint(out, self.intern(str(v)))
+        elif isinstance(v, (list, tuple)):
+            out.append(LIST if isinstance(v, list) else TUPLE)
+            self.varint(out, len(v))
+            for item in v:
+                self.value(out, item)
+        elif isinstance(v, dict):
+            out.append(DICT)
+            self.dict(out, v)
+        else:
+            raise SnapshotError(f"Cannot encode value of type {type(v).__name__} in a snapshot")
+
+    def dict(self, out: bytearray, d: dict):
+        self.varint(out, len(d))
+        for key, item in d.items():
+            if not isinstance(key, str):
+                raise SnapshotError(f"Attribute keys must be strings, got {key!r}")
+            self.varint(out, self.intern(key))
+            self.value(out, item)
+
+
+def encode(G: nx.DiGraph) -> bytes:
+    """Serialize `G` into the snapshot format."""
+    encoder = _Encoder()
+    index = {node: i for i, node in enumerate(G)}
+
+    node_blob, node_offsets = bytearray(), [0]
+    for node, attrs in G.nodes(data=True):
+        encoder.value(node_blob, node)
+        encoder.dict(node_blob, attrs)
+        node_offsets.append(len(node_blob))
+
+    csr_offsets, csr_targets = [0], []
+    edge_blob, edge_offsets = bytearray(), [0]
+    for node, neighbours in G.adjacency():
+        for target, attrs in neighbours.items():
+            csr_targets.append(index[target])
+            encoder.dict(edge_blob, attrs)
+            edge_offsets.append(len(edge_blob))
+        csr_offsets.append(len(csr_targets))
+
+    graph_blob = bytearray()
+    encoder.dict(graph_blob, G.graph)
+
+    encoded = [s.encode() for s in encoder.strings]
+    string_offsets = [0]
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+
+    sections = [
+        _u32_bytes(string_offsets) + b"".join(encoded),
+        _u32_bytes(node_offsets) + bytes(node_blob),
+        _u32_bytes(csr_offsets) + _u32_bytes(csr_targets),
+        _u32_bytes(edge_offsets) + bytes(edge_blob),
+        bytes(graph_blob),
+    ]
+    offsets, position = [], _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    offsets.append(position)
+
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(encoded), len(G), len(csr_targets), *offsets)
+    return header + b"".join(sections)
+
+
+def save_snapshot(G: nx.DiGraph, path: Path | str):
+    atomic_write(path, encode(G))
+
+
+class Snapshot:
+    """
+    Read access to a snapshot, memory-mapped from a file or from bytes.
+
+    Nothing is decoded up front: strings, nodes and edge attributes are decoded when accessed.
+    """
+
+    def __init__(self, data):
+        self._buffer = memoryview(data)
+        if len(self._buffer) < _HEADER.size:
+            raise SnapshotError("Truncated snapshot header")
+
+        magic, version, _flags, n_strings, n_nodes, n_edges, *offsets = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise SnapshotError("Not a mp-builder graph snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}, expected {VERSION}")
+        if offsets[-1] != len(self._buffer):
+            raise SnapshotError("Truncated snapshot")
+
+        self.n_nodes = n_nodes
+        self.n_edges = n_edges
+        strings, nodes, edges, edge_attrs, graph_attrs, end = offsets
+
+        self._string_offsets = _u32_array(self._buffer[strings:strings + 4 * (n_strings + 1)])
+        self._string_blob = strings + 4 * (n_strings + 1)
+        self._strings: list[str | None] = [None] * n_strings
+
+        self._node_offsets = _u32_array(self._buffer[nodes:nodes + 4 * (n_nodes + 1)])
+        self._node_blob = nodes + 4 * (n_nodes + 1)
+
+        self._csr_offsets = _u32_array(self._buffer[edges:edges + 4 * (n_nodes + 1)])
+        targets = edges + 4 * (n_nodes + 1)
+        self._csr_targets = _u32_array(self._buffer[targets:targets + 4 * n_edges])
+
+        self._edge_offsets = _u32_array(self._buffer[edge_attrs:edge_attrs + 4 * (n_edges + 1)])
+        self._edge_blob = edge_attrs + 4 * (n_edges + 1)
+
+        self._graph_attrs = graph_attrs
+        self._mmap = None
+
+    @classmethod
+    def open(cls, path: Path | str) -> "Snapshot":
+        with open(path, "rb") as fh:
+            if not os.fstat(fh.fileno()).st_size:
+                # empty files cannot be mapped
+                raise SnapshotError("Truncated snapshot header")
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        snapshot = cls(mapped)
+        snapshot._mmap = mapped
+        return snapshot
+
+    def close(self):
+        """Release the mapping, decoded values stay valid."""
+        self._string_offsets = self._node_offsets = self._csr_offsets = None
+        self._csr_targets = self._edge_offsets = None
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    # ---- decoding ----
+    def string(self, i: int) -> str:
+        s = self._strings[i]
+        if s is None:
+            start = self._string_blob + self._string_offsets[i]
+            end = self._string_blob + self._string_offsets[i + 1]
+            s = self._strings[i] = str(self._buffer[start:end], "utf-8")
+        return s
+
+    def _varint(self, pos: int) -> tuple[int, int]:
+        buffer = self._buffer
+        n = shift = 0
+        while True:
+            byte = buffer[pos]
+            pos += 1
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return n, pos
+            shift += 7
+
+    def _value(self, pos: int) -> tuple[Any, int]:
+        tag = self._buffer[pos]
+        pos += 1
+        if tag == STR:
+            i, pos = self._varint(pos)
+            return self.string(i), pos
+        if tag == NONE:
+            return None, pos
+        if tag == TRUE:
+            return True, pos
+        if tag == FALSE:
+            return False, pos
+        if tag == INT:
+            n, pos = self._varint(pos)
+            return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+        if tag == FLOAT:
+            return _F64.unpack_from(self._buffer, pos)[0], pos + _F64.size
+        if tag == DICT:
+            return self._dict(pos)
+        if tag == LIST or tag == TUPLE:
+            length, pos = self._varint(pos)
+            items = []
+            for _ in range(length):
+                item, pos = self._value(pos)
+                items.append(item)
+            return (items if tag == LIST else tuple(items)), pos
+        if tag == PATH:
+            i, pos = self._varint(pos)
+            return Path(self.string(i)), pos
+        raise SnapshotError(f"Unknown value tag {tag} at offset {pos - 1}")
+
+    def _dict(self, pos: int) -> tuple[dict, int]:
+        length, pos = self._varint(pos)
+        d = {}
+        for _ in range(length):
+            key, pos = self._varint(pos)
+            d[self.string(key)], pos = self._value(pos)
+        return d, pos
+
+    # ---- access ----
+    def node(self, i: int) -> tuple[Hashable, dict]:
+        """Key and attributes of the `i`-th node."""
+        key, pos = self._value(self._node_blob + self._node_offsets[i])
+        attrs, _ = self._dict(pos)
+        return key, attrs
+
+    def node_key(self, i: int) -> Hashable:
+        return self._value(self._node_blob + self._node_offsets[i])[0]
+
+    def successors(self, i: int) -> array:
+        """Indices of the successors of the `i`-th node, in adjacency order."""
+        return self._csr_targets[self._csr_offsets[i]:self._csr_offsets[i + 1]]
+
+    def edges(self) -> Iterator[tuple[int, int, dict]]:
+        """All edges as (source index, target index, attributes), in adjacency order."""
+        targets, offsets = self._csr_targets, self._csr_offsets
+        for source in range(self.n_nodes):
+            for e in range(offsets[source], offsets[source + 1]):
+                yield source, targets[e], self._dict(self._edge_blob + self._edge_offsets[e])[0]
+
+    def graph_attrs(self) -> dict:
+        return self._dict(self._graph_attrs)[0]
+
+    def to_graph(self) -> nx.DiGraph:
+        G = nx.DiGraph()
+        G.graph.update(self.graph_attrs())
+
+        keys = []
+        for i in range(self.n_nodes):
+            key, attrs = self.node(i)
+            keys.append(key)
+            G.add_node(key, **attrs)
+        G.add_edges_from((keys[u], keys[v], attrs) for u, v, attrs in self.edges())
+        return G
+
+
+def load_snapshot(path: Path | str) -> nx.DiGraph:
+    with Snapshot.open(path) as snapshot:
+        return snapshot.to_graph()
@@ -0,0 +1,46 @@
+"""
+YAML I/O for configs, backed by libyaml when PyYAML was built with it.
+
+Files are parsed from and emitted to the open file object, so multi-document
+configs are processed one document at a time.
+"""
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+    LIBYAML = False
+
+
+def load_yaml(path: Path | str) -> Any:
+    """Load a single-document YAML file."""
+    with open(path, "rb") as fh:
+        return yaml.load(fh, Loader=SafeLoader)
+
+
+def iter_yaml_documents(path: Path | str) -> Iterator[Any]:
+    """Lazily load the documents of a (multi-document) YAML file, empty documents are skipped."""
+    with open(path, "rb") as fh:
+        for document in yaml.load_all(fh, Loader=SafeLoader):
+            if document is not None:
+                yield document
+
+
+def dump_yaml(data: Any, path: Path | str, sort_keys: bool = False):
+    with open(path, "w") as fh:
+        yaml.dump(data, fh, Dumper=SafeDumper, sort_keys=sort_keys)
+
+
+def dump_yaml_string(data: Any, sort_keys: bool = False) -> str:
+    return yaml.dump(data, Dumper=SafeDumper, sort_keys=sort_keys)
+
+
+def dump_yaml_documents(documents: Iterable[Any], path: Path | str, sort_keys: bool = False):
+    """Write `documents` as a multi-document YAML file, consuming the iterable as it is written."""
+    with open(path, "w") as fh:
+        yaml.dump_all(documents, fh, Dumper=SafeDumper, sort_keys=sort_keys, explicit_start=True)
@@ -0,0 +1,10 @@
+from .events import ExecutionEvent, NodeQueued, NodeStarted, NodeFinished, NodeBlocked, NodeCached
+from .resources import Resources, ResourcePool, host_resources, parse_memory
+from .runners import NodeTask, Runner, NextflowRunner, ScriptRunner
+from .scheduler import (
+    Scheduler, FifoScheduler, CriticalPathScheduler, Simulation,
+    critical_path, critical_path_lengths, make_scheduler, simulate,
+)
+from .resume import ResumeCache, node_keys
+from .telemetry import EventLog, NodeRecord, load_run, report, plot_gantt, apply_runtimes
+from .executor import DagExecutor, execute
@@ -0,0 +1,76 @@
+"""
+Progress of a meta-pipeline run, in the order it happened.
+"""
+from dataclasses import dataclass, asdict
+from typing import Hashable, Optional
+
+
+@dataclass(frozen=True)
+class NodeQueued:
+    """All `upstream` nodes of `node` have finished, it waits for a slot."""
+    node: Hashable
+    time: float
+    upstream: tuple = ()
+
+    def to_dict(self) -> dict:
+        return {"event": "queued", **asdict(self)}
+
+
+@dataclass(frozen=True)
+class NodeStarted:
+    node: Hashable
+    time: float
+    pid: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {"event": "started", **asdict(self)}
+
+
+@dataclass(frozen=True)
+class NodeFinished:
+    """
+    A node's process exited, `returncode` is None if it could not be started, see `error`.
+    `peak_rss` is the highest sampled resident memory of its process tree, in bytes.
+    """
+    node: Hashable
+    time: float
+    returncode: Optional[int]
+    seconds: float
+    error: Optional[str] = None
+    peak_rss: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    def to_dict(self) -> dict:
+        return {"event": "finished", **asdict(self), "ok": self.ok}
+
+
+@dataclass(frozen=True)
+class NodeBlocked:
+    """`node` is not run because the upstream node `failed` did not succeed."""
+    node: Hashable
+    time: float
+    failed: Hashable
+
+    ok = False
+
+    def to_dict(self) -> dict:
+        return {"event": "blocked", **asdict(self)}
+
+
+@dataclass(frozen=True)
+class NodeCached:
+    """`node` is skipped, it already succeeded with the same inputs in an earlier run."""
+    node: Hashable
+    time: float
+    key: str
+
+    ok = True
+
+    def to_dict(self) -> dict:
+        return {"event": "cached", **asdict(self)}
+
+
+ExecutionEvent = NodeQueued | NodeStarted | NodeFinished | NodeBlocked | NodeCached
@@ -0,0 +1,211 @@
+"""
+Run the workflows of a meta-pipeline in dependency order.
+"""
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, Optional
+
+from mp_builder.config import MetaworkflowGraph
+from .events import ExecutionEvent, NodeQueued, NodeStarted, NodeFinished, NodeBlocked, NodeCached
+from .resume import ResumeCache, node_keys
+from .runners import Runner, NodeTask
+from .scheduler import Scheduler, CriticalPathScheduler
+from .resources import Resources, ResourcePool
+from .telemetry import PeakRss
+
+logger = logging.getLogger()
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class DagExecutor:
+    """
+    Launch every workflow node as soon as all its predecessors have succeeded, with at most
+    `max_concurrency` nodes running at a time.
+
+    Ready nodes are launched in the order of `scheduler`, by default longest critical path first.
+    With a resource `budget`, a ready node is only launched while its declared `cpus` and `memory`
+    fit next to the running nodes; the first ready node that fits is launched (first-fit).
+    A failed node blocks its descendants, independent branches keep running. With a `resume`
+    cache, nodes that already succeeded with the same inputs are skipped. Progress is
+    reported as `ExecutionEvent`s to the `on_event` callbacks; the memory of running nodes is
+    sampled every `rss_interval` seconds for their `NodeFinished.peak_rss`.
+    """
+
+    def __init__(
+        self,
+        mg: MetaworkflowGraph,
+        runner: Runner,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        workdir: Path | str = "mp-builder-work",
+        base_dir: Path | str = ".",
+        scheduler: Optional[Scheduler] = None,
+        resume: Optional[ResumeCache] = None,
+        budget: Optional[Resources] = None,
+        rss_interval: Optional[float] = 1.0,
+        on_event: Iterable[Callable[[ExecutionEvent], None]] = (),
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.mg = mg
+        self.runner = runner
+        self.max_concurrency = max_concurrency
+        self.workdir = Path(workdir).resolve()
+        self.base_dir = Path(base_dir).resolve()
+        self.scheduler = scheduler if scheduler is not None else CriticalPathScheduler(mg.G)
+        self.resume = resume
+        self.budget = budget
+        self.rss_interval = rss_interval
+        self._pool: Optional[ResourcePool] = None
+        self.on_event = list(on_event)
+
+        # node -> final event
+        self.results: dict[Hashable, NodeFinished | NodeBlocked | NodeCached] = {}
+        self.keys: dict[Hashable, str] = {}
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.results.values())
+
+    def emit(self, event: ExecutionEvent):
+        for callback in self.on_event:
+            callback(event)
+
+    def task(self, node: Hashable) -> NodeTask:
+        G = self.mg.G
+        return NodeTask(
+            node=node,
+            attrs=G.nodes[node],
+            transitions=[G.edges[u, node].get("data") or {} for u in G.pred[node]],
+            workdir=self.workdir / str(node),
+            base_dir=self.base_dir,
+            resources=self._pool.requirement(node, G.nodes[node]) if self._pool is not None else None,
+        )
+
+    def _initial(self) -> dict[Hashable, int]:
+        """Number of unfinished predecessors of every workflow node, the nodes without any are scheduled."""
+        G, root = self.mg.G, MetaworkflowGraph.ROOT_NODE
+        waiting = {n: sum(1 for u in G.pred[n] if u != root) for n in G if n != root}
+        for node in self.mg.execution_order():
+            if waiting[node] == 0:
+                self._queue(node)
+        return waiting
+
+    def _queue(self, node: Hashable):
+        upstream = tuple(u for u in self.mg.G.pred[node] if u != MetaworkflowGraph.ROOT_NODE)
+        self.emit(NodeQueued(node, time.time(), upstream))
+        self.scheduler.push(node)
+
+    async def _run_node(self, node: Hashable) -> NodeFinished:
+        start = time.time()
+        monitor: Optional[PeakRss] = None
+        sampling: Optional[asyncio.Task] = None
+
+        def started(process):
+            nonlocal monitor, sampling
+            self.emit(NodeStarted(node, time.time(), process.pid))
+            if self.rss_interval:
+                monitor = PeakRss(process.pid, self.rss_interval)
+                sampling = asyncio.create_task(monitor.watch())
+
+        try:
+            returncode, error = await self.runner.run(self.task(node), on_start=started), None
+        except OSError as e:
+            # e.g. the runner's executable is not installed
+            returncode, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            if sampling is not None:
+                sampling.cancel()
+        end = time.time()
+        peak_rss = monitor.peak if monitor is not None else None
+        return NodeFinished(node, end, returncode, round(end - start, 6), error, peak_rss)
+
+    def _block_descendants(self, failed: Hashable, waiting: dict):
+        G = self.mg.G
+        stack = list(G.succ[failed])
+        while stack:
+            node = stack.pop()
+            if node in self.results:
+                continue
+            self.results[node] = event = NodeBlocked(node, time.time(), failed)
+            waiting.pop(node, None)
+            self.emit(event)
+            stack.extend(G.succ[node])
+
+    def _is_cached(self, node: Hashable) -> bool:
+        return self.resume is not None and self.keys[node] in self.resume
+
+    def _admit(self, node: Hashable) -> bool:
+        # cached nodes are not run, they need no resources
+        return self._is_cached(node) or self._pool.fits(node, self.mg.G.nodes[node])
+
+    def _complete(self, node: Hashable, event: NodeFinished | NodeCached, waiting: dict):
+        if self._pool is not None:
+            self._pool.release(node)
+        self.results[node] = event
+        self.emit(event)
+
+        if not event.ok:
+            logger.warning(f"Workflow {node} failed: {event.error or f'exit code {event.returncode}'}")
+            self._block_descendants(node, waiting)
+            return
+        if self.resume is not None and isinstance(event, NodeFinished):
+            self.resume.put(self.keys[node], node, self.mg.G.nodes[node], event.seconds)
+
+        for successor in self.mg.G.succ[node]:
+            if successor in waiting:
+                waiting[successor] -= 1
+                if waiting[successor] == 0:
+                    self._queue(successor)
+
+    async def run(self) -> bool:
+        """Run all workflow nodes, returns True if all of them succeeded."""
+        self.results = {}
+        self.keys = node_keys(self.mg.G, self.base_dir) if self.resume is not None else {}
+        self._pool = ResourcePool(self.budget) if self.budget is not None else None
+        ready = self.scheduler
+        waiting = self._initial()
+        running: dict[asyncio.Task, Hashable] = {}
+
+        try:
+            while ready or running:
+                while ready and len(running) < self.max_concurrency:
+                    if self._pool is None:
+                        node = ready.pop()
+                    else:
+                        # with nothing running the head of the queue is always admitted
+                        node = ready.pop_first(lambda n: not running or self._admit(n))
+                        if node is None:
+                            # nothing fits until a running node finishes
+                            break
+                    if self._is_cached(node):
+                        # cached nodes do not take a slot, their successors may become ready right away
+                        self._complete(node, NodeCached(node, time.time(), self.keys[node]), waiting)
+                        continue
+                    if self._pool is not None:
+                        self._pool.acquire(node, self.mg.G.nodes[node])
+                    running[asyncio.create_task(self._run_node(node))] = node
+                if not running:
+                    continue
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    node = running.pop(finished)
+                    self._complete(node, finished.result(), waiting)
+        finally:
+            # cancelled, e.g. by Ctrl+C: the runners stop their processes
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return self.ok
+
+
+def execute(mg: MetaworkflowGraph, runner: Runner, **kwargs) -> DagExecutor:
+    """Run `mg` to completion on a new event loop."""
+    executor = DagExecutor(mg, runner, **kwargs)
+    asyncio.run(executor.run())
+    return executor
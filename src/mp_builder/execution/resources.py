@@ -0,0 +1,98 @@
+"""
+CPU and memory budgets for running several workflows on one machine.
+
+Workflow nodes may declare `cpus` and `memory` attributes. A `ResourcePool` admits a node only
+while the declared requirements of all running nodes fit the machine budget. Nodes without
+declarations require nothing, they are only limited by the executor's concurrency.
+"""
+import os
+import logging
+from typing import Hashable, NamedTuple, Optional
+
+from mp_builder.utils import parse_memory, format_memory
+
+logger = logging.getLogger()
+
+
+class Resources(NamedTuple):
+    cpus: float = 0
+    memory: int = 0
+
+    def __add__(self, other: "Resources") -> "Resources":
+        return Resources(self.cpus + other.cpus, self.memory + other.memory)
+
+    def __sub__(self, other: "Resources") -> "Resources":
+        return Resources(self.cpus - other.cpus, self.memory - other.memory)
+
+    def fits(self, budget: "Resources") -> bool:
+        return self.cpus <= budget.cpus and self.memory <= budget.memory
+
+    @classmethod
+    def of(cls, attrs: dict) -> "Resources":
+        """The declared requirements of a node."""
+        return cls(float(attrs.get("cpus") or 0), parse_memory(attrs.get("memory")))
+
+
+def host_resources() -> Resources:
+    """CPUs available to this process and the physical memory of the host."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        memory = 0
+    return Resources(cpus, memory)
+
+
+class ResourcePool:
+    """
+    Bookkeeping of the budget shared by the running nodes.
+
+    A node that needs more than the whole budget is clamped to it, so it still runs, but alone.
+    Any node fits an empty pool.
+    """
+
+    def __init__(self, budget: Resources):
+        self.budget = budget
+        self._held: dict[Hashable, Resources] = {}
+        self._requirements: dict[Hashable, Resources] = {}
+
+    @property
+    def in_use(self) -> Resources:
+        # summed from what is held rather than kept as a running total, so fractional CPUs
+        # acquired and released in a different order leave no rounding error behind
+        return sum(self._held.values(), Resources())
+
+    @property
+    def free(self) -> Resources:
+        return self.budget - self.in_use
+
+    def requirement(self, node: Hashable, attrs: dict) -> Resources:
+        required = self._requirements.get(node)
+        if required is not None:
+            return required
+
+        required = Resources.of(attrs)
+        if not required.fits(self.budget):
+            logger.warning(
+                f"Workflow {node} requires {required.cpus:g} CPUs and {format_memory(required.memory)}, "
+                f"more than the budget of {self.budget.cpus:g} CPUs and {format_memory(self.budget.memory)}"
+            )
+            required = Resources(min(required.cpus, self.budget.cpus), min(required.memory, self.budget.memory))
+        self._requirements[node] = required
+        return required
+
+    def fits(self, node: Hashable, attrs: dict) -> bool:
+        return not self._held or self.requirement(node, attrs).fits(self.free)
+
+    def acquire(self, node: Hashable, attrs: dict) -> Optional[Resources]:
+        """Reserve the requirements of `node`, None if they do not fit right now."""
+        if not self.fits(node, attrs):
+            return None
+        required = self._held[node] = self.requirement(node, attrs)
+        return required
+
+    def release(self, node: Hashable):
+        self._held.pop(node, None)
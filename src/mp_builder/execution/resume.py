@@ -0,0 +1,127 @@
+"""
+Meta-pipeline level resume: workflows that already succeeded with the same inputs are skipped.
+
+The key of a node hashes everything its run depends on: the node id, which names its output
+directory, its pipeline (`name`, `version`, `pipeline_location`), the `params` of its incoming
+transitions, the contents of their `params_file` and `config_file`, and the keys of its upstream
+nodes. A changed upstream node hence invalidates all its descendants.
+"""
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Hashable, Iterator, Optional
+
+import networkx as nx
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.utils import atomic_write
+
+logger = logging.getLogger()
+
+DEFAULT_CACHE_DIR = Path(".mp-builder") / "resume"
+
+# node attributes that identify what is run
+KEY_ATTRS = ("name", "version", "pipeline_location")
+
+
+def _file_digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        # a missing file changes the key once it appears
+        return "missing"
+
+
+def node_key(node: Hashable, attrs: dict, transitions: list[dict], upstream: list[str], base_dir: Path) -> str:
+    inputs = {
+        # siblings running the same pipeline with the same inputs still write to their own outputs
+        "node": str(node),
+        "pipeline": {key: attrs.get(key) for key in KEY_ATTRS},
+        "transitions": [
+            {
+                "params": t.get("params"),
+                "params_file": _file_digest(base_dir / t["params_file"]) if t.get("params_file") else None,
+                "config_file": _file_digest(base_dir / t["config_file"]) if t.get("config_file") else None,
+            }
+            for t in transitions
+        ],
+        "upstream": upstream,
+    }
+    data = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def node_keys(G: nx.DiGraph, base_dir: Path | str = ".") -> dict[Hashable, str]:
+    """The resume key of every workflow node of `G`."""
+    base_dir = Path(base_dir).resolve()
+    root = MetaworkflowGraph.ROOT_NODE
+    keys = {}
+    for node in nx.topological_sort(G):
+        if node == root:
+            continue
+        predecessors = list(G.pred[node])
+        keys[node] = node_key(
+            node,
+            G.nodes[node],
+            [G.edges[u, node].get("data") or {} for u in predecessors],
+            [keys[u] for u in predecessors if u != root],
+            base_dir,
+        )
+    return keys
+
+
+class ResumeCache:
+    """
+    Completed workflow runs, one small JSON record per key in `cache_dir`.
+    """
+
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key)) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable resume cache entry {self._path(key)}: {e}")
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def put(self, key: str, node: Hashable, attrs: dict, seconds: float):
+        entry = {
+            "key": key,
+            "node": str(node),
+            "name": attrs.get("name"),
+            "version": attrs.get("version"),
+            "finished_at": time.time(),
+            "seconds": seconds,
+        }
+        atomic_write(self._path(key), json.dumps(entry))
+
+    def entries(self) -> Iterator[dict]:
+        if not self.cache_dir.is_dir():
+            return
+        for path in sorted(self.cache_dir.glob("*.json")):
+            entry = self.get(path.stem)
+            if entry is not None:
+                yield entry
+
+    def clean(self, keys: Optional[set[str]] = None) -> int:
+        """Remove the entries of `keys`, all entries if not given. Returns the number removed."""
+        removed = 0
+        if not self.cache_dir.is_dir():
+            return removed
+        for path in self.cache_dir.glob("*.json"):
+            if keys is None or path.stem in keys:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
@@ -0,0 +1,176 @@
+"""
+Runners launch the process of a single workflow node.
+
+`NextflowRunner` runs the pipeline with `nextflow run`, `ScriptRunner` runs a local script in
+its place, e.g. to dry-run a meta-pipeline or to test the executor without Nextflow.
+"""
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+from mp_builder.utils import format_memory
+from .resources import Resources
+
+LOG_FILE = "mp-builder.log"
+# Nextflow config limiting the local executor to the resources granted to the node
+RESOURCES_CONFIG = "mp-builder-resources.config"
+
+
+@dataclass
+class NodeTask:
+    """
+    Everything a runner needs to launch a workflow node.
+
+    `transitions` are the transitions leading into the node (the `data` of its in-edges), in the
+    order of its predecessors. Relative paths in them are resolved against `base_dir`, the
+    directory of the config. `resources` are the CPUs and memory granted to the node by the
+    executor's budget, if it has one.
+    """
+    node: Hashable
+    attrs: dict
+    transitions: list[dict] = field(default_factory=list)
+    workdir: Path = Path(".")
+    base_dir: Path = Path(".")
+    resources: Optional[Resources] = None
+
+    @property
+    def pipeline(self) -> str:
+        # nf-core pipelines are resolved by name, other pipelines need their repository
+        if self.attrs.get("is_nfcore") or not self.attrs.get("pipeline_location"):
+            return self.attrs["name"]
+        return self.attrs["pipeline_location"]
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.attrs.get("version")
+
+    def params(self) -> dict[str, Any]:
+        """The params of all incoming transitions, later transitions win."""
+        params = {}
+        for transition in self.transitions:
+            for entry in transition.get("params") or []:
+                params.update(entry)
+        return params
+
+    def _paths(self, key: str) -> list[Path]:
+        return [self.base_dir / t[key] for t in self.transitions if t.get(key)]
+
+    def params_files(self) -> list[Path]:
+        return self._paths("params_file")
+
+    def config_files(self) -> list[Path]:
+        return self._paths("config_file")
+
+
+class Runner:
+    """
+    Launch the process of a node in its own working directory, with its output in `LOG_FILE`.
+
+    Subclasses define the command line in `command` and may add to the environment.
+    """
+
+    def command(self, task: NodeTask) -> list[str]:
+        raise NotImplementedError
+
+    def environment(self, task: NodeTask) -> dict[str, str]:
+        return {}
+
+    async def run(self, task: NodeTask, on_start: Optional[Callable[[asyncio.subprocess.Process], None]] = None) -> int:
+        """Run `task` to completion and return the exit code. `on_start` is called once the process runs."""
+        task.workdir.mkdir(parents=True, exist_ok=True)
+        with open(task.workdir / LOG_FILE, "wb") as log:
+            process = await asyncio.create_subprocess_exec(
+                *self.command(task),
+                cwd=task.workdir,
+                env={**os.environ, **self.environment(task)},
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=log,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            if on_start is not None:
+                on_start(process)
+            try:
+                return await process.wait()
+            except asyncio.CancelledError:
+                await self.stop(process)
+                raise
+
+    async def stop(self, process: asyncio.subprocess.Process, grace: float = 10):
+        """Terminate `process`, and kill it if it has not exited after `grace` seconds."""
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), grace)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+
+class NextflowRunner(Runner):
+    """
+    `nextflow run` the node's pipeline. Every node is launched in its own directory, concurrent
+    Nextflow runs must not share a launch directory.
+    """
+
+    def __init__(self, executable: str = "nextflow", extra_args: tuple[str, ...] = (), resume: bool = False):
+        self.executable = executable
+        self.extra_args = tuple(extra_args)
+        # re-runs of a node reuse the task cache of its earlier runs in the same launch directory
+        self.resume = resume
+
+    def command(self, task: NodeTask) -> list[str]:
+        command = [self.executable, "run", task.pipeline]
+        if task.version:
+            command += ["-r", task.version]
+        for config_file in task.config_files():
+            command += ["-c", str(config_file)]
+        if task.resources is not None and (task.resources.cpus or task.resources.memory):
+            command += ["-c", str(self.write_resources_config(task))]
+        for params_file in task.params_files():
+            command += ["-params-file", str(params_file)]
+        for key, value in task.params().items():
+            command += [f"--{key}", str(value)]
+        if self.resume:
+            command.append("-resume")
+        return command + list(self.extra_args)
+
+    def write_resources_config(self, task: NodeTask) -> Path:
+        """Keep the tasks of the pipeline within the resources granted to the node."""
+        lines = ["executor {"]
+        if task.resources.cpus:
+            lines.append(f"    cpus = {task.resources.cpus:g}")
+        if task.resources.memory:
+            lines.append(f"    memory = '{format_memory(task.resources.memory)}'")
+        lines.append("}")
+
+        task.workdir.mkdir(parents=True, exist_ok=True)
+        path = task.workdir / RESOURCES_CONFIG
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+
+class ScriptRunner(Runner):
+    """
+    Run a local script for every node, called with the node id. The node is described in
+    `MP_BUILDER_*` environment variables.
+    """
+
+    def __init__(self, script: Path | str):
+        self.script = Path(script).resolve()
+
+    def command(self, task: NodeTask) -> list[str]:
+        return [str(self.script), str(task.node)]
+
+    def environment(self, task: NodeTask) -> dict[str, str]:
+        return {
+            "MP_BUILDER_NODE": str(task.node),
+            "MP_BUILDER_PIPELINE": task.pipeline,
+            "MP_BUILDER_VERSION": task.version or "",
+            "MP_BUILDER_PARAMS": json.dumps(task.params(), default=str),
+            "MP_BUILDER_CPUS": f"{task.resources.cpus:g}" if task.resources else "",
+            "MP_BUILDER_MEMORY": str(task.resources.memory) if task.resources else "",
+        }
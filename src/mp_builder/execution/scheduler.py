@@ -0,0 +1,235 @@
+"""
+Which ready node to launch next, and offline simulation of whole runs.
+
+Runtimes are taken from the `runtime_estimate` node attribute (seconds), nodes without one
+count as `default_runtime`.
+"""
+import heapq
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional
+
+import networkx as nx
+
+from mp_builder.config import MetaworkflowGraph
+from .resources import Resources, ResourcePool
+
+RUNTIME_ATTR = "runtime_estimate"
+DEFAULT_RUNTIME = 1.0
+
+
+def workflow_graph(G: nx.DiGraph) -> nx.DiGraph:
+    """`G` without the root node, which is not run."""
+    if MetaworkflowGraph.ROOT_NODE in G:
+        return G.subgraph(n for n in G if n != MetaworkflowGraph.ROOT_NODE)
+    return G
+
+
+def runtime(attrs: dict, default_runtime: float = DEFAULT_RUNTIME) -> float:
+    value = attrs.get(RUNTIME_ATTR)
+    return default_runtime if value is None else float(value)
+
+
+def critical_path_lengths(G: nx.DiGraph, default_runtime: float = DEFAULT_RUNTIME) -> dict[Hashable, float]:
+    """
+    For every node, the runtime of the longest chain of nodes starting at it (its "bottom level").
+    A run cannot finish earlier than this after the node is launched.
+    """
+    G = workflow_graph(G)
+    lengths = {}
+    for node in reversed(list(nx.topological_sort(G))):
+        tail = max((lengths[s] for s in G.succ[node]), default=0.0)
+        lengths[node] = runtime(G.nodes[node], default_runtime) + tail
+    return lengths
+
+
+def critical_path(G: nx.DiGraph, default_runtime: float = DEFAULT_RUNTIME) -> tuple[float, list[Hashable]]:
+    """Runtime and nodes of the longest chain in `G`, the lower bound of its makespan."""
+    lengths = critical_path_lengths(G, default_runtime)
+    if not lengths:
+        return 0.0, []
+    G = workflow_graph(G)
+    node = max((n for n in G if G.in_degree(n) == 0), key=lengths.__getitem__)
+    path = [node]
+    while G.succ[node]:
+        node = max(G.succ[node], key=lengths.__getitem__)
+        path.append(node)
+    return lengths[path[0]], path
+
+
+class Scheduler:
+    """The queue of ready nodes of a run."""
+
+    def push(self, node: Hashable):
+        raise NotImplementedError
+
+    def pop(self) -> Hashable:
+        raise NotImplementedError
+
+    def pop_first(self, admit: Callable[[Hashable], bool]) -> Optional[Hashable]:
+        """
+        Pop the first node in launch order that `admit` accepts, None if there is none.
+        The other nodes keep their order.
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class FifoScheduler(Scheduler):
+    """Launch nodes in the order they became ready."""
+
+    def __init__(self):
+        self._ready = deque()
+
+    def push(self, node: Hashable):
+        self._ready.append(node)
+
+    def pop(self) -> Hashable:
+        return self._ready.popleft()
+
+    def pop_first(self, admit: Callable[[Hashable], bool]) -> Optional[Hashable]:
+        for i, node in enumerate(self._ready):
+            if admit(node):
+                del self._ready[i]
+                return node
+        return None
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+
+class CriticalPathScheduler(Scheduler):
+    """
+    Launch the ready node with the longest critical path first, so long chains start early and
+    short side branches fill the remaining slots. Ties are launched in the order they became ready.
+    """
+
+    def __init__(self, G: nx.DiGraph, default_runtime: float = DEFAULT_RUNTIME):
+        self.priority = critical_path_lengths(G, default_runtime)
+        self._ready: list[tuple[float, int, Hashable]] = []
+        self._counter = itertools.count()
+
+    def push(self, node: Hashable):
+        heapq.heappush(self._ready, (-self.priority.get(node, 0.0), next(self._counter), node))
+
+    def pop(self) -> Hashable:
+        return heapq.heappop(self._ready)[2]
+
+    def pop_first(self, admit: Callable[[Hashable], bool]) -> Optional[Hashable]:
+        skipped, found = [], None
+        while self._ready:
+            entry = heapq.heappop(self._ready)
+            if admit(entry[2]):
+                found = entry[2]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._ready, entry)
+        return found
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+
+POLICIES = {
+    "critical-path": CriticalPathScheduler,
+    "fifo": lambda G, default_runtime=DEFAULT_RUNTIME: FifoScheduler(),
+}
+
+
+def make_scheduler(policy: str, G: nx.DiGraph, default_runtime: float = DEFAULT_RUNTIME) -> Scheduler:
+    try:
+        return POLICIES[policy](G, default_runtime)
+    except KeyError:
+        raise ValueError(f"Unknown scheduling policy {policy!r}, expected one of {', '.join(POLICIES)}") from None
+
+
+@dataclass
+class Simulation:
+    """Predicted run of a graph, with `schedule` holding (node, slot, start, end) tuples."""
+    max_concurrency: int
+    makespan: float
+    busy: float
+    critical_path: float
+    schedule: list[tuple[Hashable, int, float, float]] = field(default_factory=list)
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the slot time spent running nodes."""
+        capacity = self.makespan * self.max_concurrency
+        return self.busy / capacity if capacity else 0.0
+
+    @property
+    def lower_bound(self) -> float:
+        """No schedule on `max_concurrency` slots can finish before this."""
+        return max(self.critical_path, self.busy / self.max_concurrency)
+
+    def to_dict(self) -> dict:
+        return {
+            "jobs": self.max_concurrency,
+            "makespan": round(self.makespan, 6),
+            "utilization": round(self.utilization, 4),
+            "lower_bound": round(self.lower_bound, 6),
+            "critical_path": round(self.critical_path, 6),
+        }
+
+
+def simulate(
+    G: nx.DiGraph,
+    max_concurrency: int,
+    policy: str = "critical-path",
+    default_runtime: float = DEFAULT_RUNTIME,
+    budget: Optional[Resources] = None,
+) -> Simulation:
+    """
+    Predict the run of `G` on `max_concurrency` slots, and within the resource `budget` if given,
+    with the `DagExecutor` launch rules, assuming every node takes its estimated runtime.
+    Nothing is run.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    W = workflow_graph(G)
+    scheduler = make_scheduler(policy, W, default_runtime)
+    waiting = {n: W.in_degree(n) for n in W}
+    for node in nx.topological_sort(W):
+        if waiting[node] == 0:
+            scheduler.push(node)
+
+    pool = ResourcePool(budget) if budget is not None else None
+    now, busy = 0.0, 0.0
+    free_slots = list(range(max_concurrency))
+    running: list[tuple[float, int, Hashable]] = []  # (end, slot, node)
+    schedule = []
+    while scheduler or running:
+        while scheduler and free_slots:
+            if pool is None:
+                node = scheduler.pop()
+            else:
+                # with nothing running the head of the queue is always admitted
+                node = scheduler.pop_first(lambda n: not running or pool.fits(n, W.nodes[n]))
+                if node is None:
+                    break
+                pool.acquire(node, W.nodes[node])
+            duration = runtime(W.nodes[node], default_runtime)
+            slot = heapq.heappop(free_slots)
+            heapq.heappush(running, (now + duration, slot, node))
+            schedule.append((node, slot, now, now + duration))
+            busy += duration
+
+        # advance to the next completion, nodes finishing at the same time free their slots together
+        now = running[0][0]
+        while running and running[0][0] == now:
+            _, slot, node = heapq.heappop(running)
+            heapq.heappush(free_slots, slot)
+            if pool is not None:
+                pool.release(node)
+            for successor in W.succ[node]:
+                waiting[successor] -= 1
+                if waiting[successor] == 0:
+                    scheduler.push(successor)
+
+    length, _ = critical_path(W, default_runtime)
+    return Simulation(max_concurrency, now, busy, length, schedule)
@@ -0,0 +1,309 @@
+"""
+Recording and analysis of meta-pipeline runs.
+
+`EventLog` appends the events of a run to a JSONL file, each line tagged with the run id.
+`load_run` reads one run back into a `NodeRecord` per workflow, which `report` summarizes
+together with the critical path the run actually took, and `plot_gantt` draws as a timeline.
+Measured runtimes can be fed back into the graph with `apply_runtimes`.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Hashable, Optional
+
+import networkx as nx
+
+from .events import ExecutionEvent
+from .scheduler import RUNTIME_ATTR
+
+DEFAULT_LOG = Path(".mp-builder") / "events.jsonl"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+# ---- peak memory ----
+def _children(pid: int) -> list[int]:
+    children = []
+    try:
+        for task in os.scandir(f"/proc/{pid}/task"):
+            with open(f"{task.path}/children") as fh:
+                children.extend(int(c) for c in fh.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """
+    Resident memory in bytes of `pid` and all its descendants, e.g. Nextflow and the tasks it
+    runs locally. None where `/proc` is not available or the process has exited.
+    """
+    total, stack, seen = None, [pid], set()
+    while stack:
+        p = stack.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        try:
+            with open(f"/proc/{p}/statm") as fh:
+                rss = int(fh.read().split()[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue
+        total = (total or 0) + rss
+        stack.extend(_children(p))
+    return total
+
+
+class PeakRss:
+    """Sample the memory of a process tree every `interval` seconds while `watch` runs."""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.peak: Optional[int] = None
+
+    async def watch(self):
+        while True:
+            rss = process_tree_rss(self.pid)
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+            await asyncio.sleep(self.interval)
+
+
+# ---- event log ----
+class EventLog:
+    """
+    Append the events of one run to a JSONL file. The run starts with a "run" line, every event
+    line carries the same `run` id. Lines are flushed as they are written, so a crashed run
+    leaves a readable log.
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_LOG, **meta):
+        self.path = Path(path)
+        self.run = uuid.uuid4().hex[:12]
+        self.meta = meta
+        self._fh = None
+
+    def open(self) -> "EventLog":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "a", buffering=1)
+        self._write({"event": "run", "time": time.time(), **self.meta})
+        return self
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self) -> "EventLog":
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, record: dict):
+        self._fh.write(json.dumps({"run": self.run, **record}, default=str) + "\n")
+
+    def __call__(self, event: ExecutionEvent):
+        self._write(event.to_dict())
+
+
+# ---- analysis ----
+@dataclass
+class NodeRecord:
+    node: Hashable
+    status: str = "pending"  # queued, running, succeeded, failed, blocked or cached
+    upstream: tuple = ()
+    queued: Optional[float] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+    returncode: Optional[int] = None
+    peak_rss: Optional[int] = None
+
+    @property
+    def seconds(self) -> Optional[float]:
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        if self.queued is None or self.start is None:
+            return None
+        return self.start - self.queued
+
+    def to_dict(self) -> dict:
+        return {
+            "node": self.node,
+            "status": self.status,
+            "queue_wait": self.queue_wait,
+            "start": self.start,
+            "end": self.end,
+            "seconds": self.seconds,
+            "returncode": self.returncode,
+            "peak_rss": self.peak_rss,
+        }
+
+
+def read_runs(path: Path | str) -> dict[str, list[dict]]:
+    """All runs in a log, by run id in the order they were started."""
+    runs: dict[str, list[dict]] = {}
+    with open(path) as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # e.g. the last line of a run that was killed while writing
+                continue
+            runs.setdefault(record.get("run"), []).append(record)
+    return runs
+
+
+def load_run(path: Path | str, run: Optional[str] = None) -> tuple[dict, dict[Hashable, NodeRecord]]:
+    """The header and the node records of run `run` of a log, the last run if not given."""
+    runs = read_runs(path)
+    if not runs:
+        raise ValueError(f"No runs recorded in {path}")
+    if run is None:
+        run = next(reversed(runs))
+    elif run not in runs:
+        raise ValueError(f"Run {run} not found in {path}")
+
+    header, records = {}, {}
+    for event in runs[run]:
+        kind = event.get("event")
+        if kind == "run":
+            header = event
+            continue
+        record = records.setdefault(event["node"], NodeRecord(event["node"]))
+        if kind == "queued":
+            record.status, record.queued, record.upstream = "queued", event["time"], tuple(event.get("upstream", ()))
+        elif kind == "started":
+            record.status, record.start = "running", event["time"]
+        elif kind == "finished":
+            record.status = "succeeded" if event.get("ok") else "failed"
+            record.end, record.returncode, record.peak_rss = event["time"], event.get("returncode"), event.get("peak_rss")
+            if record.start is None:
+                # could not be started
+                record.start = record.end
+        elif kind in ("blocked", "cached"):
+            record.status = kind
+    return header, records
+
+
+def observed_critical_path(records: dict[Hashable, NodeRecord]) -> list[NodeRecord]:
+    """
+    The chain of nodes that determined when the run ended: from the node that finished last,
+    repeatedly the upstream node that finished last, i.e. the one its start waited for.
+    """
+    ran = {n: r for n, r in records.items() if r.end is not None}
+    if not ran:
+        return []
+    record = max(ran.values(), key=lambda r: r.end)
+    path = [record]
+    while True:
+        upstream = [ran[u] for u in record.upstream if u in ran]
+        if not upstream:
+            break
+        record = max(upstream, key=lambda r: r.end)
+        path.append(record)
+    return path[::-1]
+
+
+def _format_bytes(n: Optional[int]) -> str:
+    if n is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def _format_seconds(s: Optional[float]) -> str:
+    return "-" if s is None else f"{s:.1f}"
+
+
+def report(records: dict[Hashable, NodeRecord]) -> str:
+    """A table of all nodes in start order, followed by the critical path of the run."""
+    ran = sorted((r for r in records.values() if r.start is not None), key=lambda r: r.start)
+    origin = min((r.queued or r.start for r in ran), default=0.0)
+    makespan = max((r.end for r in ran if r.end is not None), default=origin) - origin
+    busy = sum(r.seconds or 0.0 for r in ran)
+
+    lines = [f"{'workflow':<24}{'status':>10}{'wait [s]':>10}{'start [s]':>11}{'runtime [s]':>13}{'peak RSS':>11}{'exit':>6}"]
+    for r in ran:
+        lines.append(
+            f"{str(r.node):<24}{r.status:>10}{_format_seconds(r.queue_wait):>10}{r.start - origin:>11.1f}"
+            f"{_format_seconds(r.seconds):>13}{_format_bytes(r.peak_rss):>11}{'-' if r.returncode is None else r.returncode:>6}"
+        )
+    for r in records.values():
+        if r.start is None:
+            lines.append(f"{str(r.node):<24}{r.status:>10}")
+
+    lines.append("")
+    lines.append(f"makespan {makespan:.1f} s, {busy:.1f} s of workflow runtime, "
+                 f"average concurrency {busy / makespan if makespan else 0.0:.2f}")
+
+    path = observed_critical_path(records)
+    if path:
+        lines.append(f"critical path ({len(path)} workflows):")
+        for r in path:
+            share = (r.seconds or 0.0) / makespan if makespan else 0.0
+            lines.append(f"  {str(r.node):<24}{_format_seconds(r.queue_wait):>8} s wait{_format_seconds(r.seconds):>10} s run{share:>8.1%}")
+    return "\n".join(lines)
+
+
+def plot_gantt(records: dict[Hashable, NodeRecord], path: Path | str, title: Optional[str] = None):
+    """Draw the run as a Gantt chart, with queue waits and the critical path highlighted."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise RuntimeError("Gantt charts need matplotlib, install mp-builder[plot]") from None
+
+    ran = sorted((r for r in records.values() if r.start is not None), key=lambda r: r.start)
+    if not ran:
+        raise ValueError("No workflow of the run was started")
+    origin = min(r.queued or r.start for r in ran)
+    critical = {r.node for r in observed_critical_path(records)}
+    colors = {"succeeded": "tab:green", "failed": "tab:red", "running": "tab:orange"}
+
+    fig, ax = plt.subplots(figsize=(10, max(2.0, 0.35 * len(ran) + 1)))
+    for y, r in enumerate(ran):
+        if r.queue_wait:
+            ax.barh(y, r.queue_wait, left=r.queued - origin, color="lightgrey", height=0.6)
+        end = r.end if r.end is not None else r.start
+        ax.barh(y, end - r.start, left=r.start - origin, color=colors.get(r.status, "tab:blue"), height=0.6,
+                edgecolor="black" if r.node in critical else "none", linewidth=1.5)
+    ax.set_yticks(range(len(ran)), [str(r.node) for r in ran])
+    ax.invert_yaxis()
+    ax.set_xlabel("seconds since the first workflow was queued")
+    if title:
+        ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def apply_runtimes(G: nx.DiGraph, records: dict[Hashable, NodeRecord], weight: float = 0.5) -> dict[Hashable, float]:
+    """
+    Update the `runtime_estimate` of every node that succeeded with its measured runtime,
+    blended with the previous estimate by `weight` (1 replaces it). Returns the new estimates.
+    """
+    updated = {}
+    for node, record in records.items():
+        if record.status != "succeeded" or record.seconds is None or node not in G:
+            continue
+        previous = G.nodes[node].get(RUNTIME_ATTR)
+        estimate = record.seconds if previous is None else weight * record.seconds + (1 - weight) * previous
+        G.nodes[node][RUNTIME_ATTR] = updated[node] = round(estimate, 3)
+    return updated
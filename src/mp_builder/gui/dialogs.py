@@ -1,13 +1,17 @@
 import os
 
 from textual.app import ComposeResult
-from textual.widgets import Button, Label, TabbedContent, TabPane, Static, Input, RadioSet, RadioButton, Markdown
+from rich.text import Text
+from textual.widgets import Button, Label, TabbedContent, TabPane, Static, Input, OptionList, Markdown
+from textual.widgets.option_list import Option
 from textual.containers import Grid, Vertical, Horizontal, VerticalScroll
 
 from textual.screen import Screen
 from textual.reactive import reactive
 
-from mp_builder.utils import get_nfcore_pipelines
+from mp_builder.catalog import PipelineCatalog
+from mp_builder.config.history import MISSING
+from mp_builder.gui.messages import NodeDataChanged
 
 
 class QuitScreen(Screen):
@@ -29,8 +33,37 @@ class QuitScreen(Screen):
 
 
 class PipelineSelectScreen(Screen):
+    """
+    Pick the pipeline of a node. One instance is installed per app and rebound to the node it is
+    opened for, see `open_for`, so the search and its results survive between nodes.
+    """
 
-    def __init__(self, node_data: dict, *args, **kwargs):
+    NAME = "pipeline-select"
+
+    # node attributes set by confirming a selection
+    SELECTION_KEYS = ("pipeline_name", "name", "pipeline_location", "pipeline_description", "is_nfcore")
+
+    def __init__(self, node_id=None, node_data: dict | None = None, *args, **kwargs):
+        # Filled in from the app-wide catalog, which is fetched by a background worker
+        self._nf_core_pipelines: PipelineCatalog | None = None
+        # catalog indices matching the search, best match first
+        self._results: list[int] = []
+        super().__init__(*args, **kwargs)
+        self.bind_node(node_id, node_data if node_data is not None else {})
+
+    @classmethod
+    def open_for(cls, app, node_id, node_data: dict) -> None:
+        """Show the app's pipeline picker for a node, installing it on first use."""
+        try:
+            screen = app.get_screen(cls.NAME)
+        except KeyError:
+            screen = cls()
+            app.install_screen(screen, name=cls.NAME)
+        screen.bind_node(node_id, node_data)
+        app.push_screen(screen)
+
+    def bind_node(self, node_id, node_data: dict) -> None:
+        self.node_id = node_id
         self.node_data = node_data
         self.selected_pipeline = {
             "name": self.pipeline_name,
@@ -38,8 +71,11 @@ class PipelineSelectScreen(Screen):
             "description": self.pipeline_description,
             "version": "dev" # TODO: prompt pipeline version
         }
-        self._nf_core_pipelines = get_nfcore_pipelines()
-        super().__init__(*args, **kwargs)
+        # not composed yet on the first open
+        if self.children:
+            self.query_one("#pipeline-dialog-title", Label).update(f"Pipeline step: {self.node_name}")
+            self.query_one("#pipeline-dialog-text", Markdown).update(self.dialog_text)
+            self._highlight_current()
     
 
     @property
@@ -92,19 +128,51 @@ class PipelineSelectScreen(Screen):
 
     @property
     def nf_core_pipelines_filtered(self):
-        return self._nf_core_pipelines
-    
+        if self._nf_core_pipelines is None:
+            return []
+        return [self._nf_core_pipelines[i] for i in self._results]
+
+    def _option(self, i: int) -> Option:
+        catalog = self._nf_core_pipelines
+        return Option(Text.assemble((catalog.names[i], "bold"), "  ", (catalog.descriptions[i], "dim")), id=str(i))
+
+    def _filter(self, query: str) -> None:
+        """Show the catalog entries matching `query`. Only the visible options are rendered."""
+        option_list = self.query_one("#nf-core-pipelines-list", OptionList)
+        catalog = self._nf_core_pipelines
+        if catalog is None:
+            option_list.set_options([Option("Loading nf-core pipelines...", disabled=True)])
+            return
+        if not len(catalog):
+            option_list.set_options([Option("nf-core pipelines could not be loaded", disabled=True)])
+            return
+
+        self._results = catalog.search(query)
+        option_list.set_options(self._option(i) for i in self._results)
+        self._highlight_current()
+
+    def _highlight_current(self) -> None:
+        """Highlight the pipeline of the node while it is among the results."""
+        option_list = self.query_one("#nf-core-pipelines-list", OptionList)
+        current = None
+        if self._nf_core_pipelines is not None:
+            current = self._nf_core_pipelines.index_of_location(self.pipeline_location)
+        if current is not None and current in self._results:
+            option_list.highlighted = self._results.index(current)
+        else:
+            option_list.highlighted = None
+
     def compose(self) -> ComposeResult:
+        self._nf_core_pipelines = self.app.nfcore_catalog
+
         with Vertical(id="pipeline-dialog"):
-            yield Label(f"Pipeline step: {self.node_name}")
+            yield Label(f"Pipeline step: {self.node_name}", id="pipeline-dialog-title")
             yield Markdown(self.dialog_text, id="pipeline-dialog-text")
 
             with TabbedContent(id="tab-container"):
                 with TabPane("search nf-core", id="nf-core-tab"):
-                    with VerticalScroll():
-                        with RadioSet(id="nf-core-pipelines-list"):
-                            for p in self.nf_core_pipelines_filtered:
-                                yield RadioButton(p["name"], value=(p["location"] == self.pipeline_location))
+                    yield Input(placeholder="Search by name or description", id="pipeline-search")
+                    yield OptionList(id="nf-core-pipelines-list")
 
                 with TabPane("search locally", id="local-tab", disabled=True):
                     with VerticalScroll():
@@ -114,12 +182,47 @@ class PipelineSelectScreen(Screen):
                 yield Button("confirm", id="confirm-dialog-button", variant="success")
                 yield Button("close", id="close-dialog-button", variant="primary")
 
-    def on_radio_set_changed(self, event: RadioSet.Changed) -> None:
-        self.selected_pipeline = self.nf_core_pipelines_filtered[event.radio_set.pressed_index]
+    def on_mount(self) -> None:
+        self._filter("")
+        self.watch(self.app, "nfcore_catalog", self._on_catalog_loaded, init=False)
 
-        self.query_one("#pipeline-dialog-text", Markdown).update(self.dialog_text)
+    def _on_catalog_loaded(self, catalog: PipelineCatalog | None) -> None:
+        if catalog is None or self._nf_core_pipelines is not None:
+            return
+
+        self._nf_core_pipelines = catalog
+        self._filter(self.query_one("#pipeline-search", Input).value)
+
+    def on_screen_resume(self) -> None:
+        self.query_one("#pipeline-search", Input).focus()
 
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "pipeline-search":
+            event.stop()
+            self._filter(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        # Enter in the search field picks the best match
+        if event.input.id == "pipeline-search":
+            event.stop()
+            option_list = self.query_one("#nf-core-pipelines-list", OptionList)
+            if self._results:
+                option_list.highlighted = option_list.highlighted or 0
+                self._select(self._results[option_list.highlighted])
+
+    def on_option_list_option_highlighted(self, event: OptionList.OptionHighlighted) -> None:
         event.stop()
+        if event.option.id is not None:
+            self._select(int(event.option.id))
+
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        event.stop()
+        if event.option.id is not None:
+            self._select(int(event.option.id))
+
+    def _select(self, i: int) -> None:
+        self.selected_pipeline = self._nf_core_pipelines[i]
+        self.query_one("#pipeline-dialog-text", Markdown).update(self.dialog_text)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         #event.stop()  # TODO: Do bubble the event for now to trigger recompose
@@ -128,12 +231,16 @@ class PipelineSelectScreen(Screen):
             self.app.pop_screen()
 
         elif event.button.id == "confirm-dialog-button":
-            
+            before = {key: self.node_data.get(key, MISSING) for key in self.SELECTION_KEYS}
+
             self.pipeline_name = self.selected_pipeline.get("name", "")
             self.node_name = self.pipeline_name if self.node_name == "" else self.node_name
             self.pipeline_location = self.selected_pipeline.get("location", "")
             self.pipeline_description = self.selected_pipeline.get("description", "")
             self.is_nfcore = True  # TODO: How to infer what was pressed dynamically?
+
+            after = {key: self.node_data.get(key, MISSING) for key in self.SELECTION_KEYS}
+            self.app.post_message(NodeDataChanged(self.node_id, before, after))
             
             #self.app.refresh(recompose=True)  # TODO: More fine grained control? -> Bubble up the event
             self.app.pop_screen()
@@ -143,9 +250,10 @@ class PipelineSelectDialogButton(Button):
 
     ICON = '📄'
 
-    def __init__(self, node_data: dict, *args, **kwargs):
+    def __init__(self, node_id, node_data: dict, *args, **kwargs):
+        self.node_id = node_id
         self.node_data = node_data
         super().__init__(self.ICON, *args, **kwargs)
     
     def on_click(self):
-        self.app.push_screen(PipelineSelectScreen(self.node_data))
+        PipelineSelectScreen.open_for(self.app, self.node_id, self.node_data)
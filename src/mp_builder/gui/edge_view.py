@@ -1,5 +1,121 @@
-from textual.containers import ScrollableContainer
+from typing import Hashable, Iterable
 
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.widgets import DataTable, Input
 
-class EdgeView(ScrollableContainer):
-    pass
+from mp_builder.gui.subscriber import GraphSubscriber
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.events import GraphEvent, EdgeAdded, NodesRemoved, EdgeAttrsChanged
+
+
+Edge = tuple[Hashable, Hashable]
+
+
+class EdgeView(GraphSubscriber, Vertical):
+    """
+    All transitions as a table, one row per edge of `mg.G`, with a filter on the source or target.
+
+    Only the visible rows are rendered. Changes of the graph are applied row by row as they are
+    published; narrowing the filter only removes the rows that no longer match.
+    """
+
+    # column key, label
+    COLUMNS = (
+        ("from", "from"),
+        ("run", "run"),
+        ("params_file", "params-file"),
+        ("config_file", "config-file"),
+        ("adapter", "adapter"),
+        ("params", "params"),
+    )
+
+    def __init__(self, metaworkflow_graph: MetaworkflowGraph):
+        self.mg = metaworkflow_graph
+        self.filter = ""
+        # row key of every edge in the table
+        self._rows: dict[Edge, object] = {}
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        yield Input(placeholder="Filter by source or target", id="edge-filter")
+        yield DataTable(id="edge-table", cursor_type="row", zebra_stripes=True)
+
+    @property
+    def table(self) -> DataTable:
+        return self.query_one("#edge-table", DataTable)
+
+    def on_mount(self) -> None:
+        for key, label in self.COLUMNS:
+            self.table.add_column(label, key=key)
+        self.rebuild()
+
+    def matches(self, source: Hashable, target: Hashable) -> bool:
+        query = self.filter.casefold()
+        return query in str(source).casefold() or query in str(target).casefold()
+
+    def row_cells(self, source: Hashable, target: Hashable) -> tuple:
+        # transition metadata as stored by `MetaworkflowGraph.from_config`, edges added in the TUI have none
+        data = self.mg.G.edges[source, target].get("data") or {}
+        params = data.get("params") or []
+        return (
+            str(source),
+            str(target),
+            str(data.get("params_file") or ""),
+            str(data.get("config_file") or ""),
+            data.get("adapter") or "",
+            sum(len(p) for p in params),
+        )
+
+    def rebuild(self) -> None:
+        """Fill the table from scratch, e.g. after `mg` was replaced."""
+        table = self.table
+        table.clear()
+        self._rows.clear()
+        for source, target in self.mg.G.edges:
+            if self.matches(source, target):
+                self._rows[source, target] = table.add_row(*self.row_cells(source, target))
+
+    def update_edges(self, edges: Iterable[Edge]) -> None:
+        """Add, update or remove the rows of `edges` to match the graph and the filter."""
+        table, G = self.table, self.mg.G
+        for edge in edges:
+            row_key = self._rows.get(edge)
+            if not G.has_edge(*edge) or not self.matches(*edge):
+                if row_key is not None:
+                    table.remove_row(self._rows.pop(edge))
+                continue
+            if row_key is None:
+                self._rows[edge] = table.add_row(*self.row_cells(*edge))
+                continue
+            for (column, _), value in zip(self.COLUMNS, self.row_cells(*edge)):
+                if table.get_cell(row_key, column) != value:
+                    table.update_cell(row_key, column, value, update_width=True)
+
+    def apply(self, *events: GraphEvent) -> None:
+        """Update the rows touched by changes of the graph."""
+        touched = []
+        for event in events:
+            if isinstance(event, (EdgeAdded, EdgeAttrsChanged)):
+                touched.append((event.source, event.target))
+            elif isinstance(event, NodesRemoved):
+                touched += [edge for edge in self._rows if edge[0] in event.nodes or edge[1] in event.nodes]
+        self.update_edges(dict.fromkeys(touched))
+
+    def set_filter(self, query: str) -> None:
+        """Show only the transitions whose source or target contains `query`, ignoring case."""
+        previous, self.filter = self.filter, query.strip()
+        if previous.casefold() in self.filter.casefold():
+            # narrowing, only the shown rows can drop out
+            self.update_edges(list(self._rows))
+        else:
+            # rows that match again are put back in graph order
+            self.rebuild()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        event.stop()
+        self.set_filter(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        self.table.focus()
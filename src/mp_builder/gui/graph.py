@@ -2,23 +2,35 @@ from textual.app import App, ComposeResult
 from textual.containers import Container, Vertical, VerticalScroll, ScrollableContainer, HorizontalScroll, Horizontal
 from textual.widgets import Button, Static, Label, Placeholder, Input
 from textual.widget import Widget
+from textual.geometry import Region, Size
+from textual.strip import Strip
 from textual.reactive import reactive
 from textual import on
 
 import networkx as nx
 import os
+from bisect import bisect_left
+from functools import lru_cache
 
 from rich.console import RenderableType
 
+from rich.segment import Segment
+from rich.style import Style
 from rich.text import Text
 from rich.align import Align
 
 from mp_builder.gui.dialogs import PipelineSelectDialogButton
+from mp_builder.gui.messages import NodeDataChanged
+from mp_builder.config.history import MISSING
 from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.events import GraphEvent, NodeAttrsChanged
+from mp_builder.gui.layout import GraphLayout, NodePosition
+from mp_builder.gui.subscriber import GraphSubscriber
 
 
-NODE_HEIGHT = 5
-NODE_WIDTH = 42
+NODE_HEIGHT = 5   # KEEP IN SYNC WITH $node_height IN styles.tcss
+NODE_WIDTH = 45   # KEEP IN SYNC WITH $node_width IN styles.tcss
+EDGE_WIDTH = 8
 DEBUG_SYMBOLS = False
 DEBUG_OUTLINES = False
 
@@ -27,90 +39,110 @@ class GraphNodeAdd(Static):
     def compose(self):
         yield Static("+")
 
-class GraphNodeSpacer(Static):
-    """A placeholder to position GraphNodes"""
-
-    def compose(self) -> ComposeResult:
-        yield Static()
+TREE_GUIDES = (
+    '────→',
+    '──┬─→',
+    '  ├─→',
+    '  └─→',
+    '  │  ',
+    '     '
+)
+GUIDE_WIDTH = 5
 
 
-class GraphEdge(Widget):
-    """Represents an edge between two nodes."""
-
-    TREE_GUIDES = [
-        '────→',
-        '──┬─→',
-        '  ├─→',
-        '  └─→',
-        '  │  ',
-        '     '
-    ]
-
-    def __init__(self, in_breadths: list[int], out_breadths: list[list[int]], *args, **kwargs):
-        assert(len(out_breadths) == len(in_breadths))
-        self.in_breadths = in_breadths
-        self.out_breadths = out_breadths
-        super().__init__(*args, **kwargs)
+def edge_guide(layout: GraphLayout, succ, depth: int, y: int, child_rows: dict | None = None) -> str:
+    """
+    The connector art on terminal line `y` between column `depth` and its children.
 
-    def render(self) -> RenderableType:
-        """Render the edge as an arrow pointing to the target node."""
-    
-        out = ("ST" if DEBUG_SYMBOLS else "" + os.linesep) * (NODE_HEIGHT // 2)
+    The edge of a node leaves at the middle line of its row and reaches down to its last child,
+    so a line only depends on the closest node above it. `child_rows` caches the sorted child
+    rows of the nodes looked at.
+    """
+    blank = TREE_GUIDES[5] if not DEBUG_SYMBOLS else "SP"
+    row, line = divmod(y - NODE_HEIGHT // 2, NODE_HEIGHT)
+    above = layout.column_node_above(depth, row) if y >= NODE_HEIGHT // 2 else None
+    if above is None:
+        return blank
+    node, breadth = above
+
+    rows = child_rows.get(node) if child_rows is not None else None
+    if rows is None:
+        rows = sorted(layout.breadth(child) for child in succ[node])
+        if child_rows is not None:
+            child_rows[node] = rows
+
+    if row == breadth and line == 0:
+        if not rows:                        # HAS NO CHILDREN
+            return TREE_GUIDES[5] if not DEBUG_SYMBOLS else "NO"
+        return TREE_GUIDES[0] if len(rows) == 1 else TREE_GUIDES[1]
+    if len(rows) < 2 or (row, line) >= (rows[-1], 1):
+        return blank
+    if line == 0 and row == rows[-1]:       # Last branch
+        return TREE_GUIDES[3]
+    if line == 0 and rows[bisect_left(rows, row)] == row:
+        return TREE_GUIDES[2]
+    # Extend edge down while there are branches below
+    return TREE_GUIDES[4] if not DEBUG_SYMBOLS else "EX"
+
+
+@lru_cache(maxsize=64)
+def guide_strip(guide: str, width: int, style: Style) -> Strip:
+    """A single styled line of connector art, centered in `width`. There are only a handful of distinct ones."""
+    pad = max(width - GUIDE_WIDTH, 0) // 2
+    return Strip([Segment(" " * pad + guide, style)]).adjust_cell_length(width, style)
 
-        for b in range(len(self.out_breadths)):
-            out_brds = self.out_breadths[b]
-            in_brd = self.in_breadths[b]
 
-            prev_brd = 0
-            if b > 0:
-                if len(self.out_breadths[b - 1]) > 0:
-                    prev_brd = self.out_breadths[b - 1][-1]
-                else:
-                    prev_brd = self.in_breadths[b - 1]
+class GraphEdge(Widget):
+    """
+    Represents the edges leaving one column of nodes.
 
-            for j in range(in_brd - prev_brd):
-                mult = NODE_HEIGHT if j > 0 or b == 0 else (NODE_HEIGHT - 1)
-                symbol = self.TREE_GUIDES[5] if not DEBUG_SYMBOLS else "SP"
-                out += (symbol + os.linesep) * mult
-            
-            if len(out_brds) == 0:              # HAS NO CHILDREN
-                symbol = self.TREE_GUIDES[5] if not DEBUG_SYMBOLS else "NO"
-                out += symbol + os.linesep
+    Rendered line by line from the layout with `edge_guide`, so a repaint only looks at the
+    nodes next to the visible lines.
+    """
 
-            if len(out_brds) == 1:              # HAS EXACTLY ONE CHILD
-                out += self.TREE_GUIDES[0] + os.linesep
+    def __init__(self, graph_view: "GraphView", depth: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.graph_view = graph_view
+        self.depth = depth
+        self._child_rows = {}
+        self._height = self._layout_height()
 
-            elif len(out_brds) > 1:             # HAS MANY CHILDREN
-                for i, child_brd in enumerate(out_brds):
-                    if i == 0:   # First Branch
-                        out += self.TREE_GUIDES[1] + os.linesep
+    def _layout_height(self) -> int:
+        return self.graph_view.graph_layout.n_rows * NODE_HEIGHT
 
-                    else:
+    def update_edges(self):
+        """Redraw after the layout changed."""
+        self._child_rows.clear()
+        height = self._layout_height()
+        self.refresh(layout=height != self._height)
+        self._height = height
 
-                        # Extend edge down while there is downstream branching in child nodes
-                        # for _ in range(brd - out_brds[i-1]):
-                        for j in range(child_brd - out_brds[i-1]):
-                            mult = NODE_HEIGHT if j > 0 else (NODE_HEIGHT - 1)
-                            symbol = self.TREE_GUIDES[4] if not DEBUG_SYMBOLS else "EX"
-                            out += (symbol + os.linesep) * mult
-                        
-                        if i == len(out_brds) - 1:   # Last branch
-                            out += self.TREE_GUIDES[3] + os.linesep
+    def get_content_width(self, container: Size, viewport: Size) -> int:
+        return EDGE_WIDTH
 
-                        else:                        # More branches below
-                            out += self.TREE_GUIDES[2] + os.linesep
+    def get_content_height(self, container: Size, viewport: Size, width: int) -> int:
+        return self._height
 
-        #return Panel(out)
-        return Text(out)
+    def render_line(self, y: int) -> Strip:
+        guide = edge_guide(self.graph_view.graph_layout, self.graph_view.mg.G.succ, self.depth, y, self._child_rows)
+        return guide_strip(guide, self.size.width, self.rich_style)
 
 
 class AddNodeButton(Button):
     """Button to add a new node."""
 
+    def __init__(self, node_id, *args, **kwargs):
+        self.node_id = node_id
+        super().__init__(*args, **kwargs)
+
 
 class RemoveNodeButton(Button):
     """Button to remove a node."""
 
+    def __init__(self, node_id, *args, **kwargs):
+        self.node_id = node_id
+        super().__init__(*args, **kwargs)
+
 
 class ButtonContainer(Container):
     """
@@ -120,25 +152,35 @@ class ButtonContainer(Container):
     def __init__(self, node_id, *args, **kwargs):
         self.node_id = node_id
         super().__init__(*args, **kwargs)
-        self.id = "btn_ctn_" + node_id
 
     def compose(self):
-        yield AddNodeButton(">", id=f"add_btn_{self.node_id}")
-        yield RemoveNodeButton("X", id=f"remove_btn_{self.node_id}")
+        yield AddNodeButton(self.node_id, ">")
+        yield RemoveNodeButton(self.node_id, "X")
+
+    def bind(self, node_id):
+        self.node_id = node_id
+        for button in self.query("AddNodeButton, RemoveNodeButton"):
+            button.node_id = node_id
+
 
 class GraphNode(Container):
-    """A node in the graph visualization."""
+    """
+    A node in the graph visualization.
+
+    GraphNodes are recycled by the GraphView while scrolling and carry no DOM id,
+    `bind` attaches the widget to another node.
+    """
     
-    def __init__(self, node_data: dict, *args, **kwargs):
+    def __init__(self, node_id, node_data: dict, position: NodePosition, *args, **kwargs):
+        self.node_id = node_id
         self.node_data = node_data
+        self.position = position
         self._is_dirty = False
         super().__init__(*args, **kwargs)
-        # wait for superclass for id to be initialized
-        self._input_id = f"input-{self.id}"
 
     @property
     def name(self):
-        return self.node_data.get("name", self.id)
+        return self.node_data.get("name", self.node_id)
     
     @name.setter
     def name(self, value: str):
@@ -158,7 +200,11 @@ class GraphNode(Container):
         
     @property
     def node_description(self):
-        return f"{self.id} (d: {self.node_data.get("depth", "-")} b: {self.node_data.get("breadth", "-")}) {self.pipeline_type}"
+        return f"{self.node_id} (d: {self.position.depth} b: {self.position.breadth}) {self.pipeline_type}"
+
+    @property
+    def is_dirty(self):
+        return self._is_dirty
 
     def compose(self) -> ComposeResult:
 
@@ -166,15 +212,52 @@ class GraphNode(Container):
             yield Static(self.node_description)
 
         yield Horizontal(
-            Input(value=self.name, id=self._input_id),
-            PipelineSelectDialogButton(node_data=self.node_data)
+            Input(value=self.name),
+            PipelineSelectDialogButton(node_id=self.node_id, node_data=self.node_data)
         )
-        yield ButtonContainer(node_id=self.id)
+        yield ButtonContainer(node_id=self.node_id)
 
     def on_mount(self):
         self.border_title = self.node_description
         self._update_incomplete_state()
 
+    def bind(self, node_id, node_data: dict, position: NodePosition, offset: tuple[int, int]):
+        """Attach this (recycled) widget to another node."""
+        self.node_id = node_id
+        self.node_data = node_data
+        self._is_dirty = False
+
+        # a widget released before it was composed picks up the new node in `compose`
+        if self.children:
+            input_widget = self.query_one(Input)
+            input_widget.remove_class("dirty")
+            input_widget.value = self.name
+            dialog_button = self.query_one(PipelineSelectDialogButton)
+            dialog_button.node_id = node_id
+            dialog_button.node_data = node_data
+            self.query_one(ButtonContainer).bind(node_id)
+            if NODE_HEIGHT > 5 or DEBUG_SYMBOLS:
+                self.query_one(Static).update(self.node_description)
+
+        self.move_to(position, offset)
+        self._update_incomplete_state()
+        self.display = True
+
+    def move_to(self, position: NodePosition, offset: tuple[int, int]):
+        self.position = position
+        self.styles.offset = offset
+        self.border_title = self.node_description
+
+    def update_from_node_data(self):
+        """Show changes made to `node_data` outside of this widget."""
+        # a widget that is not composed yet reads the name in `compose`
+        if not self._is_dirty and self.children:
+            input_widget = self.query_one(Input)
+            if input_widget.value != self.name:
+                input_widget.value = self.name
+        self.border_title = self.node_description
+        self._update_incomplete_state()
+
     def _update_incomplete_state(self):
         is_now_incomplete = (self.pipeline_type == "no_pipeline")
         self.set_class(is_now_incomplete, "incomplete")
@@ -183,7 +266,7 @@ class GraphNode(Container):
         is_now_dirty = new_value != self.name
 
         if is_now_dirty != self._is_dirty:
-            input_widget = self.query_one(f"#{self._input_id}")
+            input_widget = self.query_one(Input)
             self._is_dirty = is_now_dirty
             input_widget.set_class(is_now_dirty, "dirty")
 
@@ -191,10 +274,12 @@ class GraphNode(Container):
         """Handle the Input submitted event (Enter pressed)."""
         #event.stop()
 
+        before = self.node_data.get("name", MISSING)
         self.name = event.value.strip()
         self._is_dirty = False
-        input_widget = self.query_one(f"#{self._input_id}")
-        input_widget.remove_class("dirty")
+        event.input.remove_class("dirty")
+        if self.name != before:
+            self.post_message(NodeDataChanged(self.node_id, {"name": before}, {"name": self.name}))
 
         # TODO: Doesn't refresh node / edge view
         #self.refresh(recompose=True)
@@ -202,131 +287,280 @@ class GraphNode(Container):
     def on_input_changed(self, event: Input.Changed) -> None:
         """Called whenever the Input value changes."""
 
-        # Only react to changes in our specific input
-        if event.input.id == self._input_id:
+        #TODO: Check if we can actually access the value
+        self._update_dirty_state(event.input.value)
+        event.stop() # Stop propagation if needed
+
+
+class GraphScroll(ScrollableContainer):
+    """Scrolls a GraphView and keeps its rendered window in line with the viewport."""
 
-            #TODO: Check if we can actually access the value
-            self._update_dirty_state(event.input.value)
-            event.stop() # Stop propagation if needed
+    _window_update_pending = False
+
+    def on_mount(self):
+        self.watch(self, "scroll_x", self._viewport_changed, init=False)
+        self.watch(self, "scroll_y", self._viewport_changed, init=False)
+
+    def on_resize(self):
+        self._viewport_changed()
+
+    def _viewport_changed(self):
+        # scroll_x and scroll_y usually change together, update the window once
+        if not self._window_update_pending:
+            self._window_update_pending = True
+            self.call_next(self._update_windows)
+
+    def _update_windows(self):
+        self._window_update_pending = False
+        for graph_view in self.query_children(GraphView):
+            graph_view.update_window()
+
+
+class GraphView(GraphSubscriber, Container):
+    """
+    Virtualized canvas for the graph visualization.
 
+    The layout of the whole graph is kept in a `GraphLayout`, but GraphNode widgets are only
+    materialized for nodes inside the viewport of the scrolling parent plus a margin. Nodes are
+    positioned absolutely, so the canvas is sized to the full graph while holding only a
+    screenful of widgets. Widgets leaving the window are hidden and recycled for nodes entering
+    it; nodes with focus or unsubmitted input stay mounted until they are done.
 
-class GraphView(Container):
-    """Container for the graph visualization with horizontal scrolling."""
+    Edge columns and add-placeholders are one widget per column, materialized for the columns
+    of the window as well. Changes of the graph update the layout incrementally as they are
+    published and only the materialized widgets are brought up to date.
+    """
     
     DEFAULT_CSS = f"""
     GraphView {{
         {"border: thick $accent-darken-2; /* Debugging border */" if DEBUG_OUTLINES else ""}
     }}
 
-    GraphView > Horizontal {{
-        /* Add some visual space between columns if desired */
-        /* grid-gutter-horizontal: 5; */ /* If using grid layout */
-        /* Or use margin on Vertical below */
-        {"border: thick $accent-darken-2; /* Debugging border */" if DEBUG_OUTLINES else ""}
+    GraphView > GraphNode, GraphView > GraphEdge, GraphView > GraphNodeAdd {{
+        position: absolute;
     }}
 
     """
+    # rows and columns materialized around the viewport
+    MARGIN_ROWS = 4
+    MARGIN_COLUMNS = 1
+    # maximum number of hidden GraphNodes kept for recycling
+    MAX_POOL = 64
+
     mg: MetaworkflowGraph
+    graph_layout: GraphLayout | None
 
     def __init__(self, graph: MetaworkflowGraph):
         self.mg = graph
+        self.graph_layout = None
+        self._node_widgets: dict[str, GraphNode] = {}
+        self._pool: list[GraphNode] = []
+        self._edge_widgets: dict[int, GraphEdge] = {}
+        self._add_widgets: dict[int, GraphNodeAdd] = {}
         super().__init__()
 
-    def _unvisit_graph(self):
-        for n in self.mg.G.nodes():
-            self.mg.G.nodes[n]["visited"] = False
-            self.mg.G.nodes[n]["depth"] = 0
-            self.mg.G.nodes[n]["breadth"] = 0
+    def relayout(self):
+        """Compute the layout of the whole graph, e.g. after `mg` was replaced."""
+        self.graph_layout = GraphLayout.compute(self.mg.G, self.mg.first_node_or_root())
 
-    def _layout_graph(self):
+    def update_layout(self, *events: GraphEvent):
         """
-        DFS to assign node coordinates that aid drawing
+        Update the layout for mutations already applied to `mg.G`,
+        falling back to a full relayout if they cannot be applied incrementally.
         """
-        # first node in topological sort is set as root
-        current_node = self.mg.first_node_or_root()
-        stack = [current_node]
-
-        # node breadth is tracked globally
-        breadth = 0
-
-        while len(stack) > 0:
-
-            # get top of stack
-            current_node = stack.pop(0)
-
-            if not self.mg.G.nodes[current_node].get("visited", False):
-                # position the node relative to ancestors
-                depth = 0
-                for ancestor in nx.ancestors(self.mg.G, current_node):
-                    depth = max(self.mg.G.nodes[ancestor].get("depth", 0) + 1, depth)
-                    #breadth = min(self.mg.G.nodes[ancestor].get("breadth", 0), breadth + 1)
-
-                self.mg.G.nodes[current_node]["depth"] = depth
-                self.mg.G.nodes[current_node]["breadth"] = breadth
-                self.mg.G.nodes[current_node]["visited"] = True
-
-                # We have to infer direct descendants from edge data
-                node_descendants = list(map(lambda edge: edge[1], nx.edges(self.mg.G, current_node)))
-                stack = node_descendants + stack
-
-                if len(node_descendants) == 0:
-                    breadth += 1
+        layout = self.graph_layout
+        if layout is None or layout.root not in self.mg.G:
+            self.relayout()
+            return
+
+        # the root node is only drawn as long as it has no successors
+        if layout.root == MetaworkflowGraph.ROOT_NODE and self.mg.G.out_degree(layout.root) > 0:
+            self.relayout()
+            return
+
+        for event in events:
+            if not layout.apply(self.mg.G, event):
+                self.relayout()
+                return
+
+    def apply(self, *events: GraphEvent):
+        """Update the layout and the materialized widgets for changes of `mg.G`."""
+        self.update_layout(*events)
+        if self.is_mounted:
+            self.sync()
+        self.refresh_nodes(dict.fromkeys(e.node for e in events if isinstance(e, NodeAttrsChanged)))
+
+    def rebuild(self):
+        """Lay out and materialize the graph from scratch, e.g. after it was replaced."""
+        # bound widgets hold the attributes of the previous nodes, rebind them through the pool
+        for node_id in list(self._node_widgets):
+            self._release(node_id)
+        self.relayout()
+        if self.is_mounted:
+            self.sync()
+
+    @staticmethod
+    def node_offset(position: NodePosition) -> tuple[int, int]:
+        return position.depth * (NODE_WIDTH + EDGE_WIDTH), position.breadth * NODE_HEIGHT
 
     def compose(self) -> ComposeResult:
-
-        self._unvisit_graph()
-        self._layout_graph()
-
-        with Horizontal(id="graph_container"):
-            layers = list(nx.bfs_layers(self.mg.G, self.mg.first_node_or_root()))
-
-            for i, layer in enumerate(layers):
-                # TODO: Can this be avoided by recycling next_layer from below?
-                layer = sorted(layer, key=lambda n: self.mg.G.nodes[n].get("breadth", 0))
-                
-                # Draw Nodes
-                with Vertical():
-                    tot_breadth = 0
-                    for j, node in enumerate(layer):
-
-                        node_depth = self.mg.G.nodes[node].get("depth")
-                        node_breadth = self.mg.G.nodes[node].get("breadth")
-
-                        #yield Static("Depth: " + str(node_depth) + " Breadth: " + str(node_breadth))
-                        
-                        # push node back, if it is also a child of a downstream node
-                        if node_depth > i and len(layers) > i+1:
-                            layers[i+1].append(node)
-                            continue
-                        
-                        # if a downstream node has many children, insert spacing according to breadth
-                        while tot_breadth + j < node_breadth:
-                            tot_breadth += 1
-                            yield GraphNodeSpacer()
-
-                        # Draw the node
-                        yield GraphNode(id=f"{node}", node_data=self.mg.G.nodes[node])
-
-                    if i == 0 or i < len(layers) - 1:                    
-                        yield GraphNodeAdd()
-
-                # Draw edges
-                with Vertical():
-
-                    if i == len(layers) - 1:
-                        # Leaves, don't draw edges
-                        continue
-                    
-                    else:
-                        # Construct next layer
-                        next_layer = [
-                            list(sorted(map(lambda e: e[1], self.mg.G.out_edges(n)),
-                                   key=lambda n: self.mg.G.nodes[n].get("breadth", 0)))
-                            for n in layer
-                        ]
-                        #layers[i+1] = next_layer  # keep the sorting
-
-                        in_breadths = list(map(lambda n: self.mg.G.nodes[n].get("breadth"), layer))
-                        out_breadths = [list(map(lambda n: self.mg.G.nodes[n].get("breadth"), descs)) for descs in next_layer]
-
-                        yield GraphEdge(in_breadths=in_breadths, out_breadths=out_breadths)
+        if self.graph_layout is None:
+            self.relayout()
+
+        # a recompose starts over with fresh widgets
+        self._node_widgets.clear()
+        self._pool.clear()
+        self._edge_widgets.clear()
+        self._add_widgets.clear()
+        yield from self._reconcile_columns()
+        yield from self._reconcile_nodes()
+
+    def sync(self):
+        """Bring the mounted widgets in line with the current layout."""
+        if self.graph_layout is None:
+            self.relayout()
+
+        new_widgets = self._reconcile_columns() + self._reconcile_nodes()
+        if new_widgets:
+            self.mount_all(new_widgets)
+
+    def update_window(self):
+        """Materialize the nodes and columns that scrolled into view."""
+        if self.graph_layout is None or not self.is_mounted:
+            return
+
+        new_widgets = self._reconcile_columns(changed=False) + self._reconcile_nodes()
+        if new_widgets:
+            self.mount_all(new_widgets)
+
+    def refresh_nodes(self, node_ids=None):
+        """Redraw nodes whose data changed, all materialized nodes if `node_ids` is not given."""
+        for node_id in (list(self._node_widgets) if node_ids is None else node_ids):
+            widget = self._node_widgets.get(node_id)
+            if widget is not None:
+                widget.update_from_node_data()
+
+    def scroll_to_node(self, node_id):
+        if node_id not in self.graph_layout:
+            return
+        x, y = self.node_offset(self.graph_layout[node_id])
+        self.parent.scroll_to_region(Region(x, y, NODE_WIDTH + EDGE_WIDTH, NODE_HEIGHT), animate=False)
+        self.update_window()
+
+    def _window(self) -> tuple[range, range]:
+        """Columns and rows intersecting the viewport of the scrolling parent, plus margins."""
+        scroll = self.parent
+        if scroll is not None and scroll.size.area:
+            (x, y), (width, height) = scroll.scroll_offset, scroll.size
+        else:
+            (x, y), (width, height) = (0, 0), self.app.size
+
+        pitch = NODE_WIDTH + EDGE_WIDTH
+        columns = range(max(0, x // pitch - self.MARGIN_COLUMNS), (x + width) // pitch + 1 + self.MARGIN_COLUMNS)
+        rows = range(max(0, y // NODE_HEIGHT - self.MARGIN_ROWS), (y + height) // NODE_HEIGHT + 1 + self.MARGIN_ROWS)
+        return columns, rows
+
+    def _pinned(self) -> set:
+        """Nodes that must stay materialized: the focused one and those with unsubmitted input."""
+        pinned = {node_id for node_id, widget in self._node_widgets.items() if widget.is_dirty}
+
+        focused = self.screen.focused if self.is_attached else None
+        while focused is not None and focused is not self:
+            if isinstance(focused, GraphNode):
+                pinned.add(focused.node_id)
+                break
+            focused = focused.parent
+
+        return pinned
+
+    def _reconcile_nodes(self) -> list[Widget]:
+        """
+        Recycle GraphNodes outside of the window and bind or create widgets for nodes inside it.
+        Returns the widgets that still have to be mounted.
+        """
+        layout = self.graph_layout
+        G = self.mg.G
+        columns, rows = self._window()
+
+        wanted = {
+            node: position
+            for depth in columns
+            for node, position in layout.column_items(depth, rows.start, rows.stop)
+        }
+        for node in self._pinned():
+            if node in layout and node not in wanted:
+                wanted[node] = layout[node]
+
+        for node_id in [n for n in self._node_widgets if n not in wanted]:
+            self._release(node_id)
+
+        new_widgets = []
+        for node, position in wanted.items():
+            widget = self._node_widgets.get(node)
+            if widget is None:
+                if self._pool:
+                    widget = self._pool.pop()
+                    widget.bind(node, G.nodes[node], position, self.node_offset(position))
+                else:
+                    widget = GraphNode(node_id=node, node_data=G.nodes[node], position=position)
+                    widget.styles.offset = self.node_offset(position)
+                    new_widgets.append(widget)
+                self._node_widgets[node] = widget
+            elif widget.node_data is not G.nodes[node]:
+                # the node was removed and added again, e.g. by an undo and redo while the view was hidden
+                widget.bind(node, G.nodes[node], position, self.node_offset(position))
+            elif widget.position != position:
+                widget.move_to(position, self.node_offset(position))
+
+        return new_widgets
+
+    def _release(self, node_id):
+        """Hide the widget of `node_id` and keep it for recycling, or remove it if the pool is full."""
+        widget = self._node_widgets.pop(node_id)
+        if len(self._pool) < self.MAX_POOL:
+            widget.display = False
+            self._pool.append(widget)
+        else:
+            widget.remove()
+
+    def _reconcile_columns(self, changed: bool = True) -> list[Widget]:
+        """
+        Update, create and remove the edge and add-placeholder widgets of the columns in the window,
+        and size the canvas. Existing edge widgets are only redrawn if the layout `changed`.
+        Returns the widgets that still have to be mounted.
+        """
+        layout = self.graph_layout
+        n_columns = layout.n_columns
+        columns, _ = self._window()
+        new_widgets = []
+
+        # Edges leave every column but the last, add-placeholders close every column but the last
+        has_edges = [d for d in columns if d < n_columns - 1]
+        has_add = [d for d in columns if d < n_columns - 1 or d == 0 < n_columns]
+
+        for depth in [d for d in self._edge_widgets if d not in has_edges]:
+            self._edge_widgets.pop(depth).remove()
+        for depth in [d for d in self._add_widgets if d not in has_add]:
+            self._add_widgets.pop(depth).remove()
+
+        for depth in has_edges:
+            edge = self._edge_widgets.get(depth)
+            if edge is None:
+                edge = self._edge_widgets[depth] = GraphEdge(self, depth)
+                edge.styles.offset = (depth * (NODE_WIDTH + EDGE_WIDTH) + NODE_WIDTH, 0)
+                new_widgets.append(edge)
+            elif changed:
+                edge.update_edges()
+
+        for depth in has_add:
+            _, breadth = layout.column_node_above(depth, layout.n_rows - 1)
+            add = self._add_widgets.get(depth)
+            if add is None:
+                add = self._add_widgets[depth] = GraphNodeAdd()
+                new_widgets.append(add)
+            add.styles.offset = (depth * (NODE_WIDTH + EDGE_WIDTH), (breadth + 1) * NODE_HEIGHT)
+
+        self.styles.width = max(n_columns, 1) * (NODE_WIDTH + EDGE_WIDTH)
+        self.styles.height = (layout.n_rows + 1) * NODE_HEIGHT
+
+        return new_widgets
@@ -0,0 +1,338 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Hashable, Iterator, NamedTuple
+
+import networkx as nx
+
+from mp_builder.config.events import GraphEvent, NodeAdded, EdgeAdded, NodesRemoved, NodeAttrsChanged, EdgeAttrsChanged
+
+
+class NodePosition(NamedTuple):
+    """Grid position of a node: `depth` is the column, `breadth` the row."""
+    depth: int
+    breadth: int
+
+
+class LayoutColumn(NamedTuple):
+    """The nodes of one depth in row order, with their breadths."""
+    nodes: list[Hashable]
+    breadths: list[int]
+
+
+class GraphLayout:
+    """
+    Positions of the nodes reachable from `root` in a left-to-right drawing of a DAG.
+
+    - depth: length of the longest path from `root` (layering by topological longest path)
+    - breadth: number of leaves visited before the node in a depth-first traversal from `root`,
+      so every leaf gets its own row and a parent shares the row of its first child
+
+    The layout is computed in O(V + E) and kept in its own position table,
+    the node attributes of the graph are never touched.
+
+    Rows are identified by sparse, ordered keys and a node's breadth is the rank of its row key.
+    Inserting or removing rows therefore does not rewrite the nodes below, and graph mutations
+    applied with `apply` cost time proportional to the change. The nodes of every depth are kept
+    in columns sorted by row key, which are updated along with the rows. Changes that cannot be handled
+    locally, e.g. edges joining two existing branches, are rejected and require a full `compute`.
+    """
+    ROW_KEY_GAP = 1 << 16
+
+    def __init__(self, root: Hashable, depth: dict[Hashable, int], rows: list[list[Hashable]],
+                 dfs_parent: dict[Hashable, Hashable]):
+        self.root = root
+        self._depth = depth
+        # nodes of each row in traversal order
+        self._rows = rows
+        # the node from which each node was first reached in the traversal
+        self._dfs_parent = dfs_parent
+        # sorted keys of `_rows`, and the row key of every node
+        self._keys: list[int] = []
+        self._row_key: dict[Hashable, int] = {}
+        # nodes of each depth and their row keys, in row order
+        self._column_nodes: list[list[Hashable]] = []
+        self._column_keys: list[list[int]] = []
+        self._renumber_rows()
+
+    @classmethod
+    def compute(cls, graph: nx.DiGraph, root: Hashable) -> "GraphLayout":
+        if root not in graph:
+            return cls(root, {}, [], {})
+
+        succ = graph.succ
+        # children of the reachable nodes, fetched once from the adjacency views
+        children_of = {}
+        dfs_parent = {}
+        rows = [[]]
+
+        # Depth-first traversal, children are visited in adjacency order
+        stack = [(root, None)]
+        while stack:
+            node, parent = stack.pop()
+            if node in children_of:
+                continue
+
+            dfs_parent[node] = parent
+            rows[-1].append(node)
+            children = children_of[node] = list(succ[node])
+            if len(children) == 0:
+                rows.append([])
+            else:
+                stack.extend((child, node) for child in reversed(children))
+
+        if not rows[-1]:
+            rows.pop()
+
+        # Longest path layering: Kahn's algorithm restricted to the reachable nodes
+        in_degree = dict.fromkeys(children_of, 0)
+        for children in children_of.values():
+            for child in children:
+                in_degree[child] += 1
+
+        depth = dict.fromkeys(children_of, 0)
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            child_depth = depth[node] + 1
+            for child in children_of[node]:
+                if depth[child] < child_depth:
+                    depth[child] = child_depth
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
+
+        return cls(root, depth, rows, dfs_parent)
+
+    def __getitem__(self, node: Hashable) -> NodePosition:
+        return NodePosition(self._depth[node], self.breadth(node))
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._depth
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._depth)
+
+    def __len__(self) -> int:
+        return len(self._depth)
+
+    def items(self) -> Iterator[tuple[Hashable, NodePosition]]:
+        """All nodes with their positions, in row order."""
+        for breadth, row in enumerate(self._rows):
+            for node in row:
+                yield node, NodePosition(self._depth[node], breadth)
+
+    def columns(self) -> list[LayoutColumn]:
+        """
+        The nodes bucketed by depth, each column in row order.
+
+        Resolves the breadth of every node, use `column_items` for a range of rows.
+        """
+        return [
+            LayoutColumn(list(nodes), [bisect_left(self._keys, key) for key in keys])
+            for nodes, keys in zip(self._column_nodes, self._column_keys)
+        ]
+
+    def column_items(self, depth: int, start: int = 0, stop: int | None = None) -> Iterator[tuple[Hashable, NodePosition]]:
+        """The nodes of column `depth` in rows `start` up to `stop` with their positions."""
+        if not 0 <= depth < len(self._column_nodes):
+            return
+        nodes, keys = self._column_nodes[depth], self._column_keys[depth]
+        lo = bisect_left(keys, self._start_key(start))
+        hi = bisect_left(keys, self._start_key(stop), lo) if stop is not None else len(keys)
+        for i in range(lo, hi):
+            yield nodes[i], NodePosition(depth, bisect_left(self._keys, keys[i]))
+
+    def column_node_above(self, depth: int, row: int) -> tuple[Hashable, int] | None:
+        """The last node of column `depth` in a row up to `row`, with its breadth."""
+        if not 0 <= depth < len(self._column_nodes):
+            return None
+        keys = self._column_keys[depth]
+        i = bisect_left(keys, self._start_key(row + 1)) - 1
+        if i < 0:
+            return None
+        return self._column_nodes[depth][i], bisect_left(self._keys, keys[i])
+
+    def depth(self, node: Hashable) -> int:
+        return self._depth[node]
+
+    def breadth(self, node: Hashable) -> int:
+        return bisect_left(self._keys, self._row_key[node])
+
+    @property
+    def n_columns(self) -> int:
+        return len(self._column_nodes)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self._rows)
+
+    # ===========================
+    #   INCREMENTAL UPDATES
+    # ===========================
+    def apply(self, graph: nx.DiGraph, event: GraphEvent) -> bool:
+        """
+        Update the layout for a mutation that has already been applied to `graph`.
+
+        Returns False if the layout could not be updated locally and has to be recomputed.
+        """
+        if isinstance(event, (NodeAttrsChanged, EdgeAttrsChanged)):
+            # attributes do not affect positions
+            return True
+        if isinstance(event, NodeAdded):
+            # a new node is unconnected, hence not reachable from the root
+            return event.node not in self._depth
+        if isinstance(event, EdgeAdded):
+            return self._add_edge(graph, event.source, event.target)
+        if isinstance(event, NodesRemoved):
+            return self._remove_nodes(graph, event.nodes, event.boundary_edges)
+        return False
+
+    def _renumber_rows(self):
+        self._keys = [i * self.ROW_KEY_GAP for i in range(len(self._rows))]
+        self._row_key = {node: key for key, row in zip(self._keys, self._rows) for node in row}
+
+        self._column_nodes, self._column_keys = [], []
+        for key, row in zip(self._keys, self._rows):
+            for node in row:
+                depth = self._depth[node]
+                while len(self._column_nodes) <= depth:
+                    self._column_nodes.append([])
+                    self._column_keys.append([])
+                self._column_nodes[depth].append(node)
+                self._column_keys[depth].append(key)
+
+    def _start_key(self, row: int) -> float:
+        """The key of `row`, or infinity past the last row."""
+        return self._keys[row] if row < len(self._keys) else float("inf")
+
+    def _column_insert(self, node: Hashable):
+        depth = self._depth[node]
+        while len(self._column_nodes) <= depth:
+            self._column_nodes.append([])
+            self._column_keys.append([])
+        keys = self._column_keys[depth]
+        i = bisect_right(keys, self._row_key[node])
+        keys.insert(i, self._row_key[node])
+        self._column_nodes[depth].insert(i, node)
+
+    def _column_remove(self, node: Hashable):
+        depth = self._depth[node]
+        nodes, keys = self._column_nodes[depth], self._column_keys[depth]
+        i = bisect_left(keys, self._row_key[node])
+        while nodes[i] != node:
+            i += 1
+        del nodes[i]
+        del keys[i]
+        while self._column_nodes and not self._column_nodes[-1]:
+            self._column_nodes.pop()
+            self._column_keys.pop()
+
+    def _insert_row(self, index: int, row: list[Hashable]):
+        lower = self._keys[index - 1] if index > 0 else -self.ROW_KEY_GAP
+        upper = self._keys[index] if index < len(self._keys) else lower + 2 * self.ROW_KEY_GAP
+
+        self._rows.insert(index, row)
+        if upper - lower < 2:
+            # no gap left between the neighbouring rows
+            self._renumber_rows()
+            return
+
+        key = (lower + upper) // 2
+        self._keys.insert(index, key)
+        for node in row:
+            self._row_key[node] = key
+            self._column_insert(node)
+
+    def _add_edge(self, graph: nx.DiGraph, source: Hashable, target: Hashable) -> bool:
+        if source not in self._depth:
+            # the new edge is not reachable from the root, unless it reaches into the layout
+            return target not in self._depth
+        if target in self._depth or graph.in_degree(target) != 1 or graph.out_degree(target) != 0:
+            return False
+        if list(graph.succ[source])[-1] != target:
+            # not appended to the children of `source`, e.g. a subtree put back between its siblings by an undo
+            return False
+
+        # `target` is a new leaf, visited right after the last node in the traversal of `source`
+        if graph.out_degree(source) == 1:
+            # `source` was a leaf, its child takes over its row
+            row = self._rows[self.breadth(source)]
+            if row[-1] != source:
+                return False
+            row.append(target)
+            self._depth[target] = self._depth[source] + 1
+            self._row_key[target] = self._row_key[source]
+            self._dfs_parent[target] = source
+            self._column_insert(target)
+            return True
+
+        last = source
+        while True:
+            last_child = None
+            for child in graph.succ[last]:
+                if child != target and self._dfs_parent.get(child) == last:
+                    last_child = child
+            if last_child is None:
+                break
+            last = last_child
+
+        if graph.out_degree(last) != 0:
+            # the traversal of `source` does not end on a row boundary
+            return False
+
+        self._depth[target] = self._depth[source] + 1
+        self._dfs_parent[target] = source
+        self._insert_row(self.breadth(last) + 1, [target])
+        return True
+
+    def _remove_nodes(self, graph: nx.DiGraph, nodes: frozenset, boundary_edges) -> bool:
+        laid_out = [n for n in nodes if n in self._depth]
+        if not laid_out:
+            return True
+        if self.root in nodes or len(laid_out) != len(nodes) or len(boundary_edges) != 1:
+            # only subtrees that hang off a single edge can be cut out locally
+            return False
+
+        _, top = boundary_edges[0]
+        first_row = self.breadth(top)
+        last_row = max(self.breadth(n) for n in nodes)
+
+        # The removed nodes form a contiguous run in traversal order
+        sequence = [n for row in self._rows[first_row:last_row + 1] for n in row]
+        removed_at = [i for i, n in enumerate(sequence) if n in nodes]
+        if removed_at[-1] - removed_at[0] + 1 != len(nodes):
+            return False
+        for n in nodes:
+            self._column_remove(n)
+        before = sequence[:removed_at[0]]
+        after = sequence[removed_at[-1] + 1:]
+        after_key = self._keys[last_row]
+
+        end = last_row + 1
+        new_rows, new_keys = [], []
+        if before and graph.out_degree(before[-1]) != 0:
+            # the preceding node does not end its row, whatever follows continues it
+            if not after and end < len(self._rows):
+                after = self._rows[end]
+                end += 1
+            for node in after:
+                self._column_remove(node)
+                self._row_key[node] = self._keys[first_row]
+                self._column_insert(node)
+            new_rows.append(before + after)
+            new_keys.append(self._keys[first_row])
+        else:
+            if before:
+                new_rows.append(before)
+                new_keys.append(self._keys[first_row])
+            if after:
+                new_rows.append(after)
+                new_keys.append(after_key)
+
+        self._rows[first_row:end] = new_rows
+        self._keys[first_row:end] = new_keys
+        for n in nodes:
+            del self._depth[n]
+            del self._row_key[n]
+            del self._dfs_parent[n]
+        return True
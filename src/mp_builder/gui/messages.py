@@ -0,0 +1,29 @@
+from typing import Hashable
+
+from textual.message import Message
+
+
+class NodeDataChanged(Message):
+    """
+    Attributes of a node were changed in place by a widget, e.g. a rename or a pipeline selection.
+
+    `before` and `after` hold the changed attributes only, `mp_builder.config.history.MISSING`
+    marks an attribute that was not set.
+    """
+
+    def __init__(self, node_id: Hashable, before: dict, after: dict):
+        self.node_id = node_id
+        self.before = before
+        self.after = after
+        super().__init__()
+
+
+class AutosaveFinished(Message):
+    """
+    A background save finished, posted from the autosave thread. `error` is None on success.
+    """
+
+    def __init__(self, path, error: Exception | None = None):
+        self.path = path
+        self.error = error
+        super().__init__()
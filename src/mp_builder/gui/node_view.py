@@ -1,52 +1,119 @@
-from textual.containers import ScrollableContainer, Container, Vertical, Widget, Horizontal
-from textual.widgets import Static
-from textual.reactive import reactive
-import networkx as nx
+from typing import Hashable, Iterable
 
-from mp_builder.gui.dialogs import PipelineSelectDialogButton
+from rich.text import Text
+from textual.widgets import DataTable
+
+from mp_builder.gui.dialogs import PipelineSelectScreen
+from mp_builder.gui.subscriber import GraphSubscriber
 from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.events import GraphEvent, NodeAdded, EdgeAdded, NodesRemoved, NodeAttrsChanged
 
 
-DEBUG_OUTLINES = False
-NODE_WIDTH = 30
-NODE_HEIGHT = 5
+class NodeView(GraphSubscriber, DataTable):
+    """
+    All workflow nodes as a table, one row per node keyed by its id.
 
-class PipelineView(Widget):
+    Only the visible rows are rendered. Changes of the graph are applied row by row as they are
+    published; clicking a column header sorts by it, selecting a row opens the pipeline picker.
+    """
 
-    #name = reactive("PIPELINE NAME")
-    #node_data = reactive(dict())
+    # column key, label
+    COLUMNS = (
+        ("id", "id"),
+        ("name", "name"),
+        ("version", "version"),
+        ("location", "location"),
+        ("nfcore", "nf-core"),
+        ("in", "in"),
+        ("out", "out"),
+    )
 
-    def __init__(self, node_id, node_data):
-        self.node_id = node_id
-        self.node_data = node_data
-        super().__init__()
+    def __init__(self, metaworkflow_graph: MetaworkflowGraph):
+        self.mg = metaworkflow_graph
+        # column the rows are sorted by and the direction, None while in insertion order
+        self._sort_column: str | None = None
+        self._sort_reverse = False
+        super().__init__(cursor_type="row", zebra_stripes=True)
 
-    def compose(self):
-        with Horizontal():
-            yield Static(self.node_data.get("name", self.node_id))
-            yield PipelineSelectDialogButton(self.node_data)
+    def on_mount(self) -> None:
+        for key, label in self.COLUMNS:
+            self.add_column(label, key=key)
+        self.rebuild()
 
-    #def render(self):
-    #    return f"Pipeline node: {self.name}"
+    def row_cells(self, node_id: Hashable) -> tuple:
+        G = self.mg.G
+        data = G.nodes[node_id]
+        return (
+            str(node_id),
+            data.get("name", "") or "",
+            data.get("version", "") or "",
+            data.get("pipeline_location", "") or "",
+            Text("✓", style="green") if data.get("is_nfcore") else "",
+            G.in_degree(node_id),
+            G.out_degree(node_id),
+        )
 
-class NodeView(Container):
+    def rebuild(self) -> None:
+        """Fill the table from scratch, e.g. after `mg` was replaced."""
+        self.clear()
+        for node_id in self.mg.G.nodes:
+            self.add_row(*self.row_cells(node_id), key=str(node_id))
+        self._resort()
 
-    DEFAULT_CSS = f"""
-    NodeView {{
-        {"border: thick $accent-darken-2; /* Debugging border */" if DEBUG_OUTLINES else ""}
-    }}
+    def update_nodes(self, node_ids: Iterable[Hashable]) -> None:
+        """Add, update or remove the rows of `node_ids` to match the graph."""
+        added = False
+        for node_id in node_ids:
+            key = str(node_id)
+            if node_id not in self.mg.G:
+                if key in self.rows:
+                    self.remove_row(key)
+                continue
+            if key not in self.rows:
+                self.add_row(*self.row_cells(node_id), key=key)
+                added = True
+                continue
+            for (column, _), value in zip(self.COLUMNS, self.row_cells(node_id)):
+                if self.get_cell(key, column) != value:
+                    self.update_cell(key, column, value, update_width=True)
+        if added or self._sort_column is not None:
+            self._resort()
 
-    NodeView > Vertical {{
-        {"border: thick $accent-darken-2; /* Debugging border */" if DEBUG_OUTLINES else ""}
-    }}
-    """
+    def apply(self, *events: GraphEvent) -> None:
+        """Update the rows touched by changes of the graph."""
+        touched = []
+        for event in events:
+            if isinstance(event, NodeAdded):
+                touched.append(event.node)
+            elif isinstance(event, EdgeAdded):
+                touched += [event.source, event.target]
+            elif isinstance(event, NodesRemoved):
+                touched += event.nodes
+                touched += [u for u, _ in event.boundary_edges]
+            elif isinstance(event, NodeAttrsChanged):
+                touched.append(event.node)
+        self.update_nodes(dict.fromkeys(touched))
 
-    def __init__(self, metaworkflow_graph: MetaworkflowGraph):
-        self.mg = metaworkflow_graph
-        super().__init__()
+    def _resort(self) -> None:
+        if self._sort_column is not None:
+            self.sort(self._sort_column, key=self._sort_key, reverse=self._sort_reverse)
+
+    @staticmethod
+    def _sort_key(value):
+        # numbers before text, `Text` cells by their plain content
+        if isinstance(value, int):
+            return 0, value, ""
+        return 1, 0, str(value).lower()
 
-    def compose(self):
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected) -> None:
+        event.stop()
+        column = event.column_key.value
+        self._sort_reverse = not self._sort_reverse if column == self._sort_column else False
+        self._sort_column = column
+        self._resort()
 
-        with Vertical():
-            for i, n in enumerate(self.mg.G.nodes):
-                yield PipelineView(n, self.mg.G.nodes[n])
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        event.stop()
+        node_id = event.row_key.value
+        if node_id in self.mg.G:
+            PipelineSelectScreen.open_for(self.app, node_id, self.mg.G.nodes[node_id])
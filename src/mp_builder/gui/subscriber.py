@@ -0,0 +1,68 @@
+from typing import Callable
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.events import GraphEvent, GraphReplaced
+
+
+class GraphSubscriber:
+    """
+    Mixin for widgets that keep themselves in line with `self.mg` through its change events.
+
+    Subclasses implement `apply(*events)` for incremental updates and `rebuild()` to start over.
+    While the widget is not displayed, e.g. in a hidden tab, events are only collected and
+    applied once it is shown again. If the graph was replaced in the meantime, or more than
+    `MAX_PENDING` events piled up, it rebuilds instead.
+
+    The `on_*` handlers run in addition to those of the widget class, Textual calls the
+    handlers of every class in the MRO.
+    """
+    MAX_PENDING = 1000
+
+    mg: MetaworkflowGraph
+
+    _pending: list[GraphEvent]
+    _stale: bool = False
+    _unsubscribe: Callable[[], None] | None = None
+
+    def apply(self, *events: GraphEvent) -> None:
+        raise NotImplementedError
+
+    def rebuild(self) -> None:
+        raise NotImplementedError
+
+    @property
+    def is_shown(self) -> bool:
+        """False while the widget or one of its ancestors is not displayed."""
+        return all(node.display for node in self.ancestors_with_self)
+
+    def on_mount(self) -> None:
+        self._pending = []
+        self._unsubscribe = self.mg.subscribe(self._on_graph_events)
+
+    def on_unmount(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def on_show(self) -> None:
+        self.catch_up()
+
+    def _on_graph_events(self, events: list[GraphEvent]) -> None:
+        if not self._stale:
+            if any(isinstance(event, GraphReplaced) for event in events) \
+                    or len(self._pending) + len(events) > self.MAX_PENDING:
+                self._stale = True
+                self._pending.clear()
+            else:
+                self._pending += events
+        if self.is_shown:
+            self.catch_up()
+
+    def catch_up(self) -> None:
+        """Apply the events collected while hidden."""
+        stale, pending = self._stale, self._pending
+        self._stale, self._pending = False, []
+        if stale:
+            self.rebuild()
+        elif pending:
+            self.apply(*pending)
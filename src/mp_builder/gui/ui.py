@@ -1,20 +1,28 @@
 from textual.app import App, ComposeResult
-from textual.containers import ScrollableContainer, Grid
+from textual.containers import Grid
 from textual.screen import Screen
 from textual.widgets import Button, Header, Footer, TabbedContent, TabPane, Input, Label
 from textual.css.query import NoMatches
-import networkx as nx
+from textual.reactive import reactive
+from textual.worker import Worker, WorkerState
+from pathlib import Path
 
 from mp_builder.gui.dialogs import QuitScreen
 from mp_builder.gui.node_view import NodeView
 from mp_builder.gui.edge_view import EdgeView
-from mp_builder.gui.graph import GraphView
+from mp_builder.gui.graph import GraphView, GraphScroll, AddNodeButton, RemoveNodeButton
+from mp_builder.gui.messages import NodeDataChanged, AutosaveFinished
+from mp_builder.autosave import Autosaver, DEFAULT_DELAY
 from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.history import CommandHistory, AddNode, RemoveSubtree, SetNodeAttrs
+from mp_builder.catalog import PipelineCatalog
+from mp_builder.utils import get_nfcore_catalog
 
 
 DEBUG_OUTLINES = True
 NODE_HEIGHT = 5
 NODE_WIDTH = 10
+DEFAULT_FILE = "metapipeline.yaml"
 
 class MetaPipelinesApp(App):
     """Main application for graph visualization."""
@@ -22,6 +30,9 @@ class MetaPipelinesApp(App):
     node_height: int = None
     node_width: int = None
 
+    # nf-core catalog, None until the prefetch worker started in `on_mount` has finished
+    nfcore_catalog: reactive[PipelineCatalog | None] = reactive(None, init=False)
+
     CSS_PATH = [
         "styles/styles.tcss",
         "styles/dialogs.tcss",
@@ -37,9 +48,25 @@ class MetaPipelinesApp(App):
         ("l", "lock", "Lock")
     ]
     
-    def __init__(self, metaworkflow_graph: MetaworkflowGraph):
+    def __init__(
+        self,
+        metaworkflow_graph: MetaworkflowGraph,
+        file: Path | str = DEFAULT_FILE,
+        autosave: bool = True,
+        autosave_delay: float = DEFAULT_DELAY,
+    ):
         self._next_node_number = 1
         self.mg = metaworkflow_graph
+        self.history = CommandHistory()
+        self.file = Path(file)
+        self.autosaver = Autosaver(
+            self._serialize_graph,
+            self.file,
+            delay=autosave_delay,
+            on_saved=lambda path: self.post_message(AutosaveFinished(path)),
+            on_error=lambda error: self.post_message(AutosaveFinished(self.file, error)),
+        )
+        self.autosave = autosave
         super().__init__()
 
         css_variables = self.app.get_css_variables()
@@ -68,50 +95,46 @@ class MetaPipelinesApp(App):
 
         return nid
 
+    def on_mount(self) -> None:
+        # Fetch the catalog off the event loop, the request may take up to its timeout
+        self.run_worker(get_nfcore_catalog, name="nfcore-catalog", thread=True, exit_on_error=False)
+        self.autosaver.start()
+
+    def on_unmount(self) -> None:
+        # Write edits that are still waiting for the autosave delay
+        self.autosaver.close(timeout=10)
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        if event.worker.name != "nfcore-catalog":
+            return
+
+        if event.state == WorkerState.SUCCESS:
+            self.nfcore_catalog = event.worker.result
+        elif event.state == WorkerState.ERROR:
+            self.notify("Could not load the nf-core pipeline catalog", severity="warning")
+            self.nfcore_catalog = PipelineCatalog([])
+
     def compose(self) -> ComposeResult:
         yield Header()
         with TabbedContent():
             with TabPane("Graph"):
-                with ScrollableContainer(id="graph-scroll"):
+                with GraphScroll(id="graph-scroll"):
                     yield GraphView(self.mg)  # pass reference
             with TabPane("Nodes"):
-                with ScrollableContainer(id="node-scroll"):
-                    yield NodeView(self.mg)
+                yield NodeView(self.mg)
             with TabPane("Edges"):
-                with ScrollableContainer(id="edge-scroll"):
-                    yield EdgeView()
+                yield EdgeView(self.mg)
         yield Footer()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button press events."""
-        button_id = event.button.id
-        if not button_id:
-            return
-            
         # Handle add button
-        if button_id.startswith("add_btn_"):
-            parent_id = button_id.replace("add_btn_", "")
-            self._add_node(parent_id)
+        if isinstance(event.button, AddNodeButton):
+            self._add_node(event.button.node_id)
             
         # Handle remove button
-        elif button_id.startswith("remove_btn_"):
-            node_id = button_id.replace("remove_btn_", "")
-            self._remove_node(node_id)
-
-        # Handle redraw on pipeline dialog confirm 
-        elif button_id == "confirm-dialog-button":
-
-            # TODO: This does not scroll to the selected node
-            graph_view = self.query_one(GraphView)
-            graph_view.refresh(recompose=True)
-            
-            # Redraw the node view
-            node_view = self.query_one(NodeView)
-            node_view.refresh(recompose=True)
-
-            # Redraw the edge view
-            node_view = self.query_one(EdgeView)
-            node_view.refresh(recompose=True)
+        elif isinstance(event.button, RemoveNodeButton):
+            self._remove_node(event.button.node_id)
 
     
     def on_input_submitted(self, event: Input.Submitted):
@@ -119,16 +142,6 @@ class MetaPipelinesApp(App):
 
         event.stop()
 
-        # TODO: Need to redraw graph_view for events in other views?
-
-        # Redraw the node view
-        node_view = self.query_one(NodeView)
-        node_view.refresh(recompose=True)
-
-        # Redraw the edge view
-        node_view = self.query_one(EdgeView)
-        node_view.refresh(recompose=True)
-
     
     def _add_node(self, parent_id: str) -> None:
             """Add a new node after the parent node."""
@@ -138,20 +151,10 @@ class MetaPipelinesApp(App):
             # Create a new node
             new_node_id = self.next_node_id
 
-            # only update the original graph
-            self.mg.G.add_edge(parent_id, new_node_id)
+            # only update the original graph, the views follow its events
+            self.history.execute(self.mg, AddNode(parent_id, new_node_id))
+            self._graph_changed()
 
-            # Redraw the node view
-            #node_view = self.query_one(NodeView)
-            #node_view.refresh(recompose=True)
-
-            # Redraw the edge view
-            #node_view = self.query_one(EdgeView)
-            #node_view.refresh(recompose=True)
-
-            # Update Graph view
-            graph_view.refresh(recompose=True)
-            
             # Make sure the view scrolls to show the new node
             graph_view.call_after_refresh(self.scroll_to_node, graph_view, new_node_id)
 
@@ -167,63 +170,78 @@ class MetaPipelinesApp(App):
                 self.notify("Cannot remove the root node")
                 return
             
-            # Remove node (and all its edges)
-            to_remove = nx.descendants(self.mg.G, node_id)
-            self.mg.G.remove_node(node_id)
-            for n in to_remove:
-                self.mg.G.remove_node(n)
-
-            # Redraw the graph
-            graph_view = self.query_one(GraphView)
-            graph_view.refresh(recompose=True)
-
-            # Redraw the node view
-            node_view = self.query_one(NodeView)
-            node_view.refresh(recompose=True)
-
-            # Redraw the edge view
-            node_view = self.query_one(EdgeView)
-            node_view.refresh(recompose=True)
+            # Remove node (and all its edges), the views follow the graph's events
+            self.history.execute(self.mg, RemoveSubtree(node_id))
+            self._graph_changed()
 
             self.notify(f"Node removed")
         except NoMatches:
             self.notify("Could not find node to remove")
     
+    def on_node_data_changed(self, event: NodeDataChanged) -> None:
+        """Record in-place edits of node attributes made by the graph or pipeline dialog."""
+        command = SetNodeAttrs.from_change(event.node_id, event.before, event.after)
+        if command is not None:
+            self.history.record(command)
+            # the attributes were already changed in place, only publish the change
+            self.mg.emit(*command.events)
+            self._graph_changed()
+
+    def _graph_changed(self) -> None:
+        """Called after every edit of the graph."""
+        if self.autosave:
+            self.autosaver.mark_dirty()
+
+    def _serialize_graph(self) -> str:
+        # Runs in the autosave thread
+        return self.mg.to_yaml()
+
+    def on_autosave_finished(self, event: AutosaveFinished) -> None:
+        # The autosaver reports a problem once, not every failed retry of it
+        if event.error is not None:
+            self.notify(f"Could not save {event.path}: {event.error}", severity="warning")
+
     def scroll_to_node(self, graph_view: GraphView, node_id: str) -> None:
         """Scroll the view to show a specific node."""
-        focused_graph_node = self.query_one(f"GraphNode#{node_id}")
-        graph_view.scroll_to_widget(focused_graph_node)
+        graph_view.scroll_to_node(node_id)
 
     def action_request_quit(self):
         self.push_screen(QuitScreen())
 
     def action_write_graph(self):
-        file = "metapipeline.yaml"
-        self.notify(f"Writing graph to {file}")
-        self.mg.to_file(file)
+        # Serialized and written by the autosave thread, without waiting for the autosave delay
+        self.notify(f"Writing graph to {self.file}")
+        self.autosaver.save_now()
 
     def action_load_graph(self):
-        self.notify("load_graph action (DUMMY)")
-        file = "metapipeline.yaml"
-        self.mg = MetaworkflowGraph.from_file(file)
-        
-        # Redraw the graph
-        graph_view = self.query_one(GraphView)
-        graph_view.mg = self.mg
-        graph_view.refresh(recompose=True)
-
-        # Redraw the node view
-        node_view = self.query_one(NodeView)
-        node_view.mg = self.mg
-        node_view.refresh(recompose=True)
-
-        #TODO: Redraw Edge View ?
+        self.notify(f"Loading graph from {self.file}")
+        try:
+            loaded = MetaworkflowGraph.from_file(self.file)
+        except Exception as e:
+            # e.g. a missing file or an invalid config, the current graph and its edits are kept
+            self.notify(f"Could not load {self.file}: {type(e).__name__}: {e}", severity="error")
+            return
+
+        # Pending edits of the current graph are dropped, they must not overwrite the file
+        self.autosaver.discard()
+
+        # Edits of the previous graph cannot be undone on the loaded one
+        self.history.clear()
+
+        # Replace the graph in place, the views rebuild when they are shown
+        self.mg.G = loaded.G
 
     def action_undo(self):
-        self.notify("undo action (DUMMY)")
+        if self.history.undo(self.mg) is None:
+            self.notify("Nothing to undo")
+            return
+        self._graph_changed()
 
     def action_redo(self):
-        self.notify("redo action (DUMMY)")
+        if self.history.redo(self.mg) is None:
+            self.notify("Nothing to redo")
+            return
+        self._graph_changed()
 
     def action_lock(self):
         self.notify("lock the graph action (DUMMY)")
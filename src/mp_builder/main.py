@@ -1,9 +1,263 @@
-from mp_builder.gui.ui import MetaPipelinesApp
-from mp_builder.config import MetaworkflowGraph
-
-def main():
-    
-    mg = MetaworkflowGraph()
-    mg.G.add_node(MetaworkflowGraph.ROOT_NODE)
-    app = MetaPipelinesApp(mg)
+import argparse
+import json
+import sys
+
+
+def run_tui(args):
+    from pathlib import Path
+    from mp_builder.config import MetaworkflowGraph
+    from mp_builder.gui.ui import MetaPipelinesApp
+
+    if Path(args.file).is_file():
+        mg = MetaworkflowGraph.from_file(args.file)
+    else:
+        mg = MetaworkflowGraph()
+        mg.G.add_node(MetaworkflowGraph.ROOT_NODE)
+    app = MetaPipelinesApp(mg, file=args.file, autosave=not args.no_autosave, autosave_delay=args.autosave_delay)
     app.run()
+
+
+def run_validate(args) -> int:
+    from mp_builder.validate import collect_config_files, validate_files
+
+    files = collect_config_files(args.paths)
+    if not files:
+        print("No config files found", file=sys.stderr)
+        return 1
+
+    failed = 0
+    for result in validate_files(files, jobs=args.jobs):
+        failed += not result["ok"]
+        print(json.dumps(result), flush=True)
+    return 1 if failed else 0
+
+
+def resource_budget(args):
+    from mp_builder.execution import Resources, host_resources, parse_memory
+
+    host = host_resources()
+    return Resources(
+        args.cpus if args.cpus is not None else host.cpus,
+        parse_memory(args.memory) if args.memory is not None else host.memory,
+    )
+
+
+def run_execute(args) -> int:
+    from pathlib import Path
+    from mp_builder.config import MetaworkflowGraph
+    from mp_builder.execution import NextflowRunner, ScriptRunner, ResumeCache, EventLog, execute, make_scheduler
+
+    mg = MetaworkflowGraph.from_file(args.config)
+    runner = ScriptRunner(args.script) if args.script else NextflowRunner(args.nextflow, resume=args.resume)
+    scheduler = make_scheduler(args.policy, mg.G, args.default_runtime)
+
+    def print_event(event):
+        print(json.dumps(event.to_dict(), default=str), flush=True)
+
+    with EventLog(args.log, config=str(Path(args.config).resolve())) as log:
+        print(f"Recording run {log.run} in {log.path}", file=sys.stderr)
+        try:
+            executor = execute(
+                mg, runner,
+                max_concurrency=args.jobs,
+                workdir=args.workdir,
+                base_dir=Path(args.config).parent,
+                scheduler=scheduler,
+                resume=ResumeCache(args.cache_dir) if args.resume else None,
+                budget=resource_budget(args),
+                on_event=[print_event, log],
+            )
+        except KeyboardInterrupt:
+            return 130
+    return 0 if executor.ok else 1
+
+
+def run_report(args) -> int:
+    from mp_builder.execution import load_run, report
+
+    try:
+        header, records = load_run(args.log, args.run)
+    except (OSError, ValueError) as e:
+        print(f"Could not read run from {args.log}: {e}", file=sys.stderr)
+        return 1
+    print(f"run {header.get('run', args.run)} of {header.get('config', 'unknown config')}")
+    print(report(records))
+
+    if args.update:
+        from mp_builder.config import MetaworkflowGraph
+        from mp_builder.config.yaml_io import load_yaml, dump_yaml
+        from mp_builder.execution import apply_runtimes
+
+        mg = MetaworkflowGraph.from_file(args.update)
+        updated = apply_runtimes(mg.G, records, weight=args.weight)
+
+        # Only set the estimates in the file, everything else is written back as it was loaded
+        config = load_yaml(args.update)
+        for workflow in config["workflows"]:
+            if workflow["id"] in updated:
+                workflow["runtime_estimate"] = updated[workflow["id"]]
+        dump_yaml(config, args.update)
+        print(f"Updated the runtime_estimate of {len(updated)} workflows in {args.update}", file=sys.stderr)
+
+    if args.gantt:
+        from mp_builder.execution import plot_gantt
+
+        try:
+            plot_gantt(records, args.gantt, title=f"run {header.get('run')}")
+        except (RuntimeError, ValueError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"Gantt chart written to {args.gantt}", file=sys.stderr)
+    return 0
+
+
+def run_simulate(args) -> int:
+    from mp_builder.config import MetaworkflowGraph
+    from mp_builder.execution import simulate
+
+    mg = MetaworkflowGraph.from_file(args.config)
+    for jobs in args.jobs:
+        simulation = simulate(
+            mg.G, jobs, policy=args.policy, default_runtime=args.default_runtime, budget=resource_budget(args)
+        )
+        result = simulation.to_dict()
+        if args.schedule:
+            result["schedule"] = [
+                {"node": node, "slot": slot, "start": start, "end": end}
+                for node, slot, start, end in simulation.schedule
+            ]
+        print(json.dumps(result), flush=True)
+    return 0
+
+
+def run_cache(args) -> int:
+    from pathlib import Path
+    from mp_builder.execution import ResumeCache, node_keys
+
+    cache = ResumeCache(args.cache_dir)
+    keys = None
+    if args.config:
+        from mp_builder.config import MetaworkflowGraph
+
+        keys = node_keys(MetaworkflowGraph.from_file(args.config).G, Path(args.config).parent)
+
+    if args.cache_command == "inspect":
+        if keys is None:
+            for entry in cache.entries():
+                print(json.dumps(entry), flush=True)
+        else:
+            # the state of every workflow of the config on the next resumed run
+            for node, key in keys.items():
+                entry = cache.get(key)
+                print(json.dumps({"node": node, "key": key, "cached": entry is not None, "entry": entry}), flush=True)
+    elif args.cache_command == "clean":
+        removed = cache.clean(set(keys.values()) if keys is not None else None)
+        print(f"Removed {removed} cache entries from {cache.cache_dir}", file=sys.stderr)
+    return 0
+
+
+def add_scheduling_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--policy", choices=("critical-path", "fifo"), default="critical-path",
+                        help="order in which ready workflows are launched (default: %(default)s)")
+    parser.add_argument("--default-runtime", type=float, default=1.0, metavar="SECONDS",
+                        help="runtime of workflows without a runtime_estimate (default: %(default)s)")
+    parser.add_argument("--cpus", type=float, default=None,
+                        help="CPUs shared by the workflows' declared requirements (default: all of this host)")
+    parser.add_argument("--memory", default=None,
+                        help="memory shared by the workflows' declared requirements, e.g. '64 GB' (default: all of this host)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mp-builder", description="Meta-Pipeline builder for Nextflow/nf-core")
+    parser.add_argument("-f", "--file", default="metapipeline.yaml",
+                        help="config opened and saved by the editor (default: %(default)s)")
+    parser.add_argument("--autosave-delay", type=float, default=2.0, metavar="SECONDS",
+                        help="save this long after the last edit (default: %(default)s)")
+    parser.add_argument("--no-autosave", action="store_true", help="only save on request")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    validate = commands.add_parser(
+        "validate",
+        help="validate meta-pipeline configs",
+        description="Validate meta-pipeline configs and print one JSON result per file. "
+                    "Exits with status 1 if any config is invalid."
+    )
+    validate.add_argument("paths", nargs="+", help="config files, or directories to search for *.yaml/*.yml")
+    validate.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per core)")
+
+    run = commands.add_parser(
+        "run",
+        help="run a meta-pipeline",
+        description="Run the workflows of a meta-pipeline, each as soon as its upstream workflows have finished. "
+                    "Prints one JSON event per line and exits with status 1 if any workflow failed."
+    )
+    run.add_argument("config", help="meta-pipeline config")
+    run.add_argument("-j", "--jobs", type=int, default=4, help="workflows running at the same time (default: %(default)s)")
+    run.add_argument("-w", "--workdir", default="mp-builder-work",
+                     help="directory with one launch directory per workflow (default: %(default)s)")
+    run.add_argument("--nextflow", default="nextflow", help="Nextflow executable (default: %(default)s)")
+    run.add_argument("--script", help="run this script with the workflow id instead of Nextflow")
+    run.add_argument("--resume", action="store_true",
+                     help="skip workflows that already succeeded with the same inputs, and resume Nextflow runs")
+    run.add_argument("--cache-dir", default=".mp-builder/resume", help="resume cache (default: %(default)s)")
+    run.add_argument("--log", default=".mp-builder/events.jsonl", help="event log the run is appended to (default: %(default)s)")
+    add_scheduling_arguments(run)
+
+    simulate = commands.add_parser(
+        "simulate",
+        help="predict the makespan of a meta-pipeline",
+        description="Simulate a run from the runtime_estimate of every workflow, without running anything. "
+                    "Prints the predicted makespan and slot utilization for each concurrency as JSON lines."
+    )
+    simulate.add_argument("config", help="meta-pipeline config")
+    simulate.add_argument("-j", "--jobs", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                          help="concurrencies to simulate (default: %(default)s)")
+    simulate.add_argument("--schedule", action="store_true", help="include the start and end of every workflow")
+    add_scheduling_arguments(simulate)
+
+    report = commands.add_parser(
+        "report",
+        help="summarize a recorded run",
+        description="Summarize a run from the event log: queue wait, runtime, peak memory and exit code "
+                    "of every workflow, and the critical path of the run."
+    )
+    report.add_argument("--log", default=".mp-builder/events.jsonl", help="event log (default: %(default)s)")
+    report.add_argument("--run", help="run id (default: the last run in the log)")
+    report.add_argument("--gantt", metavar="FILE", help="also draw a Gantt chart, e.g. run.png (needs mp-builder[plot])")
+    report.add_argument("--update", metavar="CONFIG",
+                        help="write the measured runtimes into the runtime_estimate of the workflows of CONFIG")
+    report.add_argument("--weight", type=float, default=0.5,
+                        help="weight of the measured runtime against the previous estimate (default: %(default)s)")
+
+    cache = commands.add_parser(
+        "cache",
+        help="inspect or clean the resume cache",
+        description="Inspect or clean the cache of completed workflows used by 'mp-builder run --resume'."
+    )
+    cache_commands = cache.add_subparsers(dest="cache_command", metavar="COMMAND", required=True)
+    for name, help in (
+        ("inspect", "print the cached workflows as JSON lines, or the cache state of every workflow of CONFIG"),
+        ("clean", "remove all cached workflows, or only those of CONFIG"),
+    ):
+        command = cache_commands.add_parser(name, help=help, description=help[0].upper() + help[1:] + ".")
+        command.add_argument("config", nargs="?", help="meta-pipeline config")
+        command.add_argument("--cache-dir", default=".mp-builder/resume", help="resume cache (default: %(default)s)")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "validate":
+        sys.exit(run_validate(args))
+    if args.command == "run":
+        sys.exit(run_execute(args))
+    if args.command == "simulate":
+        sys.exit(run_simulate(args))
+    if args.command == "report":
+        sys.exit(run_report(args))
+    if args.command == "cache":
+        sys.exit(run_cache(args))
+
+    run_tui(args)
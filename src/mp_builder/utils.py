@@ -1,14 +1,67 @@
 import os
+import re
 import json
-import functools
+import tempfile
+import threading
 from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import requests
-import networkx as nx
-from networkx.readwrite import json_graph
+if TYPE_CHECKING:
+    import networkx as nx
+    from mp_builder.catalog import PipelineCatalog
 
 
-def save_graph_to_file(graph: nx.DiGraph, file: str):
+def atomic_write(path: Path | str, data: str | bytes):
+    """
+    Write `data` to `path` through a temporary file in the same directory and an atomic rename,
+    so readers never observe a partially written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+_MEMORY = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*\.?\s*([KMGTP]?)i?B?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40, "P": 1 << 50}
+
+
+def parse_memory(value: int | float | str | None) -> int:
+    """
+    Bytes of a memory size: a number of bytes, or a string in the Nextflow style, e.g.
+    "8 GB", "8.GB", "512MB" or "1.5TB".
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _MEMORY.match(value)
+    if not match:
+        raise ValueError(f"Invalid memory size: {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.upper()])
+
+
+def format_memory(n: int) -> str:
+    for unit in ("P", "T", "G", "M", "K"):
+        if n >= _UNITS[unit] and n % _UNITS[unit] == 0:
+            return f"{n // _UNITS[unit]} {unit}B"
+    return f"{n} B"
+
+
+def save_graph_to_file(graph: "nx.DiGraph", file: str):
+    from networkx.readwrite import json_graph
+
     data = json_graph.adjacency_data(graph)
     s = json.dumps(data, indent=2)
 
@@ -16,7 +69,8 @@ def save_graph_to_file(graph: nx.DiGraph, file: str):
         f.write(s)
 
 def load_graph_from_file(file: str):
-    
+    from networkx.readwrite import json_graph
+
     with open(file, "r") as f:
         data = json.loads(f.read())
     
@@ -24,19 +78,64 @@ def load_graph_from_file(file: str):
 
     return g
 
-@functools.cache
+# In-process memo of the catalog. Only successful lookups are memoized, so a failed
+# request is retried instead of being cached as `[]` for the process lifetime. The
+# `CatalogCache` is kept for the process and keeps the retries from hitting the network on every call.
+_nfcore_pipelines: list[dict] | None = None
+_nfcore_cache = None
+# Serializes the first lookup, e.g. between the TUI prefetch worker and config loading
+_nfcore_lock = threading.RLock()
+
+
 def get_nfcore_pipelines() -> list[dict]:
+    """
+    The nf-core pipeline catalog, served from the on-disk `mp_builder.catalog.CatalogCache`.
+    """
+    global _nfcore_pipelines, _nfcore_cache
+
+    with _nfcore_lock:
+        if _nfcore_pipelines is None:
+            if _nfcore_cache is None:
+                from mp_builder.catalog import CatalogCache
+                _nfcore_cache = CatalogCache()
+
+            pipelines = _nfcore_cache.get()
+            if not len(pipelines):
+                return []
+            _nfcore_pipelines = pipelines
+
+    return _nfcore_pipelines
+
+
+_nfcore_catalog = None
 
+
+def get_nfcore_catalog() -> "PipelineCatalog":
     """
-    Adapted from nf-core/tools `nf_core.pipelines.list.Workflows:get_remote_workflows` method
+    The indexed nf-core catalog, built once per process from `get_nfcore_pipelines`.
     """
+    global _nfcore_catalog
+    from mp_builder.catalog import PipelineCatalog
 
-    # List all repositories at nf-core
-    nfcore_url = "https://nf-co.re/pipelines.json"
-    
-    response = requests.get(nfcore_url, timeout=10)
-    if response.status_code != 200:
-        return []
-    else:
-        repos = response.json()["remote_workflows"]
-        return [{"name": p.get("full_name", ""), "location": p.get("url", ""), "description": p.get("description", "")} for p in repos]
+    with _nfcore_lock:
+        if _nfcore_catalog is None:
+            pipelines = get_nfcore_pipelines()
+            if not len(pipelines):
+                return PipelineCatalog([])
+            _nfcore_catalog = PipelineCatalog(pipelines)
+
+    return _nfcore_catalog
+
+
+def seed_nfcore_pipelines(pipelines: list[dict]):
+    """
+    Install a catalog snapshot in this process, e.g. one fetched by a parent process,
+    so `get_nfcore_pipelines` and `get_nfcore_catalog` never touch the cache or the network.
+    Seeding `None` starts over with a cache configured from the environment.
+    """
+    global _nfcore_pipelines, _nfcore_catalog, _nfcore_cache
+
+    with _nfcore_lock:
+        _nfcore_pipelines = pipelines
+        _nfcore_catalog = None
+        _nfcore_cache = None
@@ -0,0 +1,82 @@
+"""
+Headless validation of meta-pipeline configs, used by `mp-builder validate`.
+"""
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from mp_builder.utils import get_nfcore_pipelines, seed_nfcore_pipelines
+
+logger = logging.getLogger()
+
+CONFIG_SUFFIXES = (".yaml", ".yml")
+
+
+def collect_config_files(paths: Iterable[Path | str]) -> list[Path]:
+    """Expand directories to the YAML files below them, files are taken as given."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in CONFIG_SUFFIXES and p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def validate_file(path: Path | str) -> dict:
+    """
+    Load and validate a single config. Never raises, failures are reported in the result.
+    """
+    from mp_builder.config import MetaworkflowGraph
+
+    start = time.perf_counter()
+    result = {"file": str(path), "ok": True}
+    result.update(documents=0, workflows=0, transitions=0)
+    try:
+        # configs may hold several meta-pipelines as separate YAML documents, each validated by `from_config`
+        for mg in MetaworkflowGraph.iter_file(Path(path)):
+            result["documents"] += 1
+            result["workflows"] += len(mg.G) - (MetaworkflowGraph.ROOT_NODE in mg.G)
+            result["transitions"] += mg.G.number_of_edges()
+        if not result["documents"]:
+            result["ok"] = False
+            result["error"] = "No meta-pipeline config in the file"
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def _init_worker(pipelines: list[dict]):
+    seed_nfcore_pipelines(pipelines)
+
+
+def validate_files(files: list[Path], jobs: int | None = None) -> Iterator[dict]:
+    """
+    Validate `files` in a pool of `jobs` processes (one per core by default), yielding the
+    results as they complete.
+
+    The nf-core catalog is resolved once in this process and handed to every worker, so
+    workers neither race on the cache nor fetch the catalog themselves.
+    """
+    if not files:
+        return
+
+    # one snapshot for the whole run, an unavailable catalog is not retried for every file
+    pipelines = get_nfcore_pipelines()
+    seed_nfcore_pipelines(pipelines)
+    jobs = min(jobs or os.cpu_count() or 1, len(files))
+
+    if jobs == 1:
+        for path in files:
+            yield validate_file(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(pipelines,)) as executor:
+        futures = [executor.submit(validate_file, path) for path in files]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,37 @@
+from mp_builder.autosave import Autosaver
+
+
+def test_persistent_error_is_reported_once(tmp_path):
+    errors = []
+
+    def serialize():
+        raise KeyError("name")
+
+    saver = Autosaver(serialize, tmp_path / "graph.yaml", delay=0.01, on_error=errors.append)
+    saver.start()
+    try:
+        for _ in range(3):
+            saver.mark_dirty()
+            assert saver.flush(timeout=5)
+    finally:
+        saver.close(timeout=5)
+
+    assert [str(e) for e in errors] == ["'name'"]
+    assert not (tmp_path / "graph.yaml").exists()
+
+
+def test_saves_after_edits_settle(tmp_path):
+    path = tmp_path / "graph.yaml"
+    content = ["a"]
+    saver = Autosaver(lambda: content[0], path, delay=0.01)
+    saver.start()
+    try:
+        saver.mark_dirty()
+        assert saver.flush(timeout=5)
+        assert path.read_text() == "a"
+        content[0] = "b"
+        saver.mark_dirty()
+        assert saver.flush(timeout=5)
+        assert path.read_text() == "b"
+    finally:
+        saver.close(timeout=5)
@@ -0,0 +1,208 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mp_builder.catalog import CatalogCache, CatalogCacheSettings, PipelineCatalog
+
+PAYLOAD = {"remote_workflows": [
+    {"full_name": "nf-core/rnaseq", "url": "https://github.com/nf-core/rnaseq", "description": "RNA sequencing"},
+]}
+
+
+class Catalog(BaseHTTPRequestHandler):
+    """Stand-in for nf-co.re, serving `payload` with `etag` or failing with `status`."""
+    payload = PAYLOAD
+    etag = '"v1"'
+    status = 200
+    requests: list[dict]
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        if self.status != 200:
+            self.send_error(self.status)
+        elif self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = json.dumps(self.payload).encode()
+            self.send_response(200)
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (Catalog,), {"requests": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{httpd.server_port}/pipelines.json"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(server, tmp_path):
+    _, url = server
+    cache = CatalogCache(CatalogCacheSettings(url=url, cache_dir=tmp_path, timeout=5))
+    yield cache
+    cache.clear()
+
+
+def test_failed_lookup_is_not_retried_right_away(server, cache):
+    handler, _ = server
+    handler.status = 500
+
+    assert cache.get() == []
+    assert cache.get() == []
+    assert len(handler.requests) == 1
+
+    # another cache, e.g. for another cache_dir, does its own lookup
+    assert CatalogCache(cache.settings).get() == []
+    assert len(handler.requests) == 2
+
+    handler.status = 200
+    cache.settings.retry_after = 0
+    assert [p["name"] for p in cache.get()] == ["nf-core/rnaseq"]
+    assert len(handler.requests) == 3
+
+
+def test_fresh_entry_is_served_without_a_request(server, cache):
+    handler, _ = server
+    assert len(cache.get()) == 1
+    assert len(cache.get()) == 1
+    assert len(handler.requests) == 1
+
+
+def test_expired_entry_is_revalidated_with_its_etag(server, cache):
+    handler, _ = server
+    cache.get()
+    fetched_at = cache.read()["fetched_at"]
+
+    cache.settings.ttl = cache.settings.stale_while_revalidate = 0
+    assert [p["name"] for p in cache.get()] == ["nf-core/rnaseq"]
+
+    assert len(handler.requests) == 2
+    assert handler.requests[-1].get("If-None-Match") == '"v1"'
+    # 304: the entry is kept and counts as fresh again
+    assert cache.read()["fetched_at"] > fetched_at
+
+
+def test_changed_catalog_replaces_the_entry(server, cache):
+    handler, _ = server
+    cache.get()
+
+    handler.etag = '"v2"'
+    handler.payload = {"remote_workflows": [{"full_name": "nf-core/sarek", "url": "https://github.com/nf-core/sarek"}]}
+    cache.settings.ttl = cache.settings.stale_while_revalidate = 0
+    assert [p["name"] for p in cache.get()] == ["nf-core/sarek"]
+    assert cache.read()["etag"] == '"v2"'
+
+
+def test_stale_entry_is_served_while_revalidating(server, cache):
+    handler, _ = server
+    cache.get()
+
+    cache.settings.ttl = 0
+    assert len(cache.get()) == 1
+    cache._revalidation.join(5)
+    assert len(handler.requests) == 2
+
+
+def test_cached_entry_is_served_if_the_server_fails(server, cache):
+    handler, _ = server
+    cache.get()
+
+    handler.status = 503
+    cache.settings.ttl = cache.settings.stale_while_revalidate = 0
+    assert [p["name"] for p in cache.get()] == ["nf-core/rnaseq"]
+    assert len(handler.requests) == 2
+
+
+def test_offline_mode_only_reads_the_cache(server, cache):
+    handler, _ = server
+    cache.settings.offline = True
+    assert cache.get() == []
+
+    cache.clear()
+    cache.settings.offline = False
+    cache.get()
+    cache.settings.offline = True
+    cache.settings.ttl = cache.settings.stale_while_revalidate = 0
+    assert [p["name"] for p in cache.get()] == ["nf-core/rnaseq"]
+    assert len(handler.requests) == 1
+
+
+PIPELINES = [
+    {"name": f"nf-core/{name}", "location": f"https://github.com/nf-core/{name}", "description": description}
+    for name, description in (
+        ("rnaseq", "RNA sequencing analysis pipeline using STAR, RSEM, HISAT2 or Salmon"),
+        ("sarek", "Analysis pipeline to detect germline or somatic variants from WGS / targeted sequencing"),
+        ("scrnaseq", "Single-cell RNA-Seq pipeline"),
+        ("rnafusion", "RNA sequencing analysis pipeline for detection of gene-fusions"),
+        ("methylseq", "Methylation (Bisulfite-Sequencing) analysis pipeline"),
+    )
+]
+
+
+@pytest.fixture
+def catalog():
+    return PipelineCatalog(PIPELINES)
+
+
+def names(catalog, indices) -> list[str]:
+    return [catalog.names[i] for i in indices]
+
+
+def test_lookup_by_name(catalog):
+    assert catalog.by_name("nf-core/sarek") == PIPELINES[1]
+    assert "nf-core/sarek" in catalog
+    # lookups are exact, searching resolves short names
+    assert catalog.by_name("sarek") is None
+    assert catalog.by_name("nf-core/Sarek") is None
+
+
+def test_lookup_by_location(catalog):
+    assert catalog.index_of_location("https://github.com/nf-core/sarek") == 1
+    assert catalog.index_of_location(" HTTPS://github.com/nf-core/sarek.git/") == 1
+    assert catalog.by_location("https://github.com/nf-core/rnaseq/")["name"] == "nf-core/rnaseq"
+    assert catalog.index_of_location("https://github.com/nf-core/sareks") is None
+    assert catalog.index_of_location("") is None
+
+
+def test_duplicate_names_resolve_to_the_last_entry():
+    catalog = PipelineCatalog(PIPELINES + [dict(PIPELINES[0], location="https://example.org/rnaseq")])
+    assert catalog.by_name("nf-core/rnaseq")["location"] == "https://example.org/rnaseq"
+
+
+def test_search_ranks_exact_then_prefix_then_trigram_matches(catalog):
+    # exact short name first, then the other prefix match, then shared trigrams
+    assert names(catalog, catalog.search("rnaseq")) == ["nf-core/rnaseq", "nf-core/scrnaseq", "nf-core/rnafusion"]
+    # prefixes of the full and the short name, in name order
+    assert names(catalog, catalog.search("RNA")) == ["nf-core/rnafusion", "nf-core/rnaseq", "nf-core/scrnaseq"]
+    assert names(catalog, catalog.search("nf-core/rna"))[:2] == ["nf-core/rnafusion", "nf-core/rnaseq"]
+    assert names(catalog, catalog.search("rna", limit=1)) == ["nf-core/rnafusion"]
+
+
+def test_search_tolerates_typos(catalog):
+    assert names(catalog, catalog.search("sarekk")) == ["nf-core/sarek"]
+    assert names(catalog, catalog.search("methylsq")) == ["nf-core/methylseq"]
+    # matches in the description
+    assert names(catalog, catalog.search("fusions")) == ["nf-core/rnafusion"]
+
+
+def test_empty_query_lists_everything(catalog):
+    assert catalog.search("") == list(range(len(PIPELINES)))
+    assert catalog.search("   ", limit=2) == [0, 1]
+
+
+def test_no_match(catalog):
+    assert catalog.search("zzzz") == []
+    assert PipelineCatalog([]).search("rnaseq") == []
@@ -0,0 +1,69 @@
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.yaml_io import load_yaml
+from mp_builder.utils import seed_nfcore_pipelines
+
+CONFIG = """\
+config_version: 0.1.0
+workflows:
+- id: a
+  name: example/a
+  description: first step
+  pipeline_location: https://github.com/example/a
+  version: 1.0.0
+- id: b
+  name: example/b
+  version: 2.0.0
+  runtime_estimate: 30.0
+- id: c
+  name: example/c
+  version: 1.1.0
+  cpus: 2.0
+  memory: 4 GB
+workflow_opts:
+  wf_opts: -profile docker
+workflow_opts_custom:
+  wf_opts: -profile singularity
+transitions:
+- run: a
+- from: a
+  run: c
+  config-file: c.config
+- from: a
+  run: b
+  params-file: p.yaml
+  adapter: ad
+  params:
+  - input: x.csv
+"""
+
+
+def setup_module():
+    seed_nfcore_pipelines([])
+
+
+def test_config_round_trips(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG)
+    mg = MetaworkflowGraph.from_file(path)
+
+    # config-level fields, params-file, config-file, descriptions and the order of transitions are kept
+    assert mg.to_yaml() == CONFIG
+
+    mg.to_file(path)
+    reloaded = MetaworkflowGraph.from_file(path)
+    assert list(reloaded.G.nodes(data=True)) == list(mg.G.nodes(data=True))
+    assert list(reloaded.G.edges(data=True)) == list(mg.G.edges(data=True))
+    assert reloaded.G.graph == mg.G.graph
+
+
+def test_config_of_graph_built_in_tui(tmp_path):
+    # nodes as added in the TUI, without version and partly without name
+    mg = MetaworkflowGraph()
+    mg.G.add_edge(MetaworkflowGraph.ROOT_NODE, "node2")
+    mg.G.add_edge("node2", "node3")
+    mg.G.nodes["node3"]["name"] = "renamed"
+
+    path = tmp_path / "config.yaml"
+    mg.to_file(path)
+    assert load_yaml(path)["workflows"] == [{"id": "node2", "name": "node2"}, {"id": "node3", "name": "renamed"}]
+    assert MetaworkflowGraph.from_file(path).to_yaml() == mg.to_yaml()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import time
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.execution import DagExecutor, NodeBlocked, NodeFinished, NodeStarted, Runner
+
+# exits with the code in MP_BUILDER_TEST_EXIT after sleeping MP_BUILDER_TEST_SLEEP seconds
+SCRIPT = "import os, sys, time; time.sleep(float(os.environ['MP_BUILDER_TEST_SLEEP'])); sys.exit(int(os.environ['MP_BUILDER_TEST_EXIT']))"
+
+
+class StubRunner(Runner):
+    """Runs a Python one-liner instead of Nextflow, taking the node's `sleep` and `exit` attributes."""
+
+    def command(self, task):
+        return [sys.executable, "-c", SCRIPT]
+
+    def environment(self, task):
+        return {
+            "MP_BUILDER_TEST_SLEEP": str(task.attrs.get("sleep", 0)),
+            "MP_BUILDER_TEST_EXIT": str(task.attrs.get("exit", 0)),
+        }
+
+
+def make_graph(**attrs) -> MetaworkflowGraph:
+    """root -> a -> b and root -> c -> d, the a-b chain is the longer one."""
+    mg = MetaworkflowGraph()
+    G = mg.G
+    G.add_node(MetaworkflowGraph.ROOT_NODE)
+    for node, estimate in (("a", 20.0), ("b", 20.0), ("c", 10.0), ("d", 1.0)):
+        G.add_node(node, name=f"test/{node}", runtime_estimate=estimate, **attrs.get(node, {}))
+    G.add_edges_from([(MetaworkflowGraph.ROOT_NODE, "a"), ("a", "b"), (MetaworkflowGraph.ROOT_NODE, "c"), ("c", "d")])
+    return mg
+
+
+def make_executor(mg, tmp_path, events, **kwargs) -> DagExecutor:
+    return DagExecutor(
+        mg, StubRunner(), workdir=tmp_path / "work", base_dir=tmp_path,
+        rss_interval=None, on_event=[events.append], **kwargs,
+    )
+
+
+def test_longest_path_is_started_first(tmp_path):
+    events = []
+    executor = make_executor(make_graph(), tmp_path, events, max_concurrency=1)
+    assert asyncio.run(executor.run())
+
+    assert [e.node for e in events if isinstance(e, NodeStarted)] == ["a", "b", "c", "d"]
+    assert all(isinstance(r, NodeFinished) and r.returncode == 0 for r in executor.results.values())
+
+
+def test_failure_blocks_descendants_only(tmp_path):
+    events = []
+    executor = make_executor(make_graph(a={"exit": 3}), tmp_path, events, max_concurrency=2)
+    assert not asyncio.run(executor.run())
+
+    results = executor.results
+    assert results["a"].returncode == 3
+    assert isinstance(results["b"], NodeBlocked) and results["b"].failed == "a"
+    assert results["c"].ok and results["d"].ok
+    assert "b" not in {e.node for e in events if isinstance(e, NodeStarted)}
+
+
+def test_cancel_stops_running_processes(tmp_path):
+    events = []
+    executor = make_executor(make_graph(a={"sleep": 60}, c={"sleep": 60}), tmp_path, events, max_concurrency=2)
+
+    async def run():
+        task = asyncio.create_task(executor.run())
+        while sum(isinstance(e, NodeStarted) for e in events) < 2:
+            await asyncio.sleep(0.05)
+        start = time.monotonic()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 5
+    for event in events:
+        if isinstance(event, NodeStarted):
+            # terminated and reaped
+            try:
+                os.kill(event.pid, 0)
+            except ProcessLookupError:
+                continue
+            raise AssertionError(f"process of {event.node} is still running")
+    assert not any(isinstance(e, NodeStarted) and e.node in ("b", "d") for e in events)
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import networkx as nx
+from textual.widgets import Input, OptionList, TabbedContent
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.gui.dialogs import PipelineSelectScreen
+from mp_builder.gui.graph import GraphView, NODE_HEIGHT, edge_guide
+from mp_builder.gui.layout import GraphLayout
+from mp_builder.gui.ui import MetaPipelinesApp
+from mp_builder.utils import seed_nfcore_pipelines
+
+from test_catalog import Catalog
+
+
+def make_app(tmp_path) -> MetaPipelinesApp:
+    seed_nfcore_pipelines([])
+    mg = MetaworkflowGraph()
+    mg.G.add_node(MetaworkflowGraph.ROOT_NODE)
+    return MetaPipelinesApp(mg, file=tmp_path / "metapipeline.yaml", autosave=False)
+
+
+async def show_tab(app, pilot, index: int):
+    # a focused widget pulls its own tab back to the front
+    app.set_focus(None)
+    tabs = app.query_one(TabbedContent)
+    tabs.active = tabs.query("TabPane")[index].id
+    await pilot.pause()
+    await pilot.pause()
+
+
+def test_graph_view_rebinds_nodes_recreated_while_hidden(tmp_path):
+    async def run():
+        app = make_app(tmp_path)
+        G = app.mg.G
+        async with app.run_test(size=(170, 40)) as pilot:
+            await pilot.pause()
+            graph_view = app.query_one(GraphView)
+            app._add_node("node0")
+            app._add_node("node2")
+            await pilot.pause()
+
+            # undo and redo recreate node3 while the graph tab is hidden
+            await show_tab(app, pilot, 1)
+            await pilot.press("ctrl+z", "ctrl+y")
+            await show_tab(app, pilot, 0)
+            assert all(w.node_data is G.nodes[n] for n, w in graph_view._node_widgets.items())
+
+            node_input = graph_view._node_widgets["node3"].query_one(Input)
+            node_input.focus()
+            node_input.value = "renamed"
+            await pilot.press("enter")
+            assert G.nodes["node3"]["name"] == "renamed"
+
+            await show_tab(app, pilot, 1)
+            await pilot.press("ctrl+z")
+            await show_tab(app, pilot, 0)
+            assert "name" not in G.nodes["node3"]
+            assert graph_view._node_widgets["node3"].query_one(Input).value == "node3"
+
+    asyncio.run(run())
+
+
+def test_edge_guides():
+    G = nx.DiGraph([("r", "a"), ("a", "c"), ("a", "d"), ("d", "e"), ("d", "f"), ("d", "g"), ("r", "b"), ("b", "h")])
+    layout = GraphLayout.compute(G, "r")
+
+    def drawn(depth):
+        lines = [edge_guide(layout, G.succ, depth, y) for y in range(layout.n_rows * NODE_HEIGHT)]
+        return {y: line for y, line in enumerate(lines) if line.strip()}
+
+    assert drawn(0) == {2: "──┬─→", **{y: "  │  " for y in range(3, 22)}, 22: "  └─→"}
+    assert drawn(1) == {2: "──┬─→", **{y: "  │  " for y in range(3, 7)}, 7: "  └─→", 22: "────→"}
+    assert drawn(2) == {7: "──┬─→", **{y: "  │  " for y in (*range(8, 12), *range(13, 17))}, 12: "  ├─→", 17: "  └─→"}
+
+
+def test_edge_columns_follow_the_window(tmp_path):
+    async def run():
+        seed_nfcore_pipelines([])
+        mg = MetaworkflowGraph()
+        nx.add_path(mg.G, [f"node{i}" for i in range(1, 41)])
+        app = MetaPipelinesApp(mg, file=tmp_path / "metapipeline.yaml", autosave=False)
+        async with app.run_test(size=(170, 40)) as pilot:
+            await pilot.pause()
+            graph_view = app.query_one(GraphView)
+            columns, _ = graph_view._window()
+            assert set(graph_view._edge_widgets) == set(columns)
+
+            # a new branch redraws the materialized edge column
+            app._add_node("node1")
+            await pilot.pause()
+            edge = graph_view._edge_widgets[0]
+            assert edge.render_line(2).text.strip() == "──┬─→"
+            assert edge.render_line(7).text.strip() == "└─→"
+
+            graph_view.scroll_to_node("node40")
+            await pilot.pause()
+            columns, _ = graph_view._window()
+            assert set(graph_view._edge_widgets) == {d for d in columns if d < 39}
+            assert 0 not in graph_view._edge_widgets
+
+    asyncio.run(run())
+
+
+def test_autosave_writes_graph_built_in_tui(tmp_path):
+    async def run():
+        seed_nfcore_pipelines([])
+        mg = MetaworkflowGraph()
+        mg.G.add_node(MetaworkflowGraph.ROOT_NODE)
+        app = MetaPipelinesApp(mg, file=tmp_path / "metapipeline.yaml", autosave_delay=0.01)
+        async with app.run_test(size=(170, 40)) as pilot:
+            await pilot.pause()
+            app._add_node("node0")
+            app._add_node("node2")
+            assert app.autosaver.flush(timeout=5)
+
+        saved = MetaworkflowGraph.from_file(tmp_path / "metapipeline.yaml")
+        assert set(saved.G.edges) == {("node0", "node2"), ("node2", "node3")}
+
+    asyncio.run(run())
+
+
+def test_ui_responds_while_catalog_loads(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    class SlowCatalog(Catalog):
+        requests = []
+
+        def do_GET(self):
+            release.wait(10)
+            super().do_GET()
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SlowCatalog)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    monkeypatch.setenv("MP_BUILDER_NFCORE_URL", f"http://127.0.0.1:{httpd.server_port}/pipelines.json")
+    monkeypatch.setenv("MP_BUILDER_CACHE_DIR", str(tmp_path / "cache"))
+
+    async def run():
+        app = make_app(tmp_path)
+        seed_nfcore_pipelines(None)
+        async with app.run_test(size=(170, 40)) as pilot:
+            await pilot.pause()
+            theme = app.theme
+            start = time.monotonic()
+            await pilot.press("d")
+            assert app.theme != theme
+            assert time.monotonic() - start < 1
+            assert app.nfcore_catalog is None
+
+            app._add_node("node0")
+            PipelineSelectScreen.open_for(app, "node2", app.mg.G.nodes["node2"])
+            await pilot.pause()
+            options = app.screen.query_one("#nf-core-pipelines-list", OptionList)
+            assert str(options.get_option_at_index(0).prompt) == "Loading nf-core pipelines..."
+
+            release.set()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert len(app.nfcore_catalog) == 1
+            assert str(options.get_option_at_index(0).prompt).startswith("nf-core/rnaseq")
+            assert len(SlowCatalog.requests) == 1
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        httpd.shutdown()
+        httpd.server_close()
+        seed_nfcore_pipelines([])
+
+
+def test_failed_load_keeps_graph_and_history(tmp_path):
+    async def run():
+        app = make_app(tmp_path)
+        async with app.run_test(size=(170, 40)) as pilot:
+            await pilot.pause()
+            app._add_node("node0")
+            await pilot.pause()
+            nodes = list(app.mg.G)
+
+            # missing, then invalid
+            await pilot.press("o")
+            (tmp_path / "metapipeline.yaml").write_text("config_version: 0.0.1\nworkflows: []\ntransitions:\n- run: x\n")
+            await pilot.press("o")
+            await pilot.pause()
+
+            assert list(app.mg.G) == nodes
+            assert app.history.can_undo
+
+    asyncio.run(run())
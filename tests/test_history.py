@@ -0,0 +1,100 @@
+from copy import deepcopy
+
+import networkx as nx
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.history import MISSING, AddNode, CommandHistory, RemoveSubtree, SetNodeAttrs
+
+ROOT = MetaworkflowGraph.ROOT_NODE
+
+
+def make_graph() -> MetaworkflowGraph:
+    mg = MetaworkflowGraph()
+    G = mg.G
+    G.add_node(ROOT)
+    G.add_node("a", name="x/a", version="1.0")
+    G.add_node("b", name="x/b")
+    G.add_node("c", name="x/c", cpus=2.0)
+    G.add_node("d", name="x/d")
+    G.add_node("e", name="x/e")
+    G.add_edge(ROOT, "a")
+    # b is the middle child of a, with a subtree of its own
+    G.add_edge("a", "e", data={"run": "e"})
+    G.add_edge("a", "b", data={"run": "b", "params": [{"input": "x.csv"}]})
+    G.add_edge("a", "d")
+    G.add_edge("b", "c")
+    return mg
+
+
+def snapshot(G: nx.DiGraph):
+    # successors as lists, so the order of siblings is compared too; restored nodes are
+    # appended to the node order. Copied, commands edit the attribute dicts in place
+    return deepcopy((dict(G.nodes(data=True)), {n: list(G.succ[n].items()) for n in G}))
+
+
+def test_commands_round_trip():
+    mg = make_graph()
+    history = CommandHistory()
+    commands = [
+        AddNode("a", "f", {"name": "x/f"}),
+        SetNodeAttrs.from_change("c", {"cpus": 2.0}, {"cpus": 4.0, "memory": "8 GB"}),
+        RemoveSubtree("b"),
+    ]
+
+    states = [snapshot(mg.G)]
+    for command in commands:
+        history.execute(mg, command)
+        states.append(snapshot(mg.G))
+    assert "b" not in mg.G and "c" not in mg.G
+
+    for state in reversed(states[:-1]):
+        history.undo(mg)
+        assert snapshot(mg.G) == state
+    assert history.undo(mg) is None
+
+    for state in states[1:]:
+        history.redo(mg)
+        assert snapshot(mg.G) == state
+    assert history.redo(mg) is None
+
+
+def test_set_node_attrs_unsets_new_keys():
+    mg = make_graph()
+    history = CommandHistory()
+    command = SetNodeAttrs.from_change("a", dict(mg.G.nodes["a"]), {**mg.G.nodes["a"], "memory": "1 GB"})
+    assert command.before == {"memory": MISSING}
+
+    attrs = mg.G.nodes["a"]
+    history.execute(mg, command)
+    history.undo(mg)
+    assert "memory" not in mg.G.nodes["a"]
+    # changed in place, widgets keep their reference
+    assert mg.G.nodes["a"] is attrs
+    assert SetNodeAttrs.from_change("a", {"name": "x"}, {"name": "x"}) is None
+
+
+def test_new_command_clears_redo():
+    mg = make_graph()
+    history = CommandHistory()
+    history.execute(mg, AddNode("a", "f"))
+    history.undo(mg)
+    assert history.can_redo
+
+    history.execute(mg, AddNode("a", "g"))
+    assert not history.can_redo
+    assert history.redo(mg) is None
+    assert "f" not in mg.G
+
+
+def test_depth_is_bounded():
+    mg = make_graph()
+    history = CommandHistory(max_depth=3)
+    for i in range(5):
+        history.execute(mg, AddNode("a", f"n{i}"))
+
+    undone = 0
+    while history.undo(mg) is not None:
+        undone += 1
+    assert undone == 3
+    # the two oldest edits can no longer be undone
+    assert {"n0", "n1"} <= set(mg.G) and not {"n2", "n3", "n4"} & set(mg.G)
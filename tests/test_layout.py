@@ -0,0 +1,172 @@
+import random
+
+import networkx as nx
+import pytest
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.history import AddNode, CommandHistory, RemoveSubtree
+from mp_builder.gui.layout import GraphLayout
+
+ROOT = "root"
+
+
+def positions(layout: GraphLayout) -> dict:
+    return dict(layout.items())
+
+
+class FollowedLayout:
+    """A layout kept up to date from the events of `mg`, recomputed where `apply` gives up, like `GraphView`."""
+
+    def __init__(self, mg: MetaworkflowGraph):
+        self.mg = mg
+        self.layout = GraphLayout.compute(mg.G, ROOT)
+        # number of mutations that could not be applied incrementally
+        self.recomputed = 0
+        mg.subscribe(self.on_events)
+
+    def on_events(self, events):
+        for event in events:
+            if not self.layout.apply(self.mg.G, event):
+                self.layout = GraphLayout.compute(self.mg.G, ROOT)
+                self.recomputed += 1
+                return
+
+    def assert_matches_compute(self):
+        expected = GraphLayout.compute(self.mg.G, ROOT)
+        assert positions(self.layout) == positions(expected)
+        assert self.layout.columns() == expected.columns()
+
+
+def make_graph(edges) -> MetaworkflowGraph:
+    mg = MetaworkflowGraph()
+    mg.G = nx.DiGraph(edges)
+    return mg
+
+
+def test_undo_remove_subtree_between_siblings():
+    mg = make_graph([(ROOT, "node2"), ("node2", "node3"), ("node2", "node4")])
+    followed, history = FollowedLayout(mg), CommandHistory()
+
+    history.execute(mg, RemoveSubtree("node3"))
+    followed.assert_matches_compute()
+    history.undo(mg)
+    followed.assert_matches_compute()
+    assert followed.layout["node3"].breadth == 0
+    assert followed.layout["node4"].breadth == 1
+
+    history.redo(mg)
+    followed.assert_matches_compute()
+    history.execute(mg, AddNode("node2", "node5"))
+    followed.assert_matches_compute()
+
+
+def grid(layout: GraphLayout) -> dict:
+    return {node: tuple(position) for node, position in layout.items()}
+
+
+def test_depth_is_the_longest_path():
+    G = nx.DiGraph([(ROOT, "a"), ("a", "b"), ("b", "c"), (ROOT, "c")])
+    layout = GraphLayout.compute(G, ROOT)
+    assert {n: layout.depth(n) for n in layout} == {ROOT: 0, "a": 1, "b": 2, "c": 3}
+    assert layout.n_columns == 4
+
+
+def test_breadth_counts_leaves_visited_before():
+    # children in adjacency order, a parent shares the row of its first child
+    G = nx.DiGraph([(ROOT, "a"), ("a", "c"), ("a", "d"), (ROOT, "b"), ("d", "e"), ("d", "f")])
+    layout = GraphLayout.compute(G, ROOT)
+    assert grid(layout) == {
+        ROOT: (0, 0), "a": (1, 0), "c": (2, 0),
+        "d": (2, 1), "e": (3, 1),
+        "f": (3, 2),
+        "b": (1, 3),
+    }
+    assert layout.n_rows == 4
+
+
+def test_joins_are_drawn_once():
+    # diamond: c is reached from a and b, it is placed after its deepest parent in the row of its first visit
+    G = nx.DiGraph([(ROOT, "a"), (ROOT, "b"), ("a", "c"), ("b", "x"), ("x", "c"), ("c", "d")])
+    layout = GraphLayout.compute(G, ROOT)
+    assert grid(layout) == {ROOT: (0, 0), "a": (1, 0), "c": (3, 0), "d": (4, 0), "b": (1, 1), "x": (2, 1)}
+    assert len(layout) == len(G)
+
+
+def test_unreachable_nodes_are_not_laid_out():
+    G = nx.DiGraph([(ROOT, "a"), ("orphan", "a"), ("orphan", "b")])
+    G.add_node("lonely")
+    layout = GraphLayout.compute(G, ROOT)
+    assert set(layout) == {ROOT, "a"}
+    assert "orphan" not in layout and "b" not in layout
+    assert len(GraphLayout.compute(G, "missing")) == 0
+
+
+def test_columns_in_row_order():
+    G = nx.DiGraph([(ROOT, "a"), ("a", "c"), ("a", "d"), (ROOT, "b")])
+    layout = GraphLayout.compute(G, ROOT)
+    columns = layout.columns()
+    assert [column.nodes for column in columns] == [[ROOT], ["a", "b"], ["c", "d"]]
+    assert [column.breadths for column in columns] == [[0], [0, 2], [0, 1]]
+    assert list(layout.column_items(2, start=1)) == [("d", (2, 1))]
+    assert list(layout.column_items(1, start=1, stop=2)) == []
+    assert list(layout.column_items(7)) == []
+
+
+def test_deep_and_wide_graphs():
+    # iterative traversal, no recursion limit
+    chain = nx.path_graph([ROOT, *range(50_000)], create_using=nx.DiGraph)
+    assert GraphLayout.compute(chain, ROOT).n_columns == 50_001
+
+    star = nx.DiGraph((ROOT, i) for i in range(50_000))
+    layout = GraphLayout.compute(star, ROOT)
+    assert layout.n_rows == 50_000 and layout[49_999] == (1, 49_999)
+
+
+def test_local_edits_are_applied_incrementally():
+    mg = make_graph([(ROOT, "a"), ("a", "b"), (ROOT, "c")])
+    followed, history = FollowedLayout(mg), CommandHistory()
+
+    steps = [
+        AddNode("b", "d"),     # a leaf gets a child, the row is extended
+        AddNode("a", "e"),     # a new last child opens a row
+        AddNode(ROOT, "f"),    # a new last row
+        AddNode("e", "g"),
+        RemoveSubtree("e"),    # a row in the middle is cut out
+        RemoveSubtree("d"),    # the row of b ends at b again
+        RemoveSubtree("a"),    # the first rows are cut out, c moves up
+    ]
+    for command in steps:
+        history.execute(mg, command)
+        followed.assert_matches_compute()
+    assert followed.recomputed == 0
+
+    while history.undo(mg) is not None:
+        followed.assert_matches_compute()
+    while history.redo(mg) is not None:
+        followed.assert_matches_compute()
+
+
+@pytest.mark.parametrize("gap", [GraphLayout.ROW_KEY_GAP, 2])
+def test_random_edits_match_compute(monkeypatch, gap):
+    # with a gap of 2 every other inserted row renumbers all rows
+    monkeypatch.setattr(GraphLayout, "ROW_KEY_GAP", gap)
+    recomputed = 0
+    for seed in range(30):
+        rnd = random.Random(seed)
+        mg = make_graph([(ROOT, "n0")])
+        followed, history = FollowedLayout(mg), CommandHistory()
+        for i in range(1, 60):
+            nodes = [n for n in mg.G if n != ROOT]
+            choice = rnd.random()
+            if choice < 0.5 or not nodes:
+                history.execute(mg, AddNode(rnd.choice(nodes or [ROOT]), f"n{i}"))
+            elif choice < 0.65:
+                history.execute(mg, RemoveSubtree(rnd.choice(nodes)))
+            elif choice < 0.85:
+                history.undo(mg)
+            else:
+                history.redo(mg)
+            followed.assert_matches_compute()
+        recomputed += followed.recomputed
+    # most edits are applied locally, only joins and the undo of removals need a full layout
+    assert recomputed < 30 * 59 // 10
@@ -0,0 +1,69 @@
+import json
+
+from mp_builder.main import build_parser, run_report
+
+
+CONFIG = """\
+# comments and layout are lost, but nothing else changes
+config_version: 0.0.1
+workflows:
+  - id: a
+    name: x/a
+    description: first
+    pipeline_location: https://github.com/x/a
+    version: '1.0'
+  - id: b
+    name: x/b
+    pipeline_location: https://github.com/x/b
+    version: '1.0'
+    runtime_estimate: 100.0
+transitions:
+  - run: a
+  - from: a
+    run: b
+    params-file: params.yaml
+    config-file: nextflow.config
+"""
+
+
+def write_log(path, run="r1"):
+    events = [
+        {"event": "run", "time": 0.0},
+        {"event": "queued", "node": "a", "time": 0.0, "upstream": []},
+        {"event": "started", "node": "a", "time": 1.0},
+        {"event": "finished", "node": "a", "time": 11.0, "ok": True, "returncode": 0},
+        {"event": "queued", "node": "b", "time": 11.0, "upstream": ["a"]},
+        {"event": "started", "node": "b", "time": 11.0},
+        {"event": "finished", "node": "b", "time": 31.0, "ok": True, "returncode": 0},
+    ]
+    path.write_text("".join(json.dumps({"run": run, **e}) + "\n" for e in events))
+
+
+def report(*argv):
+    return run_report(build_parser().parse_args(["report", *argv]))
+
+
+def test_update_only_sets_runtime_estimates(tmp_path, capsys):
+    import yaml
+
+    log, config = tmp_path / "events.jsonl", tmp_path / "metapipeline.yaml"
+    write_log(log)
+    config.write_text(CONFIG)
+
+    assert report("--log", str(log), "--update", str(config), "--weight", "0.5") == 0
+
+    expected = yaml.safe_load(CONFIG)
+    expected["workflows"][0]["runtime_estimate"] = 10.0
+    expected["workflows"][1]["runtime_estimate"] = 60.0
+    assert yaml.safe_load(config.read_text()) == expected
+
+
+def test_unreadable_run_fails(tmp_path, capsys):
+    log = tmp_path / "events.jsonl"
+    assert report("--log", str(log)) == 1
+
+    write_log(log)
+    assert report("--log", str(log), "--run", "unknown") == 1
+
+    err = capsys.readouterr().err.strip().splitlines()
+    assert len(err) == 2
@@ -0,0 +1,31 @@
+import networkx as nx
+
+from mp_builder.execution import ResourcePool, Resources, simulate
+
+
+def test_pool_is_empty_after_releasing_fractional_cpus():
+    pool = ResourcePool(Resources(4.0, 0))
+    for node, cpus in (("a", 0.3), ("b", 1.1), ("c", 0.9)):
+        assert pool.acquire(node, {"cpus": cpus}) is not None
+    for node in ("a", "b", "c"):
+        pool.release(node)
+
+    assert pool.in_use == Resources()
+    # clamped to the whole budget
+    assert pool.acquire("d", {"cpus": 8}) == Resources(4.0, 0)
+
+
+def test_simulate_with_fractional_cpus():
+    G = nx.DiGraph()
+    G.add_node("root")
+    for node, cpus in (("a", 0.3), ("b", 1.1), ("c", 0.9)):
+        G.add_node(node, name=node, cpus=cpus, runtime_estimate=1.0)
+        G.add_edge("root", node)
+    G.add_node("d", name="d", cpus=8, runtime_estimate=1.0)
+    for node in ("a", "b", "c"):
+        G.add_edge(node, "d")
+
+    for policy in ("fifo", "critical-path"):
+        result = simulate(G, 4, policy=policy, budget=Resources(4.0, 0))
+        assert [node for node, *_ in result.schedule][-1] == "d"
+        assert result.makespan == 3.0
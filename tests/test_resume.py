@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.execution import NodeCached, NodeStarted, ResumeCache, node_keys
+
+from test_executor import make_executor, make_graph
+
+
+def changed(before: dict, after: dict) -> set:
+    return {node for node in before if before[node] != after[node]}
+
+
+def test_siblings_get_their_own_keys(tmp_path):
+    mg = MetaworkflowGraph()
+    G = mg.G
+    for node in ("x", "y"):
+        G.add_node(node, name="nf-core/rnaseq", version="3.14.0")
+        G.add_edge(MetaworkflowGraph.ROOT_NODE, node, data={"params": {"input": "samples.csv"}})
+
+    keys = node_keys(G, tmp_path)
+    assert keys["x"] != keys["y"]
+
+
+def test_upstream_change_invalidates_descendants(tmp_path):
+    G = make_graph().G
+    before = node_keys(G, tmp_path)
+
+    G.nodes["a"]["version"] = "2.0"
+    assert changed(before, node_keys(G, tmp_path)) == {"a", "b"}
+
+
+@pytest.mark.parametrize("file_key", ["params_file", "config_file"])
+def test_file_edits_invalidate_the_node(tmp_path, file_key):
+    G = make_graph().G
+    G.edges["a", "b"]["data"] = {file_key: "inputs/b.yaml"}
+    path = tmp_path / "inputs" / "b.yaml"
+
+    missing = node_keys(G, tmp_path)
+    path.parent.mkdir()
+    path.write_text("outdir: results\n")
+    written = node_keys(G, tmp_path)
+    assert changed(missing, written) == {"b"}
+
+    # the path is the same, the contents differ
+    path.write_text("outdir: results2\n")
+    assert changed(written, node_keys(G, tmp_path)) == {"b"}
+    path.write_text("outdir: results\n")
+    assert node_keys(G, tmp_path) == written
+
+
+def test_resumed_run_skips_completed_nodes(tmp_path):
+    mg = make_graph()
+    cache = ResumeCache(tmp_path / "cache")
+
+    def run() -> set:
+        events = []
+        assert asyncio.run(make_executor(mg, tmp_path, events, resume=cache).run())
+        assert len([e for e in events if isinstance(e, (NodeStarted, NodeCached))]) == 4
+        return {e.node for e in events if isinstance(e, NodeStarted)}
+
+    assert run() == {"a", "b", "c", "d"}
+    assert run() == set()
+    assert {entry["node"] for entry in cache.entries()} == {"a", "b", "c", "d"}
+
+    mg.G.nodes["c"]["version"] = "2.0"
+    assert run() == {"c", "d"}
+
+
+def test_clean(tmp_path):
+    cache = ResumeCache(tmp_path / "cache")
+    keys = node_keys(make_graph().G, tmp_path)
+    for node, key in keys.items():
+        cache.put(key, node, {"name": f"test/{node}"}, 1.0)
+
+    assert keys["a"] in cache and cache.get(keys["a"])["name"] == "test/a"
+    assert cache.clean({keys["a"], keys["b"]}) == 2
+    assert keys["a"] not in cache and keys["c"] in cache
+    assert cache.clean() == 2
+    assert list(cache.entries()) == []
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+from mp_builder.config import MetaworkflowGraph
+from mp_builder.config.snapshot import MAGIC, Snapshot, SnapshotError, encode, load_snapshot, save_snapshot
+from mp_builder.utils import seed_nfcore_pipelines
+
+from test_config import CONFIG
+
+
+def assert_same_graph(actual: nx.DiGraph, expected: nx.DiGraph):
+    # lists compare the order of nodes and of every node's successors, dicts the values and their types
+    assert list(actual.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(actual.edges(data=True)) == list(expected.edges(data=True))
+    assert actual.graph == expected.graph
+    for node, attrs in expected.nodes(data=True):
+        assert [type(v) for v in actual.nodes[node].values()] == [type(v) for v in attrs.values()]
+
+
+def make_graph() -> nx.DiGraph:
+    G = nx.DiGraph(name="example")
+    G.add_node("root")
+    G.add_node("b", path=Path("data/b.csv"), shape=(2, 3), flags=[True, False, None], delta=-7, ratio=0.25)
+    G.add_node("a", nested={"files": [Path("x"), ("y", 1)], "empty": {}})
+    # successors in the order they were added, not sorted
+    G.add_edge("root", "b", data={"params": [{"input": "x.csv"}]})
+    G.add_edge("root", "a")
+    G.add_edge("b", "a", weight=2**40)
+    return G
+
+
+def test_snapshot_round_trips(tmp_path):
+    G = make_graph()
+    assert_same_graph(Snapshot(encode(G)).to_graph(), G)
+
+    path = tmp_path / "graph.mpgs"
+    save_snapshot(G, path)
+    assert_same_graph(load_snapshot(path), G)
+
+
+def test_snapshot_matches_yaml_config(tmp_path):
+    seed_nfcore_pipelines([])
+    config = tmp_path / "config.yaml"
+    config.write_text(CONFIG)
+    mg = MetaworkflowGraph.from_file(config)
+
+    path = tmp_path / "config.mpgs"
+    mg.to_snapshot(path)
+    loaded = MetaworkflowGraph.from_snapshot(path)
+    assert_same_graph(loaded.G, mg.G)
+    assert loaded.to_yaml() == CONFIG
+
+
+def test_bad_magic():
+    data = bytearray(encode(make_graph()))
+    data[:len(MAGIC)] = b"XXXX"
+    with pytest.raises(SnapshotError, match="Not a mp-builder graph snapshot"):
+        Snapshot(bytes(data))
+
+
+def test_wrong_version():
+    data = bytearray(encode(make_graph()))
+    data[len(MAGIC)] += 1
+    with pytest.raises(SnapshotError, match="Unsupported snapshot version"):
+        Snapshot(bytes(data))
+
+
+@pytest.mark.parametrize("size", [0, 10, -1])
+def test_truncated_file(tmp_path, size):
+    data = encode(make_graph())
+    path = tmp_path / "graph.mpgs"
+    path.write_bytes(data[:size] if size >= 0 else data[:len(data) + size])
+    with pytest.raises(SnapshotError, match="Truncated"):
+        load_snapshot(path)
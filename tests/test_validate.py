@@ -0,0 +1,37 @@
+import pytest
+
+from mp_builder.utils import seed_nfcore_pipelines
+from mp_builder.validate import validate_file
+
+CONFIG = """\
+config_version: 0.0.1
+workflows:
+- id: a
+  name: example/a
+  version: 1.0.0
+transitions:
+- run: a
+"""
+
+
+@pytest.fixture(autouse=True)
+def no_catalog():
+    seed_nfcore_pipelines([])
+
+
+@pytest.mark.parametrize("content", ["", "# only a comment\n", "---\n"])
+def test_file_without_config_fails(tmp_path, content):
+    path = tmp_path / "empty.yaml"
+    path.write_text(content)
+    result = validate_file(path)
+    assert not result["ok"]
+    assert result["documents"] == 0
+    assert "error" in result
+
+
+def test_documents_are_counted(tmp_path):
+    path = tmp_path / "two.yaml"
+    path.write_text(f"{CONFIG}---\n{CONFIG}")
+    result = validate_file(path)
+    assert result["ok"], result.get("error")
+    assert (result["documents"], result["workflows"], result["transitions"]) == (2, 2, 2)